@@ -0,0 +1,195 @@
+"""
+Admission Control
+Adaptive concurrency limit with a bounded, prioritized wait queue and fast load shedding
+
+The limit follows the gradient algorithm of Netflix's concurrency-limits
+(Gradient2): a short and a long exponential average of request latency are
+compared, and while recent latency stays within ``tolerance`` of the long
+term the limit grows by about sqrt(limit); once requests start to queue
+inside the server and latency climbs, the limit shrinks in proportion
+(at most halving per update). Latency is measured to the start of the
+response, so streamed bodies do not read as slow requests, but a request
+holds its slot until the body is done.
+
+Requests over the limit wait in a FIFO queue for at most ``max_wait``
+seconds. Writes queue ahead of reads and reads may only fill half the
+queue; anything that cannot be queued, or waits too long, gets an
+immediate 503 with Retry-After instead of adding to the backlog. Critical
+requests (probes, scrapes, event streams) bypass the limit entirely.
+"""
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Callable, Dict, Optional
+
+from starlette.responses import JSONResponse
+from starlette.routing import Match, Router
+
+from backend.app.metrics import (
+    ADMISSION_IN_FLIGHT, ADMISSION_LIMIT, ADMISSION_QUEUE_WAIT, ADMISSION_QUEUED, ADMISSION_SHED
+)
+
+# Request priorities
+CRITICAL = "critical"  # never queued or shed
+HIGH = "high"
+LOW = "low"
+
+
+class AdmissionController:
+    """Gradient concurrency limit with a bounded wait queue per priority"""
+
+    def __init__(self, initial_limit: int = 50, min_limit: int = 4, max_limit: int = 1000,
+                 queue_size: int = 100, max_wait: float = 0.5, tolerance: float = 1.5,
+                 smoothing: float = 0.2, clock: Callable[[], float] = time.monotonic):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.queue_size = queue_size
+        self.max_wait = max_wait
+        self.tolerance = tolerance
+        self.smoothing = smoothing
+        self.clock = clock
+        self.in_flight = 0
+        self._queues: Dict[str, deque] = {HIGH: deque(), LOW: deque()}
+        self._short = 0.0  # latency averages, 0 until the first sample
+        self._long = 0.0
+        ADMISSION_LIMIT.set(self.limit)
+
+    @property
+    def queued(self) -> int:
+        return len(self._queues[HIGH]) + len(self._queues[LOW])
+
+    async def acquire(self, priority: str) -> bool:
+        """Take a slot, waiting in the queue if needed; False if the request is shed"""
+        if self.in_flight < self.limit and not self.queued:
+            self._admit()
+            return True
+        # Reads only get half the queue, so writes can still get in behind them
+        capacity = self.queue_size if priority == HIGH else self.queue_size // 2
+        if self.queued >= capacity:
+            ADMISSION_SHED.labels(priority=priority, reason="queue_full").inc()
+            return False
+
+        queue = self._queues[priority]
+        waiter = asyncio.get_running_loop().create_future()
+        queue.append(waiter)
+        ADMISSION_QUEUED.inc()
+        start = self.clock()
+        try:
+            await asyncio.wait_for(waiter, self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as exc:
+            if waiter.done() and not waiter.cancelled():
+                # Granted a slot just as the wait ended
+                if isinstance(exc, asyncio.TimeoutError):
+                    return True
+                self.release()
+                raise
+            if waiter in queue:
+                queue.remove(waiter)
+                ADMISSION_QUEUED.dec()
+            if isinstance(exc, asyncio.CancelledError):
+                raise
+            ADMISSION_SHED.labels(priority=priority, reason="queue_timeout").inc()
+            return False
+        finally:
+            ADMISSION_QUEUE_WAIT.observe(self.clock() - start)
+        return True
+
+    def release(self, latency: Optional[float] = None):
+        """Give back a slot, feeding the request's latency to the limit"""
+        if latency is not None:
+            self._update(max(latency, 1e-6))
+        self.in_flight -= 1
+        ADMISSION_IN_FLIGHT.dec()
+        for queue in self._queues.values():
+            while queue and self.in_flight < self.limit:
+                waiter = queue.popleft()
+                ADMISSION_QUEUED.dec()
+                if not waiter.done():
+                    waiter.set_result(True)
+                    self._admit()
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait: roughly the time to drain the queue"""
+        return min(30, max(1, math.ceil(self._short * (self.queued + 1) / max(self.limit, 1))))
+
+    def _admit(self):
+        self.in_flight += 1
+        ADMISSION_IN_FLIGHT.inc()
+
+    def _update(self, latency: float):
+        if not self._long:
+            self._short = self._long = latency
+        else:
+            self._short += (latency - self._short) / 10
+            self._long += (latency - self._long) / 600
+        # Let the long-term average recover quickly once an overload is over
+        if self._long > 2 * self._short:
+            self._long *= 0.95
+        # Far below the limit, latency says nothing about where the limit should be
+        if self.in_flight < self.limit / 2:
+            return
+        gradient = max(0.5, min(1.0, self.tolerance * self._long / self._short))
+        target = self.limit * gradient + math.sqrt(self.limit)
+        limit = self.limit * (1 - self.smoothing) + target * self.smoothing
+        self.limit = max(self.min_limit, min(self.max_limit, limit))
+        ADMISSION_LIMIT.set(self.limit)
+
+
+def match_route(router: Optional[Router], scope: dict):
+    """Store the route a request would reach in its scope, for a response
+    sent before routing (the route template is the request's metric label)"""
+    if router is None:
+        return
+    for route in router.routes:
+        if route.matches(scope)[0] == Match.FULL:
+            scope["route"] = route
+            return
+
+
+class AdmissionMiddleware:
+    """ASGI middleware applying an AdmissionController to HTTP requests.
+
+    ``priority`` classifies a request from its ASGI scope. Shed requests are
+    answered before routing; ``router`` is used to keep their metric labels.
+    """
+
+    def __init__(self, app, controller: AdmissionController, priority: Callable[[dict], str],
+                 router: Optional[Router] = None):
+        self.app = app
+        self.controller = controller
+        self.priority = priority
+        self.router = router
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        priority = self.priority(scope)
+        if priority == CRITICAL:
+            return await self.app(scope, receive, send)
+        if not await self.controller.acquire(priority):
+            return await self.shed(scope, receive, send)
+
+        start = time.perf_counter()
+        latency = None
+
+        async def timed_send(message):
+            nonlocal latency
+            if latency is None and message["type"] == "http.response.start":
+                latency = time.perf_counter() - start
+            await send(message)
+
+        try:
+            await self.app(scope, receive, timed_send)
+        finally:
+            self.controller.release(latency)
+
+    async def shed(self, scope, receive, send):
+        match_route(self.router, scope)
+        response = JSONResponse(
+            {"detail": "Server overloaded, retry later"},
+            status_code=503,
+            headers={"Retry-After": str(self.controller.retry_after())}
+        )
+        await response(scope, receive, send)
@@ -0,0 +1,162 @@
+"""
+Static Asset Cache
+Frontend files held in memory with validators and pre-compressed variants
+"""
+import gzip
+import hashlib
+import mimetypes
+import os
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 256
+CACHE_CONTROL = "public, max-age=0, must-revalidate"
+
+
+class Asset:
+    """One file's bytes, validators and compressed variants"""
+
+    __slots__ = ("path", "mtime", "media_type", "etag", "last_modified", "variants")
+
+    def __init__(self, path: Path):
+        stat = path.stat()
+        body = path.read_bytes()
+        digest = hashlib.sha1(body).hexdigest()[:20]
+
+        self.path = path
+        self.mtime = stat.st_mtime
+        self.media_type = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+        if self.media_type.startswith("text/") or self.media_type == "application/javascript":
+            self.media_type += "; charset=utf-8"
+        self.etag = f'"{digest}"'
+        self.last_modified = formatdate(stat.st_mtime, usegmt=True)
+
+        # encoding -> (body, etag); identity is always present
+        self.variants: Dict[str, tuple] = {"identity": (body, self.etag)}
+        if len(body) >= MIN_COMPRESS_SIZE:
+            compressed = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(compressed) < len(body):
+                self.variants["gzip"] = (compressed, f'"{digest}-gzip"')
+            if brotli is not None:
+                compressed = brotli.compress(body, quality=11)
+                if len(compressed) < len(body):
+                    self.variants["br"] = (compressed, f'"{digest}-br"')
+
+    def not_modified(self, request: Request) -> bool:
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+            return "*" in tags or any(etag in tags for _, etag in self.variants.values())
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(self.mtime) <= since
+        return False
+
+    def choose_encoding(self, accept_encoding: str) -> str:
+        """Best available encoding the client accepts (br, then gzip)"""
+        accepted = set()
+        for part in accept_encoding.split(","):
+            coding, _, params = part.strip().partition(";")
+            params = params.replace(" ", "")
+            if params.startswith("q="):
+                try:
+                    if float(params[2:] or 0) == 0:
+                        continue
+                except ValueError:
+                    continue  # unparseable q-value: ignore this coding
+            accepted.add(coding.strip().lower())
+        for encoding in ("br", "gzip"):
+            if encoding in self.variants and (encoding in accepted or "*" in accepted):
+                return encoding
+        return "identity"
+
+    def response(self, request: Request) -> Response:
+        headers = {
+            "Last-Modified": self.last_modified,
+            "Cache-Control": CACHE_CONTROL,
+            "Vary": "Accept-Encoding"
+        }
+        encoding = self.choose_encoding(request.headers.get("accept-encoding", ""))
+        body, etag = self.variants[encoding]
+        headers["ETag"] = etag
+
+        if self.not_modified(request):
+            return Response(status_code=304, headers=headers)
+        if encoding != "identity":
+            headers["Content-Encoding"] = encoding
+        if request.method == "HEAD":
+            headers["Content-Length"] = str(len(body))
+            return Response(status_code=200, headers=headers, media_type=self.media_type)
+        return Response(content=body, headers=headers, media_type=self.media_type)
+
+
+class AssetCache:
+    """Every file under a directory, loaded and compressed once.
+
+    With ``reload`` enabled (debug), each lookup re-checks the file's mtime
+    and reloads changed or newly added files.
+    """
+
+    def __init__(self, directory: Path, reload: bool = False):
+        self.directory = Path(directory).resolve()
+        self.reload = reload
+        self._assets: Dict[str, Asset] = {}
+        if self.directory.is_dir():
+            for path in self.directory.rglob("*"):
+                if path.is_file():
+                    self._assets[path.relative_to(self.directory).as_posix()] = Asset(path)
+
+    def get(self, name: str) -> Optional[Asset]:
+        asset = self._assets.get(name)
+        if not self.reload:
+            return asset
+
+        if asset is not None:
+            try:
+                if os.stat(asset.path).st_mtime != asset.mtime:
+                    asset = self._assets[name] = Asset(asset.path)
+            except FileNotFoundError:
+                del self._assets[name]
+                return None
+            return asset
+
+        path = (self.directory / name).resolve()
+        if path.is_file() and path.is_relative_to(self.directory):
+            asset = self._assets[name] = Asset(path)
+        return asset
+
+    def response(self, name: str, request: Request) -> Optional[Response]:
+        asset = self.get(name)
+        return asset.response(request) if asset is not None else None
+
+
+class CachedStaticFiles:
+    """ASGI app serving an AssetCache, a drop-in for StaticFiles on a mount"""
+
+    def __init__(self, cache: AssetCache):
+        self.cache = cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        request = Request(scope, receive)
+        if request.method not in ("GET", "HEAD"):
+            response = Response("Method Not Allowed", status_code=405, headers={"Allow": "GET, HEAD"})
+        else:
+            name = scope["path"][len(scope.get("root_path", "")):].lstrip("/")
+            response = self.cache.response(name, request) or Response("Not Found", status_code=404)
+        await response(scope, receive, send)
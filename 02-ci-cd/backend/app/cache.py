@@ -0,0 +1,90 @@
+"""
+Response Cache
+Serialized JSON bodies of read endpoints, bounded by size with LRU eviction and a TTL
+
+Entries hold the rendered bytes and the response headers that go with them
+(an order's ETag), so a hit is returned as-is with no model validation or
+JSON encoding. Keys start with a namespace (``"orders"``,
+``"order"``, ...) and that namespace's generation number: ``invalidate()``
+bumps the generation, which makes every older key unreachable in O(1); the
+stale entries then age out through normal LRU eviction. ``version`` counts
+invalidations, so a body rendered while a write was in flight can be
+recognised and left uncached.
+
+The cache is per process. With several workers sharing one order store,
+a write in one worker cannot invalidate the others, so callers should not
+cache store-backed responses in that setup (see main.py).
+"""
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Hashable, Optional, Tuple
+
+from backend.app.metrics import CACHE_EVICTIONS, CACHE_HITS, CACHE_MISSES
+
+
+class ResponseCache:
+    """LRU + TTL cache of response bodies, bounded by total bytes"""
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: float = 300,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.clock = clock
+        self.size = 0
+        # key -> (expires_at, body, headers), least recently used first
+        self._entries: "OrderedDict[Tuple, Tuple[float, bytes, Dict[str, str]]]" = OrderedDict()
+        self._generations: Dict[str, int] = {}
+        self.version = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, namespace: str, *parts: Hashable) -> Tuple:
+        return (namespace, self._generations.get(namespace, 0), *parts)
+
+    def get(self, key: Tuple) -> Optional[Tuple[bytes, Dict[str, str]]]:
+        """(body, headers) of a live entry, or None"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] <= self.clock():
+            self._remove(key)
+            entry = None
+        if entry is None:
+            CACHE_MISSES.labels(namespace=key[0]).inc()
+            return None
+        self._entries.move_to_end(key)
+        CACHE_HITS.labels(namespace=key[0]).inc()
+        return entry[1], entry[2]
+
+    def set(self, key: Tuple, body: bytes, ttl: Optional[float] = None,
+            headers: Optional[Dict[str, str]] = None):
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0 or len(body) > self.max_bytes:
+            return
+        if key in self._entries:
+            self._remove(key)
+        self._entries[key] = (self.clock() + ttl, body, headers or {})
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            oldest = next(iter(self._entries))
+            self._remove(oldest)
+            CACHE_EVICTIONS.labels(namespace=oldest[0]).inc()
+
+    def discard(self, namespace: str, *parts: Hashable):
+        """Drop one entry, e.g. a single order after it changed"""
+        self.version += 1
+        key = self.key(namespace, *parts)
+        if key in self._entries:
+            self._remove(key)
+
+    def invalidate(self, namespace: str):
+        """Make every entry of a namespace stale"""
+        self.version += 1
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def clear(self):
+        self._entries.clear()
+        self.size = 0
+
+    def _remove(self, key: Tuple):
+        _, body, _ = self._entries.pop(key)
+        self.size -= len(body)
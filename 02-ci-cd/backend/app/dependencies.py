@@ -0,0 +1,72 @@
+"""
+Dependency Probes
+Concurrent health probes of external services, shared by every caller through a TTL cache
+
+Dashboards used to probe Prometheus, Grafana and node-exporter from each
+browser tab. Here the API probes them itself: all targets at once, each
+bounded by a timeout, and the result is kept for ``ttl`` seconds. Callers
+arriving while a probe cycle runs wait for that cycle instead of starting
+another, so any number of dashboards costs one cycle per TTL.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, Optional
+
+import httpx
+
+from backend.app.metrics import DEPENDENCY_PROBE_DURATION, DEPENDENCY_UP
+
+
+class DependencyChecker:
+    """Cached, single-flight health probes of named HTTP targets"""
+
+    def __init__(self, targets: Dict[str, str], timeout: float = 2.0, ttl: float = 15.0,
+                 clock: Callable[[], float] = time.monotonic,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.targets = {name: url for name, url in targets.items() if url}
+        self.timeout = timeout
+        self.ttl = ttl
+        self.clock = clock
+        self.transport = transport
+        self._result: Optional[dict] = None
+        self._expires = 0.0
+        self._cycle: Optional[asyncio.Future] = None
+
+    async def check(self) -> dict:
+        """Latest probe results, probing again once they are older than the TTL"""
+        if self._result is not None and self.clock() < self._expires:
+            return self._result
+        if self._cycle is None or self._cycle.done():
+            self._cycle = asyncio.ensure_future(self._probe_all())
+        # A caller that gives up must not cancel the cycle others are waiting on
+        return await asyncio.shield(self._cycle)
+
+    async def _probe_all(self) -> dict:
+        # A client per cycle: cycles are rare, and it keeps no connections
+        # tied to an event loop between them
+        async with httpx.AsyncClient(timeout=self.timeout, transport=self.transport) as client:
+            results = await asyncio.gather(*(self._probe(client, name, url) for name, url in self.targets.items()))
+        self._result = {
+            "status": "ok" if all(result["status"] == "up" for result in results) else "degraded",
+            "dependencies": results,
+            "checked_at": time.time()
+        }
+        self._expires = self.clock() + self.ttl
+        return self._result
+
+    async def _probe(self, client: httpx.AsyncClient, name: str, url: str) -> dict:
+        result = {"name": name, "url": url}
+        start = time.perf_counter()
+        try:
+            # httpx times out each phase; wait_for bounds the whole request
+            response = await asyncio.wait_for(client.get(url), self.timeout)
+            result["status"] = "up" if response.is_success else "down"
+            result["http_status"] = response.status_code
+        except (httpx.HTTPError, asyncio.TimeoutError) as exc:
+            result["status"] = "down"
+            result["error"] = type(exc).__name__
+        duration = time.perf_counter() - start
+        DEPENDENCY_PROBE_DURATION.labels(dependency=name).observe(duration)
+        DEPENDENCY_UP.labels(dependency=name).set(1 if result["status"] == "up" else 0)
+        result["latency_ms"] = round(duration * 1000, 1)
+        return result
@@ -0,0 +1,187 @@
+"""
+Event Stream
+Fan-out of order changes and stats snapshots to Server-Sent Events subscribers
+
+Every event is serialized once and the same bytes are queued for each
+subscriber. Queues are bounded: a client that falls behind (slow network,
+background tab) is disconnected instead of buffering without limit or
+slowing everyone else down, and ``EventSource`` reconnects it to a fresh
+snapshot. Order changes are coalesced per flush interval into one
+``orders`` event, so a burst of writes costs each client one message.
+
+Subscribers only see writes made by the worker they are connected to;
+stats snapshots are aggregated across workers like ``/api/stats``.
+
+A stream ends after ``max_age`` seconds and the client reconnects, possibly
+to another worker or replica. This also bounds how long a graceful shutdown
+waits for open streams: uvicorn only runs the app's shutdown handlers once
+every connection has finished.
+"""
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional, Set
+
+from backend.app.metrics import EVENTS_PUBLISHED, EVENT_SUBSCRIBERS, EVENT_SUBSCRIBERS_DROPPED
+from backend.app.responses import dumps
+
+logger = logging.getLogger(__name__)
+
+# Sent on idle connections so proxies and load balancers keep them open
+HEARTBEAT = b": keepalive\n\n"
+# Sent before a stream ends of old age, so the client reconnects right away
+RECONNECT = b"retry: 100\n\n"
+
+
+def format_event(event: str, data: Any) -> bytes:
+    """One SSE message"""
+    return b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    """One connected client and its bounded queue of pending messages"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+
+class Broadcaster:
+    """Fan-out of events to subscribers with per-client backpressure"""
+
+    def __init__(self, queue_size: int = 64, max_subscribers: int = 1000, heartbeat: float = 15.0,
+                 retry_ms: int = 3000, max_age: Optional[float] = None):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self.heartbeat = heartbeat
+        self.retry_ms = retry_ms
+        self.max_age = max_age
+        self.subscribers: Set[Subscriber] = set()
+        # Order changes since the last flush
+        self._created: Dict[int, dict] = {}
+        self._updated: Dict[int, dict] = {}
+        self._deleted: List[int] = []
+        self._total: Optional[int] = None
+
+    @property
+    def full(self) -> bool:
+        return len(self.subscribers) >= self.max_subscribers
+
+    def subscribe(self, *initial: bytes) -> Subscriber:
+        """Register a client; ``initial`` messages are queued first"""
+        subscriber = Subscriber(self.queue_size)
+        subscriber.queue.put_nowait(f"retry: {self.retry_ms}\n\n".encode())
+        for message in initial:
+            subscriber.queue.put_nowait(message)
+        self.subscribers.add(subscriber)
+        EVENT_SUBSCRIBERS.inc()
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.discard(subscriber)
+            EVENT_SUBSCRIBERS.dec()
+
+    def publish(self, event: str, data: Any) -> int:
+        """Queue an event for every subscriber; returns how many got it"""
+        if not self.subscribers:
+            return 0
+        message = format_event(event, data)
+        delivered = 0
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(message)
+                delivered += 1
+            except asyncio.QueueFull:
+                self._disconnect(subscriber)
+                EVENT_SUBSCRIBERS_DROPPED.inc()
+        EVENTS_PUBLISHED.labels(event=event).inc()
+        return delivered
+
+    def orders_changed(self, created: Iterable[dict] = (), updated: Iterable[dict] = (),
+                       deleted: Iterable[int] = (), total: Optional[int] = None):
+        """Record order changes for the next ``orders`` event"""
+        if not self.subscribers:
+            return
+        for order in created:
+            self._created[order["id"]] = order
+        for order in updated:
+            self._updated[order["id"]] = order
+        self._deleted.extend(deleted)
+        if total is not None:
+            self._total = total
+
+    def flush(self) -> int:
+        """Publish pending order changes as one ``orders`` event.
+
+        Clients apply ``created``, then ``updated``, then ``deleted``, which
+        gives the right result for any sequence of writes within the batch.
+        """
+        if not (self._created or self._updated or self._deleted):
+            return 0
+        data = {
+            "created": list(self._created.values()),
+            "updated": list(self._updated.values()),
+            "deleted": self._deleted
+        }
+        if self._total is not None:
+            data["total"] = self._total
+        self._created, self._updated, self._deleted, self._total = {}, {}, [], None
+        return self.publish("orders", data)
+
+    async def run(self, snapshot: Callable[[], Awaitable[dict]], stats_interval: float = 5.0,
+                  flush_interval: float = 0.5):
+        """Flush order changes and publish stats snapshots until cancelled"""
+        loop = asyncio.get_running_loop()
+        next_stats = loop.time()
+        while True:
+            await asyncio.sleep(flush_interval)
+            self.flush()
+            if loop.time() >= next_stats:
+                next_stats = loop.time() + stats_interval
+                if self.subscribers:
+                    try:
+                        self.publish("stats", await snapshot())
+                    except Exception:
+                        logger.exception("Stats snapshot for event subscribers failed")
+
+    async def stream(self, *initial: bytes) -> AsyncIterator[bytes]:
+        """Subscribe and yield messages for one client, with heartbeats while idle,
+        until the broadcaster closes it or it is ``max_age`` seconds old.
+
+        Subscribing on first iteration ties the subscription to the
+        generator, so it is always released when the response ends.
+        """
+        subscriber = self.subscribe(*initial)
+        loop = asyncio.get_running_loop()
+        expires = loop.time() + self.max_age if self.max_age else None
+        try:
+            while True:
+                timeout = self.heartbeat
+                if expires is not None:
+                    timeout = min(timeout, expires - loop.time())
+                    if timeout <= 0:
+                        yield RECONNECT
+                        return
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    if expires is None or loop.time() < expires:
+                        yield HEARTBEAT
+                    continue
+                if message is None:
+                    return
+                yield message
+        finally:
+            self.unsubscribe(subscriber)
+
+    def close(self):
+        """End every stream, e.g. on shutdown"""
+        for subscriber in list(self.subscribers):
+            self._disconnect(subscriber)
+
+    def _disconnect(self, subscriber: Subscriber):
+        # Whatever is still queued is discarded; the client resyncs when it
+        # reconnects
+        self.unsubscribe(subscriber)
+        while not subscriber.queue.empty():
+            subscriber.queue.get_nowait()
+        subscriber.queue.put_nowait(None)
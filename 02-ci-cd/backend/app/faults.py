@@ -0,0 +1,145 @@
+"""
+Fault Injection
+Runtime-configurable latency, errors, CPU burn and memory pressure per route
+
+Rules are matched against the route template (e.g. ``/orders/{order_id}``)
+with shell-style wildcards, so ``/orders*`` covers every order endpoint and
+``*`` covers everything. Nothing here blocks the event loop: latency is an
+``asyncio.sleep``, CPU burn runs on the threadpool and memory ballast is
+released by a loop timer.
+"""
+import asyncio
+import math
+import random
+import time
+from fnmatch import fnmatchcase
+from typing import Dict, List, Literal, Optional
+
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field, model_validator
+
+
+class LatencySpec(BaseModel):
+    """Added latency: fixed ``ms``, uniform ``min_ms``..``max_ms``, or a
+    lognormal tail around ``median_ms`` with shape ``sigma`` (capped at
+    ``max_ms`` when given)"""
+    distribution: Literal["fixed", "uniform", "lognormal"] = "fixed"
+    ms: float = Field(0, ge=0)
+    min_ms: float = Field(0, ge=0)
+    max_ms: Optional[float] = Field(None, ge=0)
+    median_ms: float = Field(100, gt=0)
+    sigma: float = Field(1.0, gt=0)
+
+    @model_validator(mode="after")
+    def check_bounds(self):
+        if self.distribution == "uniform" and (self.max_ms is None or self.max_ms < self.min_ms):
+            raise ValueError("uniform latency needs max_ms >= min_ms")
+        return self
+
+    def sample(self, rng: random.Random) -> float:
+        """Delay in seconds"""
+        if self.distribution == "fixed":
+            ms = self.ms
+        elif self.distribution == "uniform":
+            ms = rng.uniform(self.min_ms, self.max_ms)
+        else:
+            ms = rng.lognormvariate(math.log(self.median_ms), self.sigma)
+            if self.max_ms is not None:
+                ms = min(ms, self.max_ms)
+        return ms / 1000
+
+
+class FaultRule(BaseModel):
+    """Faults applied to requests whose route matches ``route``"""
+    route: str = "*"
+    methods: Optional[List[str]] = None
+    enabled: bool = True
+    latency: Optional[LatencySpec] = None
+    error_rate: float = Field(0, ge=0, le=1)
+    error_status: int = Field(500, ge=400, le=599)
+    cpu_burn_ms: float = Field(0, ge=0, le=10_000)
+    memory_mb: float = Field(0, ge=0)
+    memory_hold_seconds: float = Field(30, ge=0, le=3600)
+
+    def matches(self, route: str, method: str) -> bool:
+        if not self.enabled:
+            return False
+        if self.methods and method not in self.methods:
+            return False
+        return fnmatchcase(route, self.route)
+
+
+class InjectedFault(Exception):
+    """Raised when a rule decides the request should fail"""
+
+    def __init__(self, status_code: int, rule_name: str):
+        self.status_code = status_code
+        self.rule_name = rule_name
+        super().__init__(f"Injected {status_code} by fault rule '{rule_name}'")
+
+
+def burn_cpu(milliseconds: float):
+    """Spin for the given wall time; meant to run on a worker thread"""
+    deadline = time.perf_counter() + milliseconds / 1000
+    x = 0
+    while time.perf_counter() < deadline:
+        x += 1
+
+
+class FaultInjector:
+    """Named fault rules, evaluated for every routed request"""
+
+    def __init__(self, max_memory_mb: float = 512, seed: Optional[int] = None):
+        self.rules: Dict[str, FaultRule] = {}
+        self.max_memory_mb = max_memory_mb
+        self._rng = random.Random(seed)
+        self._ballast: List[bytearray] = []
+
+    @property
+    def ballast_mb(self) -> float:
+        return sum(len(chunk) for chunk in self._ballast) / (1024 * 1024)
+
+    def set_rule(self, name: str, rule: FaultRule):
+        self.rules[name] = rule
+
+    def remove_rule(self, name: str) -> bool:
+        return self.rules.pop(name, None) is not None
+
+    def clear(self):
+        self.rules.clear()
+        self._ballast.clear()
+
+    async def apply(self, route: str, method: str):
+        """Apply every matching rule; raises InjectedFault for injected errors"""
+        for name, rule in list(self.rules.items()):
+            if not rule.matches(route, method):
+                continue
+            if rule.memory_mb:
+                self._add_ballast(rule.memory_mb, rule.memory_hold_seconds)
+            if rule.latency is not None:
+                await asyncio.sleep(rule.latency.sample(self._rng))
+            if rule.cpu_burn_ms:
+                await run_in_threadpool(burn_cpu, rule.cpu_burn_ms)
+            if rule.error_rate and self._rng.random() < rule.error_rate:
+                raise InjectedFault(rule.error_status, name)
+
+    def _add_ballast(self, megabytes: float, hold_seconds: float):
+        size = int(min(megabytes, self.max_memory_mb - self.ballast_mb) * 1024 * 1024)
+        if size <= 0:
+            return
+        # bytearray zero-fills, so the pages are really committed
+        chunk = bytearray(size)
+        self._ballast.append(chunk)
+        asyncio.get_running_loop().call_later(hold_seconds, self._release, chunk)
+
+    def _release(self, chunk: bytearray):
+        for i, held in enumerate(self._ballast):
+            if held is chunk:
+                del self._ballast[i]
+                break
+
+    def describe(self) -> dict:
+        return {
+            "rules": {name: rule.model_dump() for name, rule in self.rules.items()},
+            "ballast_mb": round(self.ballast_mb, 1)
+        }
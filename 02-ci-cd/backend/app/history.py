@@ -0,0 +1,182 @@
+"""
+Metrics History
+Fixed-memory, downsampled history of request rate, errors, latency and active orders
+
+Requests are counted into the finest ring (1 second buckets). When a second
+closes, its bucket is folded into each coarser ring (10 seconds, 1 minute),
+so the rollups cost nothing per request. Every bucket holds a latency
+histogram rather than quantiles, because histograms add up: a point spanning
+several buckets sums them and reads quantiles off the total. Queries on a
+coarser ring add in the second that is still open.
+
+A query picks the coarsest ring that covers the range with buckets no wider
+than the step, so it reads at most a few buckets per returned point. The
+history is per process, like the response cache: with several workers each
+one reports its own traffic.
+"""
+import math
+import time
+from array import array
+from bisect import bisect_left
+from typing import Callable, List, Optional, Sequence, Tuple
+
+# (bucket seconds, buckets kept): 15 minutes at 1s, 6 hours at 10s, 24 hours at 1m
+RESOLUTIONS = ((1, 900), (10, 2160), (60, 1440))
+
+# Upper bounds of the latency histogram, in seconds (prometheus_client's defaults)
+LATENCY_BOUNDS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+
+QUANTILES = {"p50": 0.5, "p95": 0.95, "p99": 0.99}
+
+
+class Ring:
+    """``size`` buckets of ``width`` seconds, each keyed by its epoch"""
+
+    def __init__(self, width: int, size: int, buckets: int):
+        self.width = width
+        self.size = size
+        self.buckets = buckets  # latency histogram buckets, overflow included
+        self.epochs = array('q', [-1]) * size
+        self.requests = array('q', bytes(8 * size))
+        self.errors = array('q', bytes(8 * size))
+        self.active = array('q', [-1]) * size  # active orders at the end of the bucket; -1 if unknown
+        self.latency = array('q', bytes(8 * size * buckets))
+
+    def slot(self, epoch: int, active: int) -> int:
+        """Slot of ``epoch``, reset first if it still holds an older bucket"""
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.requests[slot] = 0
+            self.errors[slot] = 0
+            self.active[slot] = active
+            start = slot * self.buckets
+            self.latency[start:start + self.buckets] = array('q', bytes(8 * self.buckets))
+        return slot
+
+
+class MetricsHistory:
+    """Request, error, latency and active order history at several resolutions"""
+
+    def __init__(self, resolutions: Sequence[Tuple[int, int]] = RESOLUTIONS,
+                 bounds: Sequence[float] = LATENCY_BOUNDS, clock: Callable[[], float] = time.time):
+        self.bounds = tuple(bounds)
+        self.clock = clock
+        self.rings = [Ring(width, size, len(self.bounds) + 1) for width, size in sorted(resolutions)]
+        self._finest = self.rings[0]
+        self._open = -1  # epoch of the open bucket in the finest ring
+        self._active = -1
+
+    def _current(self) -> int:
+        """Slot of the current bucket in the finest ring, closing the previous one"""
+        epoch = int(self.clock() // self._finest.width)
+        if epoch != self._open:
+            if self._open >= 0:
+                self._close(self._open)
+            self._open = epoch
+        return self._finest.slot(epoch, self._active)
+
+    def _close(self, epoch: int):
+        """Fold a finished bucket of the finest ring into the coarser rings"""
+        fine = self._finest
+        slot = epoch % fine.size
+        if fine.epochs[slot] != epoch:
+            return
+        start = slot * fine.buckets
+        histogram = fine.latency[start:start + fine.buckets]
+        for ring in self.rings[1:]:
+            target = ring.slot(epoch * fine.width // ring.width, fine.active[slot])
+            ring.requests[target] += fine.requests[slot]
+            ring.errors[target] += fine.errors[slot]
+            ring.active[target] = fine.active[slot]
+            offset = target * ring.buckets
+            for i, count in enumerate(histogram):
+                if count:
+                    ring.latency[offset + i] += count
+
+    def record_request(self, duration: float):
+        slot = self._current()
+        self._finest.requests[slot] += 1
+        self._finest.latency[slot * self._finest.buckets + bisect_left(self.bounds, duration)] += 1
+
+    def record_error(self):
+        self._finest.errors[self._current()] += 1
+
+    def set_active_orders(self, count: int):
+        self._active = count
+        self._finest.active[self._current()] = count
+
+    def retention(self) -> int:
+        """Longest range that can be queried, in seconds"""
+        return max(ring.width * ring.size for ring in self.rings)
+
+    def query(self, range_seconds: int, step: int) -> dict:
+        """Points covering the trailing ``range_seconds``, one per ``step`` seconds
+
+        The step is capped at the range and rounded up to a whole number of
+        buckets of the ring used.
+        Rates are per second, latency quantiles in milliseconds; points with
+        no requests have null quantiles and error rate.
+        """
+        covering = [ring for ring in self.rings if ring.width * ring.size >= range_seconds]
+        if not covering or step > self.retention():
+            raise ValueError(f"range and step must be at most {self.retention()} seconds")
+        step = min(step, range_seconds)  # one point never spans more than the range
+        fitting = [ring for ring in covering if ring.width <= step]
+        ring = fitting[-1] if fitting else covering[0]
+        per_point = max(1, math.ceil(step / ring.width))
+        step = per_point * ring.width
+        points = max(1, math.ceil(range_seconds / step))
+
+        open_slot = self._current()
+        end = int(self.clock() // ring.width)
+        first = end - points * per_point + 1
+        oldest = max(0, end - ring.size + 1)  # older epochs are no longer in the ring
+        series = {"timestamps": [], "request_rate": [], "error_rate": [], "active_orders": [],
+                  **{f"latency_{name}_ms": [] for name in QUANTILES}}
+        active = None
+        for point in range(points):
+            start = first + point * per_point
+            sources = [(ring, epoch % ring.size) for epoch in range(max(start, oldest), start + per_point)
+                       if ring.epochs[epoch % ring.size] == epoch]
+            if ring is not self._finest and point == points - 1:
+                sources.append((self._finest, open_slot))
+            requests = errors = 0
+            histogram = [0] * ring.buckets
+            for source, slot in sources:
+                requests += source.requests[slot]
+                errors += source.errors[slot]
+                if source.active[slot] >= 0:
+                    active = source.active[slot]
+                offset = slot * source.buckets
+                for i in range(source.buckets):
+                    histogram[i] += source.latency[offset + i]
+            series["timestamps"].append(start * ring.width)
+            series["request_rate"].append(round(requests / step, 3))
+            series["error_rate"].append(round(errors / requests * 100, 2) if requests else None)
+            series["active_orders"].append(active)
+            for name, q in QUANTILES.items():
+                value = quantile(histogram, self.bounds, q)
+                series[f"latency_{name}_ms"].append(round(value * 1000, 1) if value is not None else None)
+        return {"range": points * step, "step": step, "resolution": ring.width, **series}
+
+
+def quantile(histogram: List[int], bounds: Sequence[float], q: float) -> Optional[float]:
+    """Estimate a quantile from bucket counts, interpolating within the bucket
+
+    Like Prometheus' histogram_quantile, values past the last bound are
+    reported as the last bound.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(histogram):
+        if count and seen + count >= rank:
+            if i == len(bounds):
+                return bounds[-1]
+            lower = bounds[i - 1] if i else 0.0
+            return lower + (bounds[i] - lower) * (rank - seen) / count
+        seen += count
+    return bounds[-1]
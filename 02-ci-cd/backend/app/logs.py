@@ -0,0 +1,201 @@
+"""
+Structured Logging
+Non-blocking JSON logging: records are queued on the request path and
+formatted, batched and written by a background thread
+
+The request path only pays for creating the LogRecord and a non-blocking
+``put``. When the queue fills past its high-water mark, records below
+WARNING are sampled; when it is full, records are dropped and counted in
+``app_log_records_dropped_total`` rather than stalling the event loop. The
+writer rotates the log file by size itself, so old logs are bounded by
+``backup_count`` instead of needing an external cleanup job.
+"""
+import atexit
+import contextvars
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from typing import List, Optional
+
+from backend.app.metrics import LOG_RECORDS_DROPPED
+
+# Request ID of the request being handled; set by the request middleware
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord attributes that are not user-supplied ``extra`` fields
+STANDARD_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record, with the request ID and any ``extra`` fields"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage()
+        }
+        request_id = getattr(record, "request_id", None)
+        if request_id:
+            entry["request_id"] = request_id
+        for key, value in record.__dict__.items():
+            if key not in STANDARD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = record.exc_text or self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class QueueingHandler(logging.handlers.QueueHandler):
+    """Enqueues records without blocking, sampling or dropping under backpressure"""
+
+    def __init__(self, log_queue: queue.Queue, sample_every: int = 10, high_water: float = 0.8):
+        super().__init__(log_queue)
+        self.sample_every = sample_every
+        self.high_water = int(log_queue.maxsize * high_water) if log_queue.maxsize else 0
+        self._sampled = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Formatting is left to the writer thread; only the context that is
+        # gone by then is captured here
+        record.request_id = request_id_var.get()
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        if self.high_water and record.levelno < logging.WARNING and self.queue.qsize() >= self.high_water:
+            self._sampled += 1
+            if self._sampled % self.sample_every:
+                LOG_RECORDS_DROPPED.labels(level=record.levelname).inc()
+                return
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.labels(level=record.levelname).inc()
+
+
+class BatchWriter:
+    """Background thread that drains the queue and writes records in batches"""
+
+    def __init__(self, log_queue: queue.Queue, path: Optional[str] = None, console: bool = True,
+                 max_bytes: int = 10 * 1024 * 1024, backup_count: int = 5, batch_size: int = 512,
+                 formatter: Optional[logging.Formatter] = None):
+        self.queue = log_queue
+        self.path = path
+        self.console = console
+        self.max_bytes = max_bytes
+        self.backup_count = backup_count
+        self.batch_size = batch_size
+        self.formatter = formatter or JsonFormatter()
+        self._file = None
+        self._thread: Optional[threading.Thread] = None
+        if path:
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0):
+        """Write everything queued so far, then stop the thread"""
+        if self._thread is None:
+            return
+        self.queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _run(self):
+        while True:
+            batch: List[logging.LogRecord] = [self.queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(record is None for record in batch)
+            self.write([record for record in batch if record is not None])
+            if stop:
+                return
+
+    def write(self, records: List[logging.LogRecord]):
+        if not records:
+            return
+        lines = []
+        for record in records:
+            try:
+                lines.append(self.formatter.format(record))
+            except Exception:
+                lines.append(json.dumps({"ts": record.created, "level": "ERROR", "msg": "unformattable log record",
+                                         "logger": record.name, "raw": repr(record.msg)}))
+        if self.path:
+            try:
+                self._write_file([(line + "\n").encode() for line in lines])
+            except OSError as e:
+                print(f"log writer failed on {self.path}: {e}", file=sys.stderr)
+        if self.console:
+            sys.stderr.write("\n".join(lines) + "\n")
+            sys.stderr.flush()
+
+    def _write_file(self, lines: List[bytes]):
+        if self._file is not None:
+            try:
+                # Another worker may have rotated the file under us
+                stale = os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+            except FileNotFoundError:
+                stale = True
+            if stale:
+                self._file.close()
+                self._file = None
+        if self._file is None:
+            self._file = open(self.path, "ab")
+
+        # One write per file segment; a batch that crosses max_bytes is split
+        # at a line boundary and the rest goes to a fresh file
+        size = self._file.tell()
+        chunk: List[bytes] = []
+        for line in lines:
+            if self.max_bytes and size + len(line) > self.max_bytes and size > 0:
+                self._file.write(b"".join(chunk))
+                self._file.close()
+                self._rotate()
+                self._file = open(self.path, "ab")
+                chunk, size = [], 0
+            chunk.append(line)
+            size += len(line)
+        self._file.write(b"".join(chunk))
+        self._file.flush()
+
+    def _rotate(self):
+        """app.log -> app.log.1 -> ... -> app.log.<backup_count>, dropping the oldest"""
+        if self.backup_count <= 0:
+            os.remove(self.path)
+            return
+        for index in range(self.backup_count - 1, 0, -1):
+            source = f"{self.path}.{index}"
+            if os.path.exists(source):
+                os.replace(source, f"{self.path}.{index + 1}")
+        os.replace(self.path, f"{self.path}.1")
+
+
+def configure_logging(level: str = "INFO", path: Optional[str] = None, console: bool = True,
+                      queue_size: int = 10_000, batch_size: int = 512, max_bytes: int = 10 * 1024 * 1024,
+                      backup_count: int = 5, sample_every: int = 10) -> BatchWriter:
+    """Route the root logger through the queue; returns the started writer"""
+    log_queue: queue.Queue = queue.Queue(maxsize=queue_size)
+    writer = BatchWriter(log_queue, path=path, console=console, max_bytes=max_bytes,
+                         backup_count=backup_count, batch_size=batch_size)
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(QueueingHandler(log_queue, sample_every=sample_every))
+    root.setLevel(level)
+    writer.start()
+    atexit.register(writer.stop)
+    return writer
@@ -2,22 +2,48 @@
 Main FastAPI Application
 Production-grade API server with monitoring and observability
 """
-from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import Response, HTMLResponse
-from fastapi.staticfiles import StaticFiles
+from fastapi import Depends, FastAPI, Header, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, HTMLResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from prometheus_client import Counter, Histogram, Gauge, generate_latest, CONTENT_TYPE_LATEST
+from pydantic import BaseModel, Field
+import asyncio
+import csv
+import io
 import time
 import random
 import logging
-from typing import Optional
+import uuid
+from typing import Callable, Dict, List, Optional
 from pathlib import Path
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from backend.app.admission import CRITICAL, HIGH, LOW, AdmissionController, AdmissionMiddleware
+from backend.app.assets import AssetCache, CachedStaticFiles
+from backend.app.cache import ResponseCache
+from backend.app.dependencies import DependencyChecker
+from backend.app.events import Broadcaster, format_event
+from backend.app.faults import FaultInjector, FaultRule, InjectedFault
+from backend.app.history import MetricsHistory
+from backend.app.logs import configure_logging, request_id_var
+from backend.app.metrics import (
+    ACTIVE_ORDERS, BATCH_ITEMS, CONTENT_TYPE_LATEST, ERROR_COUNT, MULTIPROC_DIR, REQUEST_COUNT,
+    REQUEST_DURATION, cleanup_dead_workers, create_stats_aggregator, render_metrics
+)
+from backend.app.ratelimit import RateLimit, RateLimitMiddleware, create_buckets
+from backend.app.responses import FastJSONResponse, dumps, etag, etag_matches, etag_version
+from backend.app.runtime import RuntimeMonitor
+from backend.app.store import MAX_QUANTITY, OrderNotFound, VersionConflict, create_store
+from backend.config import settings
+
+# Configure logging: JSON records, written off the event loop by a background thread
+log_writer = configure_logging(
+    level=settings.LOG_LEVEL,
+    path=settings.LOG_FILE,
+    console=settings.LOG_CONSOLE,
+    queue_size=settings.LOG_QUEUE_SIZE,
+    batch_size=settings.LOG_BATCH_SIZE,
+    max_bytes=settings.LOG_MAX_BYTES,
+    backup_count=settings.LOG_BACKUP_COUNT,
+    sample_every=settings.LOG_SAMPLE_EVERY
 )
 logger = logging.getLogger(__name__)
 
@@ -39,136 +65,285 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Prometheus Metrics
-REQUEST_COUNT = Counter(
-    'app_requests_total',
-    'Total request count',
-    ['method', 'endpoint', 'status']
-)
-REQUEST_DURATION = Histogram(
-    'app_request_duration_seconds',
-    'Request duration',
-    ['endpoint']
+# Running request/error totals for /api/stats (shared across workers in multiprocess mode)
+stats = create_stats_aggregator()
+# Downsampled per-process history for /api/stats/history charts
+history = MetricsHistory()
+# Event loop lag, GC pauses and threadpool/process gauges, started with the app
+runtime_monitor = RuntimeMonitor(
+    interval=settings.RUNTIME_SAMPLE_INTERVAL,
+    threshold=settings.SLOW_CALLBACK_THRESHOLD
 )
-ACTIVE_ORDERS = Gauge(
-    'app_active_orders',
-    'Number of active orders'
+
+
+def record_error(error_type: str):
+    """Count an application error in Prometheus, the stats aggregator and the history"""
+    ERROR_COUNT.labels(type=error_type).inc()
+    stats.record_error()
+    history.record_error()
+
+# Fault injection, applied to every routed request as an app-wide dependency
+fault_injector = FaultInjector(max_memory_mb=settings.FAULT_MAX_MEMORY_MB)
+
+async def inject_faults(request: Request):
+    """Apply any fault rules matching this request's route"""
+    if not fault_injector.rules:
+        return
+    route = request.scope["route"].path
+    if route.startswith("/admin/faults"):
+        return
+    try:
+        await fault_injector.apply(route, request.method)
+    except InjectedFault as exc:
+        record_error('injected')
+        raise HTTPException(status_code=exc.status_code, detail=str(exc))
+
+app.router.dependencies.append(Depends(inject_faults))
+
+# Order store (in-memory unless DATABASE_URL selects a persistent backend)
+order_store = create_store(
+    settings.DATABASE_URL,
+    pool_size=settings.DATABASE_POOL_SIZE,
+    max_batch=settings.DATABASE_WRITE_BATCH
 )
-ERROR_COUNT = Counter(
-    'app_errors_total',
-    'Total error count',
-    ['type']
+
+# Read responses are cached as rendered JSON and invalidated by every write.
+# The cache is per process, so orders are not cached when the store can be
+# shared with other workers or replicas: their writes could not invalidate them.
+response_cache = ResponseCache(max_bytes=settings.CACHE_MAX_BYTES, ttl=settings.CACHE_TTL)
+cache_orders = not order_store.shared
+
+async def cached_json(key, build, ttl: Optional[float] = None,
+                      headers: Optional[Callable[[dict], Dict[str, str]]] = None) -> Response:
+    """Serve ``key`` from the cache, or render ``await build()`` and cache it
+
+    ``headers`` derives extra response headers from the built content; they
+    are cached with the body.
+    """
+    cached = response_cache.get(key)
+    if cached is not None:
+        body, extra = cached
+        return Response(content=body, media_type="application/json", headers={**extra, "X-Cache": "HIT"})
+    version = response_cache.version
+    content = await build()
+    body, extra = dumps(content), headers(content) if headers else {}
+    if response_cache.version == version:
+        # Not cached if a write landed while building: it may predate it
+        response_cache.set(key, body, ttl, headers=extra)
+    return Response(content=body, media_type="application/json", headers={**extra, "X-Cache": "MISS"})
+
+# Order changes and stats snapshots pushed to dashboards over /events
+broadcaster = Broadcaster(
+    queue_size=settings.EVENTS_QUEUE_SIZE,
+    max_subscribers=settings.EVENTS_MAX_SUBSCRIBERS,
+    heartbeat=settings.EVENTS_HEARTBEAT,
+    max_age=settings.EVENTS_MAX_AGE
 )
 
-# In-memory data store
-orders_db = {}
-order_counter = 1
+def orders_changed(created: List[dict] = (), updated: List[dict] = (), deleted: List[int] = (),
+                   total: Optional[int] = None):
+    """Invalidate cached reads of changed orders and notify event subscribers"""
+    response_cache.invalidate("orders")
+    response_cache.invalidate("stats")
+    for order in updated:
+        response_cache.discard("order", order["id"])
+    for order_id in deleted:
+        response_cache.discard("order", order_id)
+    if total is not None:
+        history.set_active_orders(total)
+    broadcaster.orders_changed(created=created, updated=updated, deleted=deleted, total=total)
 
 # Pydantic Models
 class OrderCreate(BaseModel):
     product: str = "Unknown Product"
-    quantity: int = 1
+    quantity: int = Field(1, ge=0, le=MAX_QUANTITY)
     price: float = 99.99
 
 class OrderUpdate(BaseModel):
     status: Optional[str] = None
-    quantity: Optional[int] = None
+    quantity: Optional[int] = Field(None, ge=0, le=MAX_QUANTITY)
+
+class OrderBatchUpdateItem(OrderUpdate):
+    id: int
+    version: Optional[int] = Field(None, description="Only update if the order is still at this version")
+
+class OrderBatchCreate(BaseModel):
+    orders: List[OrderCreate] = Field(min_length=1, max_length=settings.BATCH_MAX_SIZE)
+
+class OrderBatchUpdate(BaseModel):
+    updates: List[OrderBatchUpdateItem] = Field(min_length=1, max_length=settings.BATCH_MAX_SIZE)
+
+class OrderBatchDelete(BaseModel):
+    ids: List[int] = Field(min_length=1, max_length=settings.BATCH_MAX_SIZE)
+
+# Label for requests that matched no route, so unknown paths share one series
+UNMATCHED_ENDPOINT = "unmatched"
+
+def endpoint_label(request: Request) -> str:
+    """Metric label for a request: its route template, never the raw path"""
+    route = request.scope.get("route")
+    if route is not None:
+        return route.path
+    if "endpoint" in request.scope:
+        # Mounted sub-apps (e.g. /static) extend root_path with their prefix
+        return request.scope["root_path"][len(request.scope.get("app_root_path", "")):]
+    return UNMATCHED_ENDPOINT
+
+# Admission control, inside the metrics middleware so shed requests are
+# counted. Probes, scrapes, event streams and fault administration are never
+# limited; order writes queue ahead of everything else.
+ADMISSION_EXEMPT = {"/health", "/health/live", "/health/ready", "/metrics", "/events"}
+
+def admission_priority(scope: dict) -> str:
+    path = scope["path"]
+    if path in ADMISSION_EXEMPT or path.startswith("/admin/faults"):
+        return CRITICAL
+    if scope["method"] != "GET" and path.startswith("/orders"):
+        return HIGH
+    return LOW
+
+admission = AdmissionController(
+    initial_limit=settings.ADMISSION_INITIAL_LIMIT,
+    min_limit=settings.ADMISSION_MIN_LIMIT,
+    max_limit=settings.ADMISSION_MAX_LIMIT,
+    queue_size=settings.ADMISSION_QUEUE_SIZE,
+    max_wait=settings.ADMISSION_MAX_WAIT,
+    tolerance=settings.ADMISSION_TOLERANCE
+)
+if settings.ADMISSION_ENABLED:
+    app.add_middleware(AdmissionMiddleware, controller=admission, priority=admission_priority, router=app.router)
+
+# Rate limiting, ahead of admission control so a client over its limit never
+# takes a slot or a queue place. Pages, static files, probes, scrapes and
+# event streams are not limited.
+def rate_limit_group(scope: dict) -> Optional[str]:
+    path = scope["path"]
+    if path.startswith("/orders"):
+        return "orders_read" if scope["method"] == "GET" else "orders_write"
+    if path == "/simulate-error":
+        return "simulate"
+    if path.startswith("/api"):
+        return "api"
+    return None
+
+rate_limit_buckets = create_buckets(settings.RATE_LIMIT_STORAGE_URL, max_clients=settings.RATE_LIMIT_MAX_CLIENTS)
+rate_limits = {group: RateLimit.parse(spec) for group, spec in settings.RATE_LIMITS.items()}
+rate_limit_api_keys = set(settings.RATE_LIMIT_API_KEYS)
+if settings.RATE_LIMIT_ENABLED:
+    app.add_middleware(
+        RateLimitMiddleware,
+        buckets=rate_limit_buckets,
+        limits=rate_limits,
+        group=rate_limit_group,
+        key_header=settings.RATE_LIMIT_KEY_HEADER,
+        api_keys=rate_limit_api_keys,
+        trust_forwarded=settings.RATE_LIMIT_TRUST_FORWARDED,
+        router=app.router
+    )
 
 # Middleware for metrics
 @app.middleware("http")
 async def metrics_middleware(request: Request, call_next):
     start_time = time.time()
-    response = await call_next(request)
+    # Tag every log record of this request; a caller-supplied ID is kept so
+    # logs can be joined across services
+    request_id = request.headers.get("x-request-id", "")[:128] or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
     duration = time.time() - start_time
+    response.headers["X-Request-ID"] = request_id
 
-    REQUEST_DURATION.labels(endpoint=request.url.path).observe(duration)
+    endpoint = endpoint_label(request)
+    REQUEST_DURATION.labels(endpoint=endpoint).observe(duration)
     REQUEST_COUNT.labels(
         method=request.method,
-        endpoint=request.url.path,
+        endpoint=endpoint,
         status=response.status_code
     ).inc()
+    stats.record_request()
+    history.record_request(duration)
 
     return response
 
 # Mount static files
+# Frontend files are read and compressed once; DEBUG re-checks mtimes per request
 static_path = Path(__file__).parent.parent.parent / "frontend" / "public"
-app.mount("/static", StaticFiles(directory=str(static_path)), name="static")
+assets = AssetCache(static_path, reload=settings.DEBUG)
+app.mount("/static", CachedStaticFiles(assets), name="static")
 
 # Routes
 @app.get("/", response_class=HTMLResponse)
-async def user_frontend():
+async def user_frontend(request: Request):
     """Serve user-facing e-commerce frontend"""
-    try:
-        html_path = static_path / "user.html"
-        with open(html_path, "r") as f:
-            return HTMLResponse(content=f.read())
-    except FileNotFoundError:
-        return {"error": "Frontend not found"}
+    return assets.response("user.html", request) or {"error": "Frontend not found"}
 
 @app.get("/admin", response_class=HTMLResponse)
-async def admin_dashboard():
+async def admin_dashboard(request: Request):
     """Serve admin dashboard (protected in production)"""
-    try:
-        html_path = static_path / "admin.html"
-        with open(html_path, "r") as f:
-            return HTMLResponse(content=f.read())
-    except FileNotFoundError:
-        return {"error": "Admin dashboard not found"}
+    return assets.response("admin.html", request) or {"error": "Admin dashboard not found"}
 
 @app.get("/sre", response_class=HTMLResponse)
-async def sre_dashboard():
+async def sre_dashboard(request: Request):
     """Serve SRE monitoring dashboard (protected in production)"""
-    try:
-        html_path = static_path / "sre.html"
-        with open(html_path, "r") as f:
-            return HTMLResponse(content=f.read())
-    except FileNotFoundError:
-        return {"error": "SRE dashboard not found"}
+    return assets.response("sre.html", request) or {"error": "SRE dashboard not found"}
 
 @app.get("/api")
 async def api_info():
     """API information endpoint"""
     logger.info("API info endpoint accessed")
-    return {
-        "name": "TechStore API",
-        "version": "3.0.0",
-        "status": "healthy",
-        "docs": "/docs",
-        "metrics": "/metrics"
-    }
+
+    async def build():
+        return {
+            "name": "TechStore API",
+            "version": "3.0.0",
+            "status": "healthy",
+            "docs": "/docs",
+            "metrics": "/metrics"
+        }
+    return await cached_json(response_cache.key("api"), build)
 
 @app.get("/api/stats")
 async def get_stats():
     """Get application statistics for dashboards"""
-    # Calculate metrics from Prometheus counters
-    import re
-    metrics_text = generate_latest().decode('utf-8')
-
-    # Parse metrics
-    request_count = 0
-    error_count = 0
-
-    for line in metrics_text.split('\n'):
-        if line.startswith('app_requests_total'):
-            match = re.search(r'} (\d+\.?\d*)', line)
-            if match:
-                request_count += float(match.group(1))
-        elif line.startswith('app_errors_total'):
-            match = re.search(r'} (\d+\.?\d*)', line)
-            if match:
-                error_count += float(match.group(1))
-
-    error_rate = (error_count / request_count * 100) if request_count > 0 else 0
+    # Request counters move constantly, so stats are only cached briefly to
+    # absorb many dashboards polling at once
+    return await cached_json(response_cache.key("stats"), stats_snapshot, ttl=settings.STATS_CACHE_TTL)
+
+@app.get("/api/stats/history")
+async def get_stats_history(
+    range_seconds: int = Query(900, alias="range", ge=1, le=history.retention(),
+                               description="Seconds of history, up to 24 hours"),
+    step: Optional[int] = Query(None, ge=1, le=history.retention(),
+                                description="Seconds per point; default gives about 60 points")
+):
+    """Request rate, error rate, latency quantiles and active orders over time"""
+    try:
+        return FastJSONResponse(history.query(range_seconds, step or max(1, range_seconds // 60)))
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc))
 
+async def stats_snapshot() -> dict:
     return {
-        "total_requests": int(request_count),
-        "total_errors": int(error_count),
-        "error_rate": round(error_rate, 2),
-        "active_orders": len(orders_db),
+        **stats.snapshot(),
+        "active_orders": await order_store.count(),
         "uptime_seconds": int(time.time() - app.state.start_time) if hasattr(app.state, 'start_time') else 0,
         "status": "healthy"
     }
 
+@app.get("/events")
+async def events():
+    """Stream order changes and stats snapshots to dashboards (Server-Sent Events)"""
+    if broadcaster.full:
+        raise HTTPException(status_code=503, detail="Too many event stream subscribers")
+    return StreamingResponse(
+        broadcaster.stream(format_event("stats", await stats_snapshot())),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # Store start time
 @app.on_event("startup")
 async def store_start_time():
@@ -179,79 +354,257 @@ async def health():
     """Health check endpoint for load balancers"""
     return {"status": "ok", "timestamp": time.time()}
 
+@app.get("/health/live")
+async def liveness():
+    """Liveness: the process is up and its event loop is serving requests"""
+    return {"status": "ok"}
+
+@app.get("/health/ready")
+async def readiness():
+    """Readiness: the order store answers in time; 503 takes the instance out of rotation"""
+    try:
+        await asyncio.wait_for(order_store.count(), settings.DEPENDENCY_TIMEOUT)
+    except Exception as exc:
+        logger.warning("Readiness check failed: %r", exc)
+        return JSONResponse({"status": "unavailable", "checks": {"store": type(exc).__name__}}, status_code=503)
+    return {"status": "ok", "checks": {"store": "ok"}}
+
+# External services, probed by the API on behalf of every dashboard
+dependency_checker = DependencyChecker(
+    {
+        "prometheus": settings.PROMETHEUS_URL and f"{settings.PROMETHEUS_URL}/-/healthy",
+        "grafana": settings.GRAFANA_URL and f"{settings.GRAFANA_URL}/api/health",
+        "node_exporter": settings.NODE_EXPORTER_URL and f"{settings.NODE_EXPORTER_URL}/metrics"
+    },
+    timeout=settings.DEPENDENCY_TIMEOUT,
+    ttl=settings.DEPENDENCY_CACHE_TTL
+)
+
+@app.get("/api/dependencies")
+async def dependencies():
+    """Health of external services, probed concurrently and cached for DEPENDENCY_CACHE_TTL"""
+    return await dependency_checker.check()
+
 @app.get("/metrics")
 async def metrics():
     """Prometheus metrics endpoint"""
-    return Response(content=generate_latest(), media_type=CONTENT_TYPE_LATEST)
+    return Response(content=render_metrics(), media_type=CONTENT_TYPE_LATEST)
 
 # Order CRUD Operations
 @app.get("/orders")
-async def get_orders():
-    """Get all orders"""
-    logger.info(f"Fetching all orders. Total: {len(orders_db)}")
-    return {
-        "orders": list(orders_db.values()),
-        "total": len(orders_db)
-    }
+async def get_orders(
+    limit: int = Query(settings.ORDERS_PAGE_SIZE, ge=1, le=settings.ORDERS_MAX_PAGE_SIZE),
+    cursor: Optional[int] = Query(None, description="Return orders after this order id"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status: Optional[str] = None,
+    product: Optional[str] = None,
+    created_after: Optional[float] = Query(None, description="Unix timestamp, inclusive"),
+    created_before: Optional[float] = Query(None, description="Unix timestamp, exclusive")
+):
+    """Get a page of orders, optionally filtered"""
+    async def build():
+        page = await order_store.list(
+            limit,
+            cursor=cursor,
+            descending=order == "desc",
+            status=status,
+            product=product,
+            created_after=created_after,
+            created_before=created_before
+        )
+        next_cursor = page[-1]["id"] if len(page) == limit else None
+        total = await order_store.count()
+        logger.info("Fetching orders page. Returned: %d Total: %d", len(page), total)
+        return {
+            "orders": page,
+            "total": total,
+            "next_cursor": next_cursor
+        }
+    if not cache_orders:
+        return FastJSONResponse(await build())
+    key = response_cache.key("orders", limit, cursor, order, status, product, created_after, created_before)
+    return await cached_json(key, build)
+
+# Columns of a CSV export, in order
+EXPORT_COLUMNS = ["id", "product", "quantity", "price", "status", "created_at", "updated_at", "version"]
+
+async def export_chunks(fmt: str, descending: bool, cursor: Optional[int], **filters):
+    """Encoded chunks of every matching order, read from the store one page at a time"""
+    if fmt == "csv":
+        yield (",".join(EXPORT_COLUMNS) + "\r\n").encode()
+    while True:
+        page = await order_store.list(settings.EXPORT_CHUNK_SIZE, cursor=cursor, descending=descending, **filters)
+        if not page:
+            return
+        if fmt == "csv":
+            buffer = io.StringIO()
+            csv.DictWriter(buffer, EXPORT_COLUMNS).writerows(page)
+            yield buffer.getvalue().encode()
+        else:
+            yield b"".join(dumps(order) + b"\n" for order in page)
+        # A short page is the last one; a cursor that does not move would repeat it forever
+        if len(page) < settings.EXPORT_CHUNK_SIZE or page[-1]["id"] == cursor:
+            return
+        cursor = page[-1]["id"]
+        # The memory store never awaits; let other requests run between chunks
+        await asyncio.sleep(0)
+
+@app.get("/orders/export")
+async def export_orders(
+    fmt: str = Query("ndjson", alias="format", pattern="^(ndjson|csv)$"),
+    cursor: Optional[int] = Query(None, description="Resume after this order id"),
+    order: str = Query("asc", pattern="^(asc|desc)$"),
+    status: Optional[str] = None,
+    product: Optional[str] = None,
+    created_after: Optional[float] = Query(None, description="Unix timestamp, inclusive"),
+    created_before: Optional[float] = Query(None, description="Unix timestamp, exclusive")
+):
+    """Stream all matching orders as NDJSON or CSV, in constant memory"""
+    logger.info("Exporting orders as %s from cursor %s", fmt, cursor)
+    return StreamingResponse(
+        export_chunks(fmt, order == "desc", cursor, status=status, product=product,
+                      created_after=created_after, created_before=created_before),
+        media_type="application/x-ndjson" if fmt == "ndjson" else "text/csv",
+        headers={"Content-Disposition": f"attachment; filename=orders.{fmt}"}
+    )
 
 @app.post("/orders", status_code=201)
 async def create_order(order: OrderCreate):
     """Create a new order"""
-    global order_counter
-
-    new_order = {
-        "id": order_counter,
-        "product": order.product,
-        "quantity": order.quantity,
-        "price": order.price,
-        "status": "pending",
-        "created_at": time.time()
-    }
-    orders_db[order_counter] = new_order
-    ACTIVE_ORDERS.set(len(orders_db))
-    logger.info(f"Order created: {order_counter} - {order.product}")
-    order_counter += 1
-    return new_order
+    new_order = await order_store.create(order.product, order.quantity, order.price)
+    total = await order_store.count()
+    ACTIVE_ORDERS.set(total)
+    orders_changed(created=[new_order], total=total)
+    logger.info("Order created: %s - %s", new_order['id'], order.product)
+    return FastJSONResponse(new_order, status_code=201, headers={"ETag": etag(new_order)})
+
+# Batch operations: one request, one validation pass and one store transaction
+@app.post("/orders:batch", status_code=201)
+async def create_orders_batch(batch: OrderBatchCreate):
+    """Create several orders atomically"""
+    orders = await order_store.create_many(
+        [(order.product, order.quantity, order.price) for order in batch.orders]
+    )
+    total = await order_store.count()
+    ACTIVE_ORDERS.set(total)
+    orders_changed(created=orders, total=total)
+    BATCH_ITEMS.labels(operation='create').observe(len(orders))
+    logger.info("Batch created %d orders", len(orders))
+    return FastJSONResponse({"orders": orders, "count": len(orders)}, status_code=201)
+
+@app.patch("/orders:batch")
+async def update_orders_batch(batch: OrderBatchUpdate):
+    """Update several orders atomically; nothing changes if any is missing"""
+    try:
+        orders = await order_store.update_many(
+            [(item.id, item.status, item.quantity) for item in batch.updates],
+            versions={item.id: item.version for item in batch.updates if item.version is not None}
+        )
+    except OrderNotFound as exc:
+        record_error('not_found')
+        raise HTTPException(status_code=404, detail=f"Orders not found: {exc.order_ids}")
+    except VersionConflict as exc:
+        record_error('conflict')
+        raise HTTPException(status_code=409, detail=f"Orders modified concurrently: {exc.order_ids}")
+
+    orders_changed(updated=orders)
+    BATCH_ITEMS.labels(operation='update').observe(len(orders))
+    logger.info("Batch updated %d orders", len(orders))
+    return FastJSONResponse({"orders": orders, "count": len(orders)})
+
+@app.delete("/orders:batch")
+async def delete_orders_batch(batch: OrderBatchDelete):
+    """Delete several orders atomically; nothing is deleted if any is missing"""
+    try:
+        deleted = await order_store.delete_many(batch.ids)
+    except OrderNotFound as exc:
+        record_error('not_found')
+        raise HTTPException(status_code=404, detail=f"Orders not found: {exc.order_ids}")
+
+    total = await order_store.count()
+    ACTIVE_ORDERS.set(total)
+    orders_changed(deleted=batch.ids, total=total)
+    BATCH_ITEMS.labels(operation='delete').observe(deleted)
+    logger.info("Batch deleted %d orders", deleted)
+    return {"message": "Orders deleted", "count": deleted}
+
+# Conditional requests: every order carries a version, exposed as its ETag.
+# If-Match on a write makes it fail with 412 instead of overwriting a change
+# made since the client read the order; If-None-Match on a read gives 304.
+# If-Match on an order that does not exist fails too, even ``*``.
+def if_match_version(if_match: Optional[str]) -> Optional[int]:
+    """Version required by an If-Match header; 412 if the header is malformed or weak"""
+    if if_match is None:
+        return None
+    try:
+        return etag_version(if_match)
+    except ValueError as exc:
+        record_error('precondition_failed')
+        raise HTTPException(status_code=412, detail=str(exc))
+
+def precondition_failed(order_id: int) -> HTTPException:
+    """412 for a write whose If-Match version is no longer current"""
+    record_error('precondition_failed')
+    logger.warning("Order modified concurrently: %s", order_id)
+    return HTTPException(status_code=412, detail="Order was modified since it was read")
 
 @app.get("/orders/{order_id}")
-async def get_order(order_id: int):
+async def get_order(order_id: int, if_none_match: Optional[str] = Header(None)):
     """Get a specific order"""
-    order = orders_db.get(order_id)
-    if not order:
-        ERROR_COUNT.labels(type='not_found').inc()
-        logger.warning(f"Order not found: {order_id}")
-        raise HTTPException(status_code=404, detail="Order not found")
-
-    logger.info(f"Fetching order: {order_id}")
-    return order
+    async def build():
+        order = await order_store.get(order_id)
+        if not order:
+            record_error('not_found')
+            logger.warning("Order not found: %s", order_id)
+            raise HTTPException(status_code=404, detail="Order not found")
+
+        logger.info("Fetching order: %s", order_id)
+        return order
+    if not cache_orders:
+        order = await build()
+        response = FastJSONResponse(order, headers={"ETag": etag(order)})
+    else:
+        response = await cached_json(response_cache.key("order", order_id), build,
+                                     headers=lambda order: {"ETag": etag(order)})
+    if if_none_match is not None and etag_matches(if_none_match, response.headers["ETag"]):
+        return Response(status_code=304, headers={"ETag": response.headers["ETag"]})
+    return response
 
 @app.put("/orders/{order_id}")
-async def update_order(order_id: int, order_update: OrderUpdate):
-    """Update an order"""
-    order = orders_db.get(order_id)
+async def update_order(order_id: int, order_update: OrderUpdate, if_match: Optional[str] = Header(None)):
+    """Update an order; with If-Match, only if it is still at that version"""
+    try:
+        order = await order_store.update(order_id, status=order_update.status, quantity=order_update.quantity,
+                                         version=if_match_version(if_match))
+    except VersionConflict:
+        raise precondition_failed(order_id)
+    if not order and if_match is not None:
+        raise precondition_failed(order_id)
     if not order:
-        ERROR_COUNT.labels(type='not_found').inc()
+        record_error('not_found')
         raise HTTPException(status_code=404, detail="Order not found")
 
-    if order_update.status:
-        order["status"] = order_update.status
-    if order_update.quantity:
-        order["quantity"] = order_update.quantity
-    order["updated_at"] = time.time()
-
-    logger.info(f"Order updated: {order_id}")
-    return order
+    orders_changed(updated=[order])
+    logger.info("Order updated: %s", order_id)
+    return FastJSONResponse(order, headers={"ETag": etag(order)})
 
 @app.delete("/orders/{order_id}")
-async def delete_order(order_id: int):
-    """Delete an order"""
-    if order_id not in orders_db:
-        ERROR_COUNT.labels(type='not_found').inc()
+async def delete_order(order_id: int, if_match: Optional[str] = Header(None)):
+    """Delete an order; with If-Match, only if it is still at that version"""
+    try:
+        deleted = await order_store.delete(order_id, version=if_match_version(if_match))
+    except VersionConflict:
+        raise precondition_failed(order_id)
+    if not deleted and if_match is not None:
+        raise precondition_failed(order_id)
+    if not deleted:
+        record_error('not_found')
         raise HTTPException(status_code=404, detail="Order not found")
 
-    del orders_db[order_id]
-    ACTIVE_ORDERS.set(len(orders_db))
-    logger.info(f"Order deleted: {order_id}")
+    total = await order_store.count()
+    ACTIVE_ORDERS.set(total)
+    orders_changed(deleted=[order_id], total=total)
+    logger.info("Order deleted: %s", order_id)
     return {"message": "Order deleted"}
 
 @app.get("/simulate-error")
@@ -261,32 +614,73 @@ async def simulate_error(error_type: Optional[str] = "random"):
         error_type = random.choice(['500', '404', 'timeout', 'validation'])
 
     if error_type == '500':
-        ERROR_COUNT.labels(type='internal_error').inc()
+        record_error('internal_error')
         logger.error("Simulated internal server error")
         raise HTTPException(status_code=500, detail="Internal server error")
 
     elif error_type == '404':
-        ERROR_COUNT.labels(type='not_found').inc()
+        record_error('not_found')
         logger.warning("Simulated not found error")
         raise HTTPException(status_code=404, detail="Resource not found")
 
     elif error_type == 'timeout':
-        ERROR_COUNT.labels(type='timeout').inc()
+        record_error('timeout')
         logger.warning("Simulating slow response")
-        time.sleep(5)
+        await asyncio.sleep(5)
         return {"message": "Slow response completed"}
 
     elif error_type == 'validation':
-        ERROR_COUNT.labels(type='validation').inc()
+        record_error('validation')
         logger.warning("Simulated validation error")
         raise HTTPException(status_code=400, detail="Validation failed")
 
     return {"message": "Unknown error type"}
 
+# Fault injection administration (protected in production)
+@app.get("/admin/faults")
+async def list_faults():
+    """List fault rules and currently held memory ballast"""
+    return fault_injector.describe()
+
+@app.put("/admin/faults/{name}")
+async def set_fault(name: str, rule: FaultRule):
+    """Create or replace a fault rule; takes effect on the next request"""
+    fault_injector.set_rule(name, rule)
+    logger.warning("Fault rule set: %s -> %s", name, rule.model_dump(exclude_defaults=True))
+    return {"name": name, "rule": rule.model_dump()}
+
+@app.delete("/admin/faults/{name}")
+async def delete_fault(name: str):
+    """Remove one fault rule"""
+    if not fault_injector.remove_rule(name):
+        raise HTTPException(status_code=404, detail="Fault rule not found")
+    logger.info("Fault rule removed: %s", name)
+    return {"message": "Fault rule removed"}
+
+@app.delete("/admin/faults")
+async def clear_faults():
+    """Remove every fault rule and release held memory"""
+    fault_injector.clear()
+    logger.info("All fault rules cleared")
+    return {"message": "All fault rules cleared"}
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     app.state.start_time = time.time()
+    if MULTIPROC_DIR:
+        cleaned = cleanup_dead_workers(MULTIPROC_DIR)
+        logger.info("Multiprocess metrics in %s (cleaned up %d exited workers)", MULTIPROC_DIR, len(cleaned))
+    total = await order_store.count()
+    ACTIVE_ORDERS.set(total)
+    history.set_active_orders(total)
+    app.state.event_task = asyncio.create_task(broadcaster.run(
+        stats_snapshot,
+        stats_interval=settings.EVENTS_STATS_INTERVAL,
+        flush_interval=settings.EVENTS_FLUSH_INTERVAL
+    ))
+    if settings.RUNTIME_METRICS_ENABLED:
+        runtime_monitor.start()
     logger.info("=" * 50)
     logger.info("TechStore API Starting...")
     logger.info(f"Version: 3.0.0")
@@ -298,3 +692,9 @@ async def startup_event():
 @app.on_event("shutdown")
 async def shutdown_event():
     logger.info("TechStore API Shutting down...")
+    app.state.event_task.cancel()
+    runtime_monitor.stop()
+    broadcaster.close()
+    await rate_limit_buckets.close()
+    await order_store.close()
+    log_writer.stop()
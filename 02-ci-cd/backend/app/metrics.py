@@ -0,0 +1,285 @@
+"""
+Prometheus Metrics
+Metric definitions and exposition, aggregated across workers in multiprocess mode
+
+Multiprocess mode is enabled the way prometheus_client expects: by setting
+PROMETHEUS_MULTIPROC_DIR to an empty, writable directory before the server
+starts. Each worker then writes its metrics to its own mmap-backed files in
+that directory, and /metrics merges them on scrape.
+"""
+import fcntl
+import glob
+import os
+import re
+from pathlib import Path
+from typing import Optional, Set
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, generate_latest, multiprocess
+)
+from prometheus_client.mmap_dict import MmapedDict, mmap_key
+
+from backend.app.stats import StatsAggregator, SharedStatsAggregator, merge_stats_files
+from backend.config import settings
+
+MULTIPROC_DIR: Optional[str] = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+# Per-worker files are named <type>[_<mode>]_<pid>.db (prometheus_client)
+# and stats_<pid>.bin (StatsAggregator); compacted leftovers use "archive".
+WORKER_FILE = re.compile(r"_(\d+)\.(db|bin)$")
+ARCHIVE = "archive"
+
+REQUEST_COUNT = Counter(
+    'app_requests_total',
+    'Total request count',
+    ['method', 'endpoint', 'status']
+)
+REQUEST_DURATION = Histogram(
+    'app_request_duration_seconds',
+    'Request duration',
+    ['endpoint']
+)
+# With a shared (SQLite) store every worker sees the same count, so the
+# newest value wins; with per-process memory stores, which ``memory://`` also
+# selects, each worker holds its own share. Same test as create_store.
+ACTIVE_ORDERS = Gauge(
+    'app_active_orders',
+    'Number of active orders',
+    multiprocess_mode='livemostrecent' if (settings.DATABASE_URL or "").startswith("sqlite:///") else 'livesum'
+)
+ERROR_COUNT = Counter(
+    'app_errors_total',
+    'Total error count',
+    ['type']
+)
+BATCH_ITEMS = Histogram(
+    'app_batch_items',
+    'Items per batch order request',
+    ['operation'],
+    buckets=(1, 5, 10, 50, 100, 250, 500, 1000)
+)
+LOG_RECORDS_DROPPED = Counter(
+    'app_log_records_dropped_total',
+    'Log records dropped or sampled out because the log queue was backed up',
+    ['level']
+)
+CACHE_HITS = Counter(
+    'app_cache_hits_total',
+    'Read responses served from the response cache',
+    ['namespace']
+)
+CACHE_MISSES = Counter(
+    'app_cache_misses_total',
+    'Read responses not in the response cache (or expired)',
+    ['namespace']
+)
+CACHE_EVICTIONS = Counter(
+    'app_cache_evictions_total',
+    'Response cache entries evicted to stay within the size limit',
+    ['namespace']
+)
+EVENT_SUBSCRIBERS = Gauge(
+    'app_event_subscribers',
+    'Clients connected to the /events stream',
+    multiprocess_mode='livesum'
+)
+EVENT_SUBSCRIBERS_DROPPED = Counter(
+    'app_event_subscribers_dropped_total',
+    'Event stream clients disconnected for falling behind'
+)
+EVENTS_PUBLISHED = Counter(
+    'app_events_published_total',
+    'Events fanned out to /events subscribers',
+    ['event']
+)
+ADMISSION_LIMIT = Gauge(
+    'app_admission_limit',
+    'Adaptive concurrency limit of the admission controller',
+    multiprocess_mode='livesum'
+)
+ADMISSION_IN_FLIGHT = Gauge(
+    'app_admission_in_flight',
+    'Requests holding an admission slot',
+    multiprocess_mode='livesum'
+)
+ADMISSION_QUEUED = Gauge(
+    'app_admission_queued',
+    'Requests waiting for an admission slot',
+    multiprocess_mode='livesum'
+)
+ADMISSION_QUEUE_WAIT = Histogram(
+    'app_admission_queue_wait_seconds',
+    'Time requests waited for an admission slot, admitted or not',
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+)
+ADMISSION_SHED = Counter(
+    'app_admission_shed_total',
+    'Requests rejected with 503 by the admission controller',
+    ['priority', 'reason']
+)
+RATE_LIMITED = Counter(
+    'app_rate_limited_total',
+    'Requests rejected with 429 by the rate limiter',
+    ['group']
+)
+RATE_LIMIT_CLIENTS = Gauge(
+    'app_rate_limit_clients',
+    'Client buckets held by the in-memory rate limiter',
+    multiprocess_mode='livesum'
+)
+RATE_LIMIT_BACKEND_ERRORS = Counter(
+    'app_rate_limit_backend_errors_total',
+    'Rate limit checks let through because the shared backend failed'
+)
+DEPENDENCY_PROBE_DURATION = Histogram(
+    'app_dependency_probe_duration_seconds',
+    'Duration of health probes of external dependencies',
+    ['dependency'],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+DEPENDENCY_UP = Gauge(
+    'app_dependency_up',
+    'Whether the last probe of an external dependency succeeded',
+    ['dependency'],
+    multiprocess_mode='livemostrecent'
+)
+EVENT_LOOP_LAG = Histogram(
+    'app_event_loop_lag_seconds',
+    'How late the event loop ran a timer due now: time other callbacks held the loop',
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+)
+EVENT_LOOP_BLOCKED = Counter(
+    'app_event_loop_blocked_total',
+    'Stalls of the event loop longer than SLOW_CALLBACK_THRESHOLD'
+)
+GC_COLLECTIONS = Counter(
+    'app_gc_collections_total',
+    'Garbage collections by generation',
+    ['generation']
+)
+GC_PAUSE = Histogram(
+    'app_gc_pause_seconds',
+    'Time the process was paused for garbage collection, by generation',
+    ['generation'],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25)
+)
+THREADPOOL_BUSY = Gauge(
+    'app_threadpool_busy_threads',
+    'Worker threads running blocking calls for the event loop',
+    multiprocess_mode='livesum'
+)
+THREADPOOL_QUEUED = Gauge(
+    'app_threadpool_queued_tasks',
+    'Blocking calls waiting for a free worker thread',
+    multiprocess_mode='livesum'
+)
+PROCESS_RSS = Gauge(
+    'app_process_resident_memory_bytes',
+    'Resident memory of the worker processes',
+    multiprocess_mode='livesum'
+)
+PROCESS_OPEN_FDS = Gauge(
+    'app_process_open_fds',
+    'Open file descriptors of the worker processes',
+    multiprocess_mode='livesum'
+)
+
+
+def create_stats_aggregator() -> StatsAggregator:
+    """Stats aggregator that covers every worker when in multiprocess mode"""
+    if MULTIPROC_DIR is None:
+        return StatsAggregator()
+    return SharedStatsAggregator(MULTIPROC_DIR)
+
+
+def render_metrics() -> bytes:
+    """Prometheus exposition for this process, or for all workers"""
+    if MULTIPROC_DIR is None:
+        return generate_latest()
+    cleanup_dead_workers(MULTIPROC_DIR)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=MULTIPROC_DIR)
+    return generate_latest(registry)
+
+
+def _is_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def cleanup_dead_workers(directory: str) -> Set[int]:
+    """Remove or compact the files of workers that have exited.
+
+    Live-mode gauge files are dropped so dead workers stop contributing to
+    app_active_orders. Counter, histogram and stats files are merged into
+    archive files so totals survive while the directory stops growing. Runs
+    under an exclusive, non-blocking lock; if another worker holds it this
+    call does nothing. Returns the pids cleaned up.
+    """
+    with open(os.path.join(directory, ".cleanup.lock"), "w") as lock:
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            return set()
+
+        pids = set()
+        for name in os.listdir(directory):
+            match = WORKER_FILE.search(name)
+            if match:
+                pids.add(int(match.group(1)))
+        dead = {pid for pid in pids if pid != os.getpid() and not _is_alive(pid)}
+
+        for pid in dead:
+            multiprocess.mark_process_dead(pid, directory)
+            for typ in ("counter", "histogram"):
+                _compact(directory, typ, os.path.join(directory, f"{typ}_{pid}.db"))
+            stats_file = Path(directory) / f"stats_{pid}.bin"
+            if stats_file.exists():
+                merge_stats_files([stats_file], Path(directory) / f"stats_{ARCHIVE}.bin")
+            # Anything left (e.g. non-live gauges) no longer reflects a worker
+            for path in glob.glob(os.path.join(directory, f"*_{pid}.db")):
+                os.remove(path)
+        return dead
+
+
+def _compact(directory: str, typ: str, dead_file: str):
+    """Fold one dead worker's file into the archive file of the same type"""
+    if not os.path.exists(dead_file):
+        return
+    archive = os.path.join(directory, f"{typ}_{ARCHIVE}.db")
+    files = [dead_file] + ([archive] if os.path.exists(archive) else [])
+    merged = multiprocess.MultiProcessCollector.merge(files, accumulate=False)
+
+    tmp = archive + ".tmp"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    out = MmapedDict(tmp)
+    try:
+        for metric in merged:
+            for sample in metric.samples:
+                key = mmap_key(
+                    metric.name, sample.name, list(sample.labels), list(sample.labels.values()),
+                    metric.documentation
+                )
+                out.write_value(key, sample.value, 0.0)
+    finally:
+        out.close()
+    os.replace(tmp, archive)
+    os.remove(dead_file)
+
+
+__all__ = [
+    "CONTENT_TYPE_LATEST", "REQUEST_COUNT", "REQUEST_DURATION", "ACTIVE_ORDERS", "ERROR_COUNT",
+    "BATCH_ITEMS", "LOG_RECORDS_DROPPED", "CACHE_HITS", "CACHE_MISSES", "CACHE_EVICTIONS",
+    "EVENT_SUBSCRIBERS", "EVENT_SUBSCRIBERS_DROPPED", "EVENTS_PUBLISHED", "ADMISSION_LIMIT",
+    "ADMISSION_IN_FLIGHT", "ADMISSION_QUEUED", "ADMISSION_QUEUE_WAIT", "ADMISSION_SHED", "RATE_LIMITED",
+    "RATE_LIMIT_CLIENTS", "RATE_LIMIT_BACKEND_ERRORS",
+    "DEPENDENCY_PROBE_DURATION", "DEPENDENCY_UP", "EVENT_LOOP_LAG", "EVENT_LOOP_BLOCKED", "GC_COLLECTIONS",
+    "GC_PAUSE", "THREADPOOL_BUSY", "THREADPOOL_QUEUED", "PROCESS_RSS", "PROCESS_OPEN_FDS", "MULTIPROC_DIR",
+    "create_stats_aggregator", "render_metrics", "cleanup_dead_workers"
+]
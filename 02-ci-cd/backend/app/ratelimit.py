@@ -0,0 +1,222 @@
+"""
+Rate Limiting
+Per-client token buckets per route group, kept in process memory or in Redis
+
+A client is identified by its API key (``X-API-Key``) if the key is on the
+configured allow-list, or else by its IP address: an arbitrary key must not
+buy a fresh bucket. Each route group has its own limit, written as ``"<requests>/<period>"``
+(e.g. ``"600/minute"``): a bucket holds up to that many tokens and refills
+continuously at that average rate, so clients may burst up to the limit and
+then sustain the rate. Buckets are refilled lazily when a request arrives,
+so taking a token is O(1) and idle clients cost nothing but their entry.
+
+The memory backend keeps client states in a bounded LRU; a client evicted
+while idle simply starts again with a full bucket. It is per process, so
+with several workers or replicas each enforces the limit on its own share.
+The Redis backend (``RATE_LIMIT_STORAGE_URL=redis://...``) runs the same
+bucket as an atomic script on the Redis server's clock, so the limit holds
+across replicas. If Redis is unreachable, requests are let through.
+
+Responses carry ``RateLimit-Limit``, ``RateLimit-Remaining``,
+``RateLimit-Reset`` and ``RateLimit-Policy`` headers (IETF httpapi
+RateLimit header fields); a limited request gets 429 with ``Retry-After``.
+"""
+import logging
+import math
+import time
+from collections import OrderedDict
+from typing import Callable, Collection, Dict, List, NamedTuple, Optional, Tuple
+
+from starlette.datastructures import MutableHeaders
+from starlette.responses import JSONResponse
+from starlette.routing import Router
+
+from backend.app.admission import match_route
+from backend.app.metrics import RATE_LIMIT_BACKEND_ERRORS, RATE_LIMIT_CLIENTS, RATE_LIMITED
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # redis is optional; only the shared backend needs it
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "s": 1, "minute": 60, "m": 60, "hour": 3600, "h": 3600}
+
+
+class RateLimit(NamedTuple):
+    """Bucket size and refill rate (tokens per second)"""
+    capacity: int
+    rate: float
+
+    @classmethod
+    def parse(cls, spec: str) -> "RateLimit":
+        """``"600/minute"`` -> 600 tokens, refilled at 10 per second"""
+        count, _, period = spec.partition("/")
+        period = period.strip()
+        seconds = PERIODS.get(period)
+        if seconds is None:
+            seconds = float(period) if period else 1
+        capacity = int(count)
+        if capacity < 1 or seconds <= 0:
+            raise ValueError(f"Invalid rate limit: {spec}")
+        return cls(capacity, capacity / seconds)
+
+    @property
+    def window(self) -> int:
+        """Seconds to refill an empty bucket"""
+        return math.ceil(self.capacity / self.rate)
+
+
+class MemoryBuckets:
+    """Token buckets in a bounded LRU of client states"""
+
+    def __init__(self, max_clients: int = 100_000, clock: Callable[[], float] = time.monotonic):
+        self.max_clients = max_clients
+        self.clock = clock
+        # key -> [tokens, refilled_at], least recently used first
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    async def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        """Take a token; returns whether one was available and the tokens left"""
+        now = self.clock()
+        state = self._buckets.get(key)
+        if state is None:
+            state = self._buckets[key] = [float(limit.capacity), now]
+            if len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            else:
+                RATE_LIMIT_CLIENTS.inc()
+        else:
+            self._buckets.move_to_end(key)
+            state[0] = min(limit.capacity, state[0] + (now - state[1]) * limit.rate)
+            state[1] = now
+        if state[0] >= 1:
+            state[0] -= 1
+            return True, state[0]
+        return False, state[0]
+
+    async def close(self):
+        pass
+
+
+# Refill and take in one round trip, atomically, on the Redis server's clock.
+# Keys expire once the bucket would be full again.
+TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or capacity
+local at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - at) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil((capacity - tokens) / rate * 1000) + 1000)
+return {allowed, tostring(tokens)}
+"""
+
+
+class RedisBuckets:
+    """Token buckets shared by every replica through Redis"""
+
+    def __init__(self, url: str, prefix: str = "ratelimit:", timeout: float = 0.05):
+        if redis is None:
+            raise RuntimeError("RATE_LIMIT_STORAGE_URL needs the redis package (pip install redis)")
+        self.prefix = prefix
+        self.client = redis.from_url(url, socket_timeout=timeout, socket_connect_timeout=timeout)
+        self._take = self.client.register_script(TAKE_SCRIPT)
+
+    async def take(self, key: str, limit: RateLimit) -> Tuple[bool, float]:
+        try:
+            allowed, tokens = await self._take(keys=[self.prefix + key], args=[limit.capacity, limit.rate])
+        except (redis.RedisError, OSError) as exc:
+            # Fail open: an outage of the limiter must not take the API down
+            RATE_LIMIT_BACKEND_ERRORS.inc()
+            logger.warning("Rate limit backend unavailable: %r", exc)
+            return True, float(limit.capacity)
+        return bool(allowed), float(tokens)
+
+    async def close(self):
+        await self.client.aclose()
+
+
+def create_buckets(storage_url: Optional[str] = None, max_clients: int = 100_000):
+    """Bucket backend selected by ``RATE_LIMIT_STORAGE_URL``: memory by default, or redis://"""
+    if not storage_url or storage_url.startswith("memory://"):
+        return MemoryBuckets(max_clients=max_clients)
+    if storage_url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBuckets(storage_url)
+    raise ValueError(f"Unsupported RATE_LIMIT_STORAGE_URL: {storage_url}")
+
+
+class RateLimitMiddleware:
+    """ASGI middleware taking a token per request from the client's bucket.
+
+    ``group`` maps a request's ASGI scope to a route group, or None for
+    requests that are never limited. Groups without a configured limit are
+    not limited either. Only keys in ``api_keys`` get a bucket of their own.
+    """
+
+    def __init__(self, app, buckets, limits: Dict[str, RateLimit], group: Callable[[dict], Optional[str]],
+                 key_header: str = "x-api-key", api_keys: Collection[str] = (), trust_forwarded: bool = False,
+                 router: Optional[Router] = None):
+        self.app = app
+        self.buckets = buckets
+        self.limits = limits
+        self.group = group
+        self.key_header = key_header.lower().encode()
+        self.api_keys = api_keys
+        self.trust_forwarded = trust_forwarded
+        self.router = router
+
+    def client_key(self, scope) -> str:
+        forwarded = None
+        for name, value in scope["headers"]:
+            if name == self.key_header and value.decode("latin-1") in self.api_keys:
+                return "key:" + value.decode("latin-1")
+            if name == b"x-forwarded-for" and self.trust_forwarded:
+                forwarded = value.decode("latin-1").split(",")[0].strip()
+        if forwarded:
+            return "ip:" + forwarded
+        client = scope.get("client")
+        return "ip:" + (client[0] if client else "unknown")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        group = self.group(scope)
+        limit = self.limits.get(group) if group is not None else None
+        if limit is None:
+            return await self.app(scope, receive, send)
+
+        allowed, tokens = await self.buckets.take(f"{group}:{self.client_key(scope)}", limit)
+        headers = {
+            "RateLimit-Limit": str(limit.capacity),
+            "RateLimit-Remaining": str(int(tokens)),
+            "RateLimit-Reset": str(math.ceil((limit.capacity - tokens) / limit.rate)),
+            "RateLimit-Policy": f"{limit.capacity};w={limit.window}"
+        }
+        if not allowed:
+            RATE_LIMITED.labels(group=group).inc()
+            match_route(self.router, scope)
+            headers["Retry-After"] = str(math.ceil((1 - tokens) / limit.rate))
+            response = JSONResponse({"detail": "Rate limit exceeded"}, status_code=429, headers=headers)
+            return await response(scope, receive, send)
+
+        async def send_with_headers(message):
+            if message["type"] == "http.response.start":
+                response_headers = MutableHeaders(scope=message)
+                for name, value in headers.items():
+                    response_headers.append(name, value)
+            await send(message)
+
+        await self.app(scope, receive, send_with_headers)
@@ -0,0 +1,59 @@
+"""
+JSON Responses
+Fast JSON encoding for order responses, using orjson when it is installed
+
+Routes that return a dict go through FastAPI's ``jsonable_encoder``, which
+walks and copies the whole structure before the stdlib encoder walks it
+again. Orders are already plain JSON types, so order routes return a
+``FastJSONResponse`` instead and the body is encoded in a single pass.
+"""
+import json
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder works too
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON; content must already be JSON types (dict, list, str, int, float, bool, None)"""
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with ``dumps``, skipping ``jsonable_encoder``"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def etag(order: dict) -> str:
+    """Strong ETag of an order: its version, quoted"""
+    return f'"{order["version"]}"'
+
+
+def etag_version(header: str) -> Optional[int]:
+    """Version named by an If-Match header: None for ``*``, ValueError if malformed or weak.
+
+    If-Match uses the strong comparison (RFC 9110 8.8.3.2), so a weak tag
+    never matches; only If-None-Match ignores the ``W/`` prefix.
+    """
+    header = header.strip()
+    if header == "*":
+        return None
+    if header.startswith("W/"):
+        raise ValueError("If-Match never matches a weak entity tag")
+    if len(header) < 3 or header[0] != '"' or header[-1] != '"':
+        raise ValueError("If-Match must be a single entity tag or *")
+    return int(header[1:-1])
+
+
+def etag_matches(header: str, tag: str) -> bool:
+    """Whether an If-None-Match header (``*`` or a list of tags) matches ``tag``"""
+    tags = [value.strip() for value in header.split(",")]
+    return "*" in tags or tag in tags or f"W/{tag}" in tags
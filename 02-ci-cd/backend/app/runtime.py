@@ -0,0 +1,142 @@
+"""
+Runtime Metrics
+Event loop lag, GC pauses, threadpool saturation and process resources, plus a stalled-loop watchdog
+
+Request latency shows that everything got slow; these metrics show why.
+A monitor task sleeps for ``interval`` and records how late it wakes up
+(event loop lag), then samples the threadpool and process gauges. GC pauses
+are timed through ``gc.callbacks``. A watchdog thread notices when the
+monitor is overdue by more than ``threshold``, meaning some callback is
+holding the loop, and logs the task and stack it is stuck in while it is
+still stuck.
+
+The cost is one wake-up per interval, a few reads of ``/proc`` and two
+callbacks per garbage collection, so it is meant to stay on in production.
+The GC callbacks only touch plain attributes: a collection can start while
+the same thread holds prometheus_client's (non-reentrant) multiprocess
+lock, so the metrics are updated from the monitor task instead.
+"""
+import asyncio
+import gc
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from typing import Optional
+
+import anyio.to_thread
+
+from backend.app.metrics import (
+    EVENT_LOOP_BLOCKED, EVENT_LOOP_LAG, GC_COLLECTIONS, GC_PAUSE, PROCESS_OPEN_FDS, PROCESS_RSS,
+    THREADPOOL_BUSY, THREADPOOL_QUEUED
+)
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+
+def resident_memory() -> Optional[int]:
+    """Resident set size in bytes, where /proc is available"""
+    try:
+        with open("/proc/self/statm", "rb") as statm:
+            return int(statm.read().split()[1]) * PAGE_SIZE
+    except (OSError, IndexError, ValueError):
+        return None
+
+
+def open_fds() -> Optional[int]:
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except OSError:
+        return None
+
+
+class RuntimeMonitor:
+    """Samples runtime metrics on the running event loop; ``start``/``stop`` with the app"""
+
+    def __init__(self, interval: float = 0.5, threshold: float = 0.1):
+        self.interval = interval
+        self.threshold = threshold
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+        self._deadline = 0.0  # when the monitor task should next wake up
+        self._gc_start = 0.0
+        self._gc_counts = [0] * len(gc.get_count())  # collections per generation
+        self._gc_published = list(self._gc_counts)
+        self._gc_pauses = deque(maxlen=4096)  # (generation, seconds) not yet observed
+
+    def start(self):
+        loop = asyncio.get_running_loop()
+        self._stopped = threading.Event()
+        self._deadline = time.monotonic() + self.interval
+        self._task = loop.create_task(self._run())
+        gc.callbacks.append(self._on_gc)
+        if self.threshold > 0:
+            self._watchdog = threading.Thread(
+                target=self._watch, args=(loop, threading.get_ident(), self._stopped),
+                name="loop-watchdog", daemon=True
+            )
+            self._watchdog.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+        if self._on_gc in gc.callbacks:
+            gc.callbacks.remove(self._on_gc)
+        self._publish_gc()
+
+    async def _run(self):
+        limiter = anyio.to_thread.current_default_thread_limiter()
+        while True:
+            self._deadline = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, time.monotonic() - self._deadline))
+            statistics = limiter.statistics()
+            THREADPOOL_BUSY.set(statistics.borrowed_tokens)
+            THREADPOOL_QUEUED.set(statistics.tasks_waiting)
+            rss, fds = resident_memory(), open_fds()
+            if rss is not None:
+                PROCESS_RSS.set(rss)
+            if fds is not None:
+                PROCESS_OPEN_FDS.set(fds)
+            self._publish_gc()
+
+    def _on_gc(self, phase: str, info: dict):
+        # Collections never overlap, so one start time is enough
+        if phase == "start":
+            self._gc_start = time.perf_counter()
+        else:
+            generation = info["generation"]
+            self._gc_counts[generation] += 1
+            self._gc_pauses.append((generation, time.perf_counter() - self._gc_start))
+
+    def _publish_gc(self):
+        """Move what the GC callbacks recorded into the metrics"""
+        for generation, count in enumerate(self._gc_counts):
+            if count > self._gc_published[generation]:
+                GC_COLLECTIONS.labels(generation=str(generation)).inc(count - self._gc_published[generation])
+                self._gc_published[generation] = count
+        while self._gc_pauses:
+            generation, pause = self._gc_pauses.popleft()
+            GC_PAUSE.labels(generation=str(generation)).observe(pause)
+
+    def _watch(self, loop: asyncio.AbstractEventLoop, loop_thread: int, stopped: threading.Event):
+        """Watchdog thread: report each stall of the loop once, while it lasts"""
+        reported = None
+        while not stopped.wait(self.threshold / 2):
+            deadline = self._deadline
+            overdue = time.monotonic() - deadline
+            if overdue <= self.threshold or deadline == reported:
+                continue
+            reported = deadline
+            EVENT_LOOP_BLOCKED.inc()
+            frame = sys._current_frames().get(loop_thread)
+            stack = "".join(traceback.format_stack(frame, limit=8)) if frame is not None else ""
+            logger.warning("Event loop blocked for %.0fms in %r\n%s", overdue * 1000,
+                           asyncio.current_task(loop), stack)
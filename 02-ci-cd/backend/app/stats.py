@@ -0,0 +1,176 @@
+"""
+Stats Aggregator
+Running request/error totals and windowed rates for the dashboards
+"""
+import mmap
+import os
+import time
+from array import array
+from pathlib import Path
+from typing import Callable, Dict, List
+
+# Rolling windows reported by /api/stats, in seconds
+WINDOWS = {"1m": 60, "5m": 300, "15m": 900}
+
+# Layout of the int64 buffer behind an aggregator: two running totals, then
+# the epoch, request count and error count of every bucket in the ring.
+TOTAL_REQUESTS = 0
+TOTAL_ERRORS = 1
+HEADER = 2
+
+
+def buffer_length(bucket_seconds: int) -> int:
+    """Number of int64 slots an aggregator with this bucket width needs"""
+    return HEADER + 3 * (max(WINDOWS.values()) // bucket_seconds)
+
+
+class StatsAggregator:
+    """Constant-cost request and error accounting.
+
+    Events are counted into fixed-width time buckets held in a ring covering
+    the largest window, so recording is O(1) and reading costs a pass over a
+    fixed number of buckets regardless of traffic or label cardinality.
+    Everything lives in one flat int64 buffer so it can be backed by shared
+    memory (see SharedStatsAggregator).
+    """
+
+    def __init__(self, bucket_seconds: int = 5, clock: Callable[[], float] = time.time, buffer=None):
+        self.bucket_seconds = bucket_seconds
+        self.clock = clock
+        self._size = max(WINDOWS.values()) // bucket_seconds
+        if buffer is None:
+            buffer = array('q', bytes(8 * buffer_length(bucket_seconds)))
+        self._values = memoryview(buffer).cast('B').cast('q')
+        self._epochs = HEADER
+        self._requests = HEADER + self._size
+        self._errors = HEADER + 2 * self._size
+
+    def _slot(self, now: float) -> int:
+        epoch = int(now // self.bucket_seconds)
+        slot = epoch % self._size
+        values = self._values
+        if values[self._epochs + slot] != epoch:
+            values[self._epochs + slot] = epoch
+            values[self._requests + slot] = 0
+            values[self._errors + slot] = 0
+        return slot
+
+    def record_request(self):
+        self._values[TOTAL_REQUESTS] += 1
+        self._values[self._requests + self._slot(self.clock())] += 1
+
+    def record_error(self):
+        self._values[TOTAL_ERRORS] += 1
+        self._values[self._errors + self._slot(self.clock())] += 1
+
+    def sources(self) -> List[memoryview]:
+        """Buffers whose counts are reported; only this process by default"""
+        return [self._values]
+
+    @property
+    def total_requests(self) -> int:
+        return sum(values[TOTAL_REQUESTS] for values in self.sources())
+
+    @property
+    def total_errors(self) -> int:
+        return sum(values[TOTAL_ERRORS] for values in self.sources())
+
+    def window_totals(self, seconds: int, sources: List[memoryview] = None) -> Dict[str, int]:
+        """Requests and errors seen in the trailing window"""
+        current = int(self.clock() // self.bucket_seconds)
+        oldest = current - seconds // self.bucket_seconds + 1
+        requests = errors = 0
+        for values in sources if sources is not None else self.sources():
+            for slot in range(self._size):
+                if oldest <= values[self._epochs + slot] <= current:
+                    requests += values[self._requests + slot]
+                    errors += values[self._errors + slot]
+        return {"requests": requests, "errors": errors}
+
+    def snapshot(self) -> dict:
+        sources = self.sources()
+        total_requests = sum(values[TOTAL_REQUESTS] for values in sources)
+        total_errors = sum(values[TOTAL_ERRORS] for values in sources)
+
+        request_rates = {}
+        error_rates = {}
+        for name, seconds in WINDOWS.items():
+            totals = self.window_totals(seconds, sources)
+            request_rates[name] = round(totals["requests"] / seconds, 3)
+            error_rates[name] = (
+                round(totals["errors"] / totals["requests"] * 100, 2) if totals["requests"] else 0
+            )
+
+        error_rate = (total_errors / total_requests * 100) if total_requests else 0
+        return {
+            "total_requests": total_requests,
+            "total_errors": total_errors,
+            "error_rate": round(error_rate, 2),
+            "request_rates": request_rates,
+            "error_rates": error_rates
+        }
+
+
+def map_stats_file(path: Path, bucket_seconds: int, writable: bool = False) -> mmap.mmap:
+    """Map a per-worker stats file, creating and sizing it if writable"""
+    size = 8 * buffer_length(bucket_seconds)
+    with open(path, "a+b" if writable else "rb") as f:
+        if writable and os.fstat(f.fileno()).st_size < size:
+            f.truncate(size)
+        return mmap.mmap(f.fileno(), size, access=mmap.ACCESS_WRITE if writable else mmap.ACCESS_READ)
+
+
+class SharedStatsAggregator(StatsAggregator):
+    """Stats aggregator for multi-worker servers.
+
+    Each worker writes only to its own memory-mapped ``stats_<pid>.bin`` in
+    the shared directory, so recording takes no cross-process lock. Reads
+    sum every worker's file, including those of exited workers, so totals
+    cover the whole server.
+    """
+
+    def __init__(self, directory: str, bucket_seconds: int = 5, clock: Callable[[], float] = time.time):
+        self.directory = Path(directory)
+        self._mapped: Dict[str, memoryview] = {}
+        own = map_stats_file(self.directory / f"stats_{os.getpid()}.bin", bucket_seconds, writable=True)
+        super().__init__(bucket_seconds, clock, buffer=own)
+
+    def sources(self) -> List[memoryview]:
+        names = {path.name for path in self.directory.glob("stats_*.bin")}
+        for name in list(self._mapped):
+            if name not in names:
+                del self._mapped[name]
+        for name in names - self._mapped.keys():
+            try:
+                mapped = map_stats_file(self.directory / name, self.bucket_seconds)
+            except (FileNotFoundError, ValueError):
+                # Removed by compaction, or not yet sized by its worker
+                continue
+            self._mapped[name] = memoryview(mapped).cast('B').cast('q')
+        return list(self._mapped.values())
+
+
+def merge_stats_files(paths: List[Path], into: Path, bucket_seconds: int = 5):
+    """Fold exited workers' stats files into ``into`` and delete them.
+
+    Totals are added; ring buckets are added when they cover the same time
+    and otherwise the newer bucket wins.
+    """
+    size = max(WINDOWS.values()) // bucket_seconds
+    epochs, requests, errors = HEADER, HEADER + size, HEADER + 2 * size
+    target = memoryview(map_stats_file(into, bucket_seconds, writable=True)).cast('B').cast('q')
+    for path in paths:
+        source = memoryview(map_stats_file(path, bucket_seconds)).cast('B').cast('q')
+        target[TOTAL_REQUESTS] += source[TOTAL_REQUESTS]
+        target[TOTAL_ERRORS] += source[TOTAL_ERRORS]
+        for slot in range(size):
+            if source[epochs + slot] == target[epochs + slot]:
+                target[requests + slot] += source[requests + slot]
+                target[errors + slot] += source[errors + slot]
+            elif source[epochs + slot] > target[epochs + slot]:
+                target[epochs + slot] = source[epochs + slot]
+                target[requests + slot] = source[requests + slot]
+                target[errors + slot] = source[errors + slot]
+        source.release()
+        path.unlink()
+    target.release()
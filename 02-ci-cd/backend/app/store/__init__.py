@@ -0,0 +1,28 @@
+"""Order storage backends"""
+from typing import Optional
+
+from backend.app.store.base import MAX_QUANTITY, OrderNotFound, OrderStore, VersionConflict
+from backend.app.store.memory import MemoryOrderStore
+from backend.app.store.sqlite import SQLiteOrderStore
+
+
+def create_store(database_url: Optional[str] = None, **options) -> OrderStore:
+    """Build the order store selected by ``DATABASE_URL``.
+
+    No URL (or ``memory://``) keeps orders in process memory;
+    ``sqlite:///relative/path.db`` and ``sqlite:////absolute/path.db`` use
+    SQLite. ``options`` are passed to the SQLite backend.
+    """
+    if not database_url or database_url.startswith("memory://"):
+        return MemoryOrderStore()
+    if database_url.startswith("sqlite:///"):
+        path = database_url[len("sqlite:///"):]
+        if not path or path == ":memory:":
+            raise ValueError("SQLite store needs a file path, e.g. sqlite:///data/orders.db")
+        return SQLiteOrderStore(path, **options)
+    raise ValueError(f"Unsupported DATABASE_URL: {database_url}")
+
+
+__all__ = [
+    "MAX_QUANTITY", "OrderNotFound", "OrderStore", "VersionConflict", "MemoryOrderStore", "SQLiteOrderStore", "create_store"
+]
@@ -0,0 +1,101 @@
+"""
+Order Store Interface
+Abstract base class implemented by every order storage backend
+"""
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Quantities are stored as signed 64-bit integers by every backend
+MAX_QUANTITY = 2 ** 63 - 1
+
+
+class OrderNotFound(KeyError):
+    """Raised by batch operations when some of the requested orders are missing"""
+
+    def __init__(self, order_ids: Iterable[int]):
+        self.order_ids = sorted(order_ids)
+        super().__init__(self.order_ids)
+
+
+class VersionConflict(Exception):
+    """Raised when orders changed since the version a write was based on"""
+
+    def __init__(self, order_ids: Iterable[int]):
+        self.order_ids = sorted(order_ids)
+        super().__init__(self.order_ids)
+
+
+class OrderStore(ABC):
+    """Storage backend for orders.
+
+    Orders are plain dicts with ``id``, ``product``, ``quantity``, ``price``,
+    ``status``, ``created_at``, ``version`` and, once modified,
+    ``updated_at``. Ids come from an atomic allocator (a counter that is
+    never read across an await, or a database sequence). ``version`` starts
+    at 1 and goes up with every update; writes that pass the version they
+    were based on fail with VersionConflict instead of overwriting a
+    concurrent change.
+    """
+
+    # Whether every process using the same configuration sees the same data
+    shared = False
+
+    @abstractmethod
+    async def count(self) -> int:
+        """Number of orders currently stored"""
+
+    @abstractmethod
+    async def get(self, order_id: int) -> Optional[dict]:
+        """Fetch one order, or None if it does not exist"""
+
+    @abstractmethod
+    async def create(self, product: str, quantity: int, price: float) -> dict:
+        """Create a pending order and return it"""
+
+    @abstractmethod
+    async def update(self, order_id: int, status: Optional[str] = None,
+                     quantity: Optional[int] = None, version: Optional[int] = None) -> Optional[dict]:
+        """Apply the given changes and return the order, or None if missing.
+
+        Raises VersionConflict if ``version`` is given and is not current.
+        """
+
+    @abstractmethod
+    async def delete(self, order_id: int, version: Optional[int] = None) -> bool:
+        """Delete an order, returning False if it did not exist.
+
+        Raises VersionConflict if ``version`` is given and is not current.
+        """
+
+    @abstractmethod
+    async def create_many(self, items: List[Tuple[str, int, float]]) -> List[dict]:
+        """Create pending orders from (product, quantity, price) tuples atomically"""
+
+    @abstractmethod
+    async def update_many(self, updates: List[Tuple[int, Optional[str], Optional[int]]],
+                          versions: Optional[Dict[int, int]] = None) -> List[dict]:
+        """Apply (order_id, status, quantity) updates atomically.
+
+        Raises OrderNotFound, changing nothing, if any order is missing, and
+        VersionConflict if any order's version differs from ``versions``.
+        """
+
+    @abstractmethod
+    async def delete_many(self, order_ids: List[int]) -> int:
+        """Delete orders atomically and return how many were deleted.
+
+        Raises OrderNotFound, deleting nothing, if any order is missing.
+        """
+
+    @abstractmethod
+    async def list(self, limit: int, cursor: Optional[int] = None, descending: bool = False,
+                   status: Optional[str] = None, product: Optional[str] = None,
+                   created_after: Optional[float] = None,
+                   created_before: Optional[float] = None) -> List[dict]:
+        """Return up to ``limit`` orders after ``cursor`` in id order.
+
+        ``created_after`` is inclusive and ``created_before`` exclusive.
+        """
+
+    async def close(self):
+        """Release any resources held by the backend"""
@@ -0,0 +1,391 @@
+"""
+In-Memory Order Store
+Columnar order storage with ordered secondary indexes for paginated listing
+"""
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress
+from typing import Dict, List, Optional, Tuple
+
+from backend.app.store.base import MAX_QUANTITY, OrderNotFound, OrderStore, VersionConflict
+
+
+class Interned:
+    """Bidirectional string <-> small int table for low-cardinality columns.
+
+    Codes are reference counted by the orders using them, so a value is
+    dropped (and its code reused) once no order has it any more.
+    """
+
+    def __init__(self):
+        self.values: List[Optional[str]] = []
+        self.codes: Dict[str, int] = {}
+        self.refs: List[int] = []
+        self._free: List[int] = []
+
+    def acquire(self, value: str) -> int:
+        """Code of ``value`` for one more order"""
+        code = self.codes.get(value)
+        if code is None:
+            if self._free:
+                code = self._free.pop()
+                self.values[code] = value
+            else:
+                code = len(self.values)
+                self.values.append(value)
+                self.refs.append(0)
+            self.codes[value] = code
+        self.refs[code] += 1
+        return code
+
+    def release(self, code: int) -> bool:
+        """One order less uses ``code``; True if that freed it"""
+        self.refs[code] -= 1
+        if self.refs[code]:
+            return False
+        del self.codes[self.values[code]]
+        self.values[code] = None
+        self._free.append(code)
+        return True
+
+
+class MemoryOrderStore(OrderStore):
+    """In-memory order store, local to the process.
+
+    Orders are stored column-wise in typed arrays that run parallel to the
+    sorted id index, so an order costs a few dozen bytes instead of a dict
+    with its own keys and boxed values; product and status are interned to
+    small integer codes. Order dicts are only built for the orders a call
+    returns. Because ids are allocated monotonically, new orders are
+    appended at the tail and an id is found by bisecting the id column.
+    Status and product have their own sorted id arrays so a filtered page can
+    be located with a bisect instead of a full scan, and ``created_at`` is
+    kept monotonic so time ranges map onto id ranges. None of the methods
+    await, so each operation is atomic on the event loop.
+
+    Deleting only marks a row dead: removing it from the middle of every
+    column would shift all later rows. Reads skip dead rows (``bytearray.find``
+    jumps over runs of them), and once they make up ``compact_ratio`` of the
+    rows the columns and indexes are rebuilt without them in one pass, so a
+    delete costs O(1) amortized however large the store is.
+    """
+
+    COLUMNS = ("_ids", "_created", "_updated", "_version", "_quantity", "_price", "_status", "_product")
+    compact_min = 1024  # dead rows always tolerated
+    compact_ratio = 0.25  # share of dead rows that triggers a compaction
+
+    def __init__(self):
+        self._ids = array('q')
+        self._created = array('d')
+        self._updated = array('d')  # 0.0 until the order is first updated
+        self._version = array('q')
+        self._quantity = array('q')
+        self._price = array('d')
+        self._status = array('I')
+        self._product = array('I')
+        self._statuses = Interned()
+        self._products = Interned()
+        self._by_status: Dict[int, array] = {}
+        self._by_product: Dict[int, array] = {}
+        self._alive = bytearray()  # 1 per live row, 0 per deleted row
+        self._dead = 0
+        self._next_id = 1
+        self._last_created = 0.0
+
+    async def count(self) -> int:
+        return len(self._ids) - self._dead
+
+    async def get(self, order_id: int) -> Optional[dict]:
+        pos = self._find(order_id)
+        return self._order(pos) if pos is not None else None
+
+    async def create(self, product: str, quantity: int, price: float) -> dict:
+        return self._order(self._create(product, quantity, price))
+
+    def _create(self, product: str, quantity: int, price: float) -> int:
+        # Convert every value before touching a column: a value an array
+        # rejects halfway through the appends would leave them misaligned
+        quantity, price = self._quantity_value(quantity), float(price)
+        order_id = self._next_id
+        self._next_id += 1
+
+        # Never let created_at go backwards so it stays ordered with the id
+        created_at = max(time.time(), self._last_created)
+        self._last_created = created_at
+
+        status = self._statuses.acquire("pending")
+        product_code = self._products.acquire(product)
+        self._ids.append(order_id)
+        self._created.append(created_at)
+        self._updated.append(0.0)
+        self._version.append(1)
+        self._quantity.append(quantity)
+        self._price.append(price)
+        self._status.append(status)
+        self._product.append(product_code)
+        self._alive.append(1)
+        self._by_status.setdefault(status, array('q')).append(order_id)
+        self._by_product.setdefault(product_code, array('q')).append(order_id)
+        return len(self._ids) - 1
+
+    async def update(self, order_id: int, status: Optional[str] = None,
+                     quantity: Optional[int] = None, version: Optional[int] = None) -> Optional[dict]:
+        if quantity:
+            quantity = self._quantity_value(quantity)
+        pos = self._find(order_id)
+        if pos is None:
+            return None
+        if version is not None and self._version[pos] != version:
+            raise VersionConflict([order_id])
+        return self._order(self._update(pos, status, quantity))
+
+    def _update(self, pos: int, status: Optional[str], quantity: Optional[int]) -> int:
+        order_id = self._ids[pos]
+        if status and self._statuses.codes.get(status) != self._status[pos]:
+            code = self._statuses.acquire(status)
+            self._unindex(self._by_status, self._status[pos], order_id)
+            if self._statuses.release(self._status[pos]):
+                self._by_status.pop(self._status[pos], None)  # only deleted ids are left in it
+            insort(self._by_status.setdefault(code, array('q')), order_id)
+            self._status[pos] = code
+        if quantity:
+            self._quantity[pos] = quantity
+        self._updated[pos] = time.time()
+        self._version[pos] += 1
+        return pos
+
+    async def delete(self, order_id: int, version: Optional[int] = None) -> bool:
+        pos = self._find(order_id)
+        if pos is None:
+            return False
+        if version is not None and self._version[pos] != version:
+            raise VersionConflict([order_id])
+        self._delete(pos)
+        self._maybe_compact()
+        return True
+
+    def _delete(self, pos: int):
+        # The row stays in the columns and its id in the indexes until the
+        # next compaction; _find no longer returns it
+        self._alive[pos] = 0
+        self._dead += 1
+        if self._statuses.release(self._status[pos]):
+            self._by_status.pop(self._status[pos], None)
+        if self._products.release(self._product[pos]):
+            self._by_product.pop(self._product[pos], None)
+
+    def _maybe_compact(self):
+        if self._dead > max(self.compact_min, len(self._ids) * self.compact_ratio):
+            self._compact()
+
+    def _compact(self):
+        """Rebuild the columns and indexes without dead rows"""
+        keep = self._alive
+        for name in self.COLUMNS:
+            column = getattr(self, name)
+            setattr(self, name, array(column.typecode, compress(column, keep)))
+        self._alive = bytearray(b"\x01") * len(self._ids)
+        self._dead = 0
+        self._by_status, self._by_product = {}, {}
+        for order_id, status, product in zip(self._ids, self._status, self._product):
+            self._by_status.setdefault(status, array('q')).append(order_id)
+            self._by_product.setdefault(product, array('q')).append(order_id)
+
+    async def create_many(self, items: List[Tuple[str, int, float]]) -> List[dict]:
+        items = [(product, self._quantity_value(quantity), float(price)) for product, quantity, price in items]
+        return [self._order(self._create(product, quantity, price)) for product, quantity, price in items]
+
+    async def update_many(self, updates: List[Tuple[int, Optional[str], Optional[int]]],
+                          versions: Optional[Dict[int, int]] = None) -> List[dict]:
+        updates = [(order_id, status, self._quantity_value(quantity) if quantity else quantity)
+                   for order_id, status, quantity in updates]
+        self._require([order_id for order_id, _, _ in updates])
+        if versions:
+            stale = {order_id for order_id, _, _ in updates
+                     if order_id in versions and self._version[self._find(order_id)] != versions[order_id]}
+            if stale:
+                raise VersionConflict(stale)
+        return [self._order(self._update(self._find(order_id), status, quantity))
+                for order_id, status, quantity in updates]
+
+    async def delete_many(self, order_ids: List[int]) -> int:
+        order_ids = list(dict.fromkeys(order_ids))
+        self._require(order_ids)
+        for order_id in order_ids:
+            self._delete(self._find(order_id))
+        self._maybe_compact()
+        return len(order_ids)
+
+    def _require(self, order_ids: List[int]):
+        missing = {order_id for order_id in order_ids if self._find(order_id) is None}
+        if missing:
+            raise OrderNotFound(missing)
+
+    @staticmethod
+    def _quantity_value(quantity: int) -> int:
+        quantity = int(quantity)
+        if not -MAX_QUANTITY - 1 <= quantity <= MAX_QUANTITY:
+            raise ValueError(f"Quantity out of range: {quantity}")
+        return quantity
+
+    def _find(self, order_id: int) -> Optional[int]:
+        """Position of an order in the columns, or None"""
+        pos = bisect_left(self._ids, order_id)
+        if pos < len(self._ids) and self._ids[pos] == order_id and self._alive[pos]:
+            return pos
+        return None
+
+    def _order(self, pos: int) -> dict:
+        return self._orders(slice(pos, pos + 1))[0]
+
+    def _orders(self, rows) -> List[dict]:
+        """Order dicts for a slice of positions, or a list of positions"""
+        if isinstance(rows, slice):
+            # Contiguous rows are read column by column, without per-row indexing
+            columns = (self._ids[rows], self._product[rows], self._quantity[rows], self._price[rows],
+                       self._status[rows], self._created[rows], self._version[rows], self._updated[rows])
+        else:
+            columns = ([column[pos] for pos in rows] for column in (
+                self._ids, self._product, self._quantity, self._price, self._status, self._created,
+                self._version, self._updated))
+        products, statuses = self._products.values, self._statuses.values
+        orders = []
+        for order_id, product, quantity, price, status, created_at, version, updated_at in zip(*columns):
+            order = {
+                "id": order_id,
+                "product": products[product],
+                "quantity": quantity,
+                "price": price,
+                "status": statuses[status],
+                "created_at": created_at,
+                "version": version
+            }
+            if updated_at:
+                order["updated_at"] = updated_at
+            orders.append(order)
+        return orders
+
+    async def list(self, limit: int, cursor: Optional[int] = None, descending: bool = False,
+                   status: Optional[str] = None, product: Optional[str] = None,
+                   created_after: Optional[float] = None,
+                   created_before: Optional[float] = None) -> List[dict]:
+        status_code = self._statuses.codes.get(status, -1) if status is not None else None
+        product_code = self._products.codes.get(product, -1) if product is not None else None
+        id_range = self._id_range(created_after, created_before)
+        if id_range is None:
+            return []
+        low_id, high_id = id_range
+        candidates = self._candidates(status_code, product_code)
+        positions = self._positions(candidates, cursor, descending, low_id, high_id)
+        if status_code is None and product_code is None:
+            return self._orders(self._run(positions.start, limit, descending, low_id, high_id))
+        return self._orders(self._scan(candidates, positions, limit, descending, low_id, high_id,
+                                       status_code, product_code))
+
+    def _candidates(self, status_code: Optional[int], product_code: Optional[int]):
+        """The smallest index applicable to the filters; the primary id column if none is"""
+        candidates = self._ids
+        if status_code is not None:
+            candidates = self._by_status.get(status_code, ())
+        if product_code is not None:
+            by_product = self._by_product.get(product_code, ())
+            if len(by_product) < len(candidates):
+                candidates = by_product
+        return candidates
+
+    def _id_range(self, created_after: Optional[float],
+                  created_before: Optional[float]) -> Optional[Tuple[Optional[int], Optional[int]]]:
+        """The created_at range as an inclusive (low, high) id range, or None if it is empty"""
+        low_id, high_id = None, None
+        if created_after is not None:
+            pos = bisect_left(self._created, created_after)
+            if pos == len(self._ids):
+                return None
+            low_id = self._ids[pos]
+        if created_before is not None:
+            pos = bisect_left(self._created, created_before)
+            if pos == 0:
+                return None
+            high_id = self._ids[pos - 1]
+        return low_id, high_id
+
+    @staticmethod
+    def _positions(candidates, cursor: Optional[int], descending: bool, low_id: Optional[int],
+                   high_id: Optional[int]) -> range:
+        """Positions in ``candidates`` after the cursor, in page order"""
+        if descending:
+            upper = cursor - 1 if cursor is not None else None
+            if high_id is not None and (upper is None or high_id < upper):
+                upper = high_id
+            end = bisect_right(candidates, upper) if upper is not None else len(candidates)
+            return range(end - 1, -1, -1)
+        lower = cursor + 1 if cursor is not None else None
+        if low_id is not None and (lower is None or low_id > lower):
+            lower = low_id
+        start = bisect_left(candidates, lower) if lower is not None else 0
+        return range(start, len(candidates))
+
+    def _scan(self, candidates, positions: range, limit: int, descending: bool, low_id: Optional[int],
+              high_id: Optional[int], status_code: Optional[int], product_code: Optional[int]) -> List[int]:
+        """Rows of a filtered page: candidates checked against the other filter until the page is full"""
+        rows = []
+        for pos in positions:
+            order_id = candidates[pos]
+            if descending and low_id is not None and order_id < low_id:
+                break
+            if not descending and high_id is not None and order_id > high_id:
+                break
+            row = self._find(order_id)
+            if row is None:  # deleted, awaiting compaction
+                continue
+            if status_code is not None and self._status[row] != status_code:
+                continue
+            if product_code is not None and self._product[row] != product_code:
+                continue
+            rows.append(row)
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def _run(self, start: int, limit: int, descending: bool, low_id: Optional[int],
+             high_id: Optional[int]):
+        """Rows of an unfiltered page: a contiguous run cut short by the created_at bound,
+        as a slice, or as a list of positions when there are dead rows to skip"""
+        if descending:
+            floor = bisect_left(self._ids, low_id) if low_id is not None else 0
+            if start < floor:  # nothing below the cursor or created_before bound
+                return slice(0, 0)
+            if not self._dead:
+                stop = max(start - limit, floor - 1)
+                return slice(start, stop if stop >= 0 else None, -1)
+            rows, pos = [], start
+            while len(rows) < limit:
+                pos = self._alive.rfind(1, floor, pos + 1)
+                if pos < 0:
+                    break
+                rows.append(pos)
+                pos -= 1
+            return rows
+        ceiling = bisect_right(self._ids, high_id) if high_id is not None else len(self._ids)
+        if not self._dead:
+            return slice(start, min(start + limit, ceiling))
+        rows, pos = [], start
+        while len(rows) < limit and pos < ceiling:
+            pos = self._alive.find(1, pos, ceiling)
+            if pos < 0:
+                break
+            rows.append(pos)
+            pos += 1
+        return rows
+
+    @staticmethod
+    def _unindex(index: Dict[int, array], key: int, order_id: int):
+        ids = index.get(key)
+        if not ids:
+            return
+        pos = bisect_left(ids, order_id)
+        if pos < len(ids) and ids[pos] == order_id:
+            del ids[pos]
+        if not ids:
+            del index[key]
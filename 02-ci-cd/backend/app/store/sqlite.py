@@ -0,0 +1,402 @@
+"""
+SQLite Order Store
+Persistent order storage shared by every worker and replica on the same volume
+"""
+import asyncio
+import queue
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fastapi.concurrency import run_in_threadpool
+
+from backend.app.store.base import OrderNotFound, OrderStore, VersionConflict
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    product TEXT NOT NULL,
+    quantity INTEGER NOT NULL,
+    price REAL NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL,
+    version INTEGER NOT NULL DEFAULT 1
+);
+CREATE INDEX IF NOT EXISTS idx_orders_status ON orders (status, id);
+CREATE INDEX IF NOT EXISTS idx_orders_product ON orders (product, id);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders (created_at);
+
+CREATE TABLE IF NOT EXISTS order_stats (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO order_stats (name, value) VALUES ('count', 0);
+
+CREATE TRIGGER IF NOT EXISTS orders_count_insert AFTER INSERT ON orders
+BEGIN
+    UPDATE order_stats SET value = value + 1 WHERE name = 'count';
+END;
+CREATE TRIGGER IF NOT EXISTS orders_count_delete AFTER DELETE ON orders
+BEGIN
+    UPDATE order_stats SET value = value - 1 WHERE name = 'count';
+END;
+"""
+
+COLUMNS = "id, product, quantity, price, status, created_at, updated_at, version"
+
+# Statements are constant strings so sqlite3's per-connection statement cache
+# keeps them prepared across calls.
+SELECT_COUNT = "SELECT value FROM order_stats WHERE name = 'count'"
+SELECT_ORDER = f"SELECT {COLUMNS} FROM orders WHERE id = ?"
+INSERT_ORDER = (
+    "INSERT INTO orders (product, quantity, price, status, created_at) "
+    "VALUES (?, ?, ?, 'pending', ?)"
+)
+# The version check happens in the same statement as the write, so two
+# writers based on the same version cannot both succeed
+UPDATE_ORDER = (
+    "UPDATE orders SET status = COALESCE(?, status), quantity = COALESCE(?, quantity), "
+    "updated_at = ?, version = version + 1 WHERE id = ? AND (? IS NULL OR version = ?)"
+)
+DELETE_ORDER = "DELETE FROM orders WHERE id = ? AND (? IS NULL OR version = ?)"
+SELECT_VERSION = "SELECT version FROM orders WHERE id = ?"
+
+
+def row_to_order(row) -> dict:
+    order = {
+        "id": row[0],
+        "product": row[1],
+        "quantity": row[2],
+        "price": row[3],
+        "status": row[4],
+        "created_at": row[5],
+        "version": row[7]
+    }
+    if row[6] is not None:
+        order["updated_at"] = row[6]
+    return order
+
+
+class ConnectionPool:
+    """Fixed-size pool of read connections, lazily opened.
+
+    Connections are only ever used from threadpool workers, so a caller
+    waiting for a free connection blocks a worker thread, not the event loop.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], size: int):
+        self._connect = connect
+        self._size = size
+        self._opened = 0
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                can_open = self._opened < self._size
+                if can_open:
+                    self._opened += 1
+            conn = self._connect() if can_open else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+
+
+class GroupCommitWriter(threading.Thread):
+    """Single writer thread that commits queued writes in batches.
+
+    Every write is a function of the connection. Writes that queue up while a
+    commit is in flight are applied together in one transaction, each inside
+    its own savepoint so one failure does not roll back its neighbours, and
+    share a single fsync.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection], max_batch: int):
+        super().__init__(name="sqlite-writer", daemon=True)
+        self._connect = connect
+        self._max_batch = max_batch
+        self._queue: "queue.SimpleQueue" = queue.SimpleQueue()
+
+    def submit(self, fn: Callable[[sqlite3.Connection], object]) -> "asyncio.Future":
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.put((fn, future, loop))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self.join()
+
+    def run(self):
+        conn = self._connect()
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            while len(batch) < self._max_batch:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._commit(conn, batch)
+        conn.close()
+
+    def _commit(self, conn: sqlite3.Connection, batch: list):
+        outcomes = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            for fn, future, loop in batch:
+                conn.execute("SAVEPOINT item")
+                try:
+                    outcomes.append((future, loop, fn(conn), None))
+                    conn.execute("RELEASE item")
+                except Exception as exc:
+                    conn.execute("ROLLBACK TO item")
+                    conn.execute("RELEASE item")
+                    outcomes.append((future, loop, None, exc))
+            conn.execute("COMMIT")
+        except sqlite3.Error as exc:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            outcomes = [(future, loop, None, exc) for _, future, loop in batch]
+
+        for future, loop, result, exc in outcomes:
+            try:
+                loop.call_soon_threadsafe(_resolve, future, result, exc)
+            except RuntimeError:
+                # The caller's event loop has already been closed
+                pass
+
+
+def _resolve(future: "asyncio.Future", result, exc: Optional[BaseException]):
+    if future.cancelled():
+        return
+    if exc is not None:
+        future.set_exception(exc)
+    else:
+        future.set_result(result)
+
+
+def _require(conn: sqlite3.Connection, order_ids: List[int], chunk: int = 500):
+    """Raise OrderNotFound unless every id exists; runs inside the write transaction"""
+    wanted = set(order_ids)
+    found = set()
+    ordered = list(wanted)
+    for start in range(0, len(ordered), chunk):
+        part = ordered[start:start + chunk]
+        placeholders = ",".join("?" * len(part))
+        found.update(row[0] for row in conn.execute(f"SELECT id FROM orders WHERE id IN ({placeholders})", part))
+    if found != wanted:
+        raise OrderNotFound(wanted - found)
+
+
+def _missed(conn: sqlite3.Connection, order_id: int) -> bool:
+    """After a write matched no row: False if the order is gone, raise if its version moved on"""
+    if conn.execute(SELECT_VERSION, (order_id,)).fetchone() is None:
+        return False
+    raise VersionConflict([order_id])
+
+
+class SQLiteOrderStore(OrderStore):
+    """SQLite-backed order store.
+
+    The database runs in WAL mode so readers never block the writer. Reads go
+    through a pool of connections on the threadpool; writes go through one
+    group-commit writer thread. The order count is maintained by triggers in
+    ``order_stats`` so it never needs a table scan.
+    """
+
+    shared = True
+
+    def __init__(self, path: str, pool_size: int = 4, max_batch: int = 256):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+
+        conn = self._open()
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(orders)")}
+            if "version" not in columns:
+                # Databases created before orders were versioned
+                conn.execute("ALTER TABLE orders ADD COLUMN version INTEGER NOT NULL DEFAULT 1")
+        finally:
+            conn.close()
+
+        self._readers = ConnectionPool(self._open_reader, pool_size)
+        self._writer = GroupCommitWriter(self._open, max_batch)
+        self._writer.start()
+
+    def _open(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            self.path,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=256
+        )
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        return conn
+
+    def _open_reader(self) -> sqlite3.Connection:
+        conn = self._open()
+        conn.execute("PRAGMA query_only=1")
+        return conn
+
+    async def _read(self, fn: Callable[[sqlite3.Connection], object]):
+        def run():
+            with self._readers.connection() as conn:
+                return fn(conn)
+        return await run_in_threadpool(run)
+
+    async def count(self) -> int:
+        return await self._read(lambda conn: conn.execute(SELECT_COUNT).fetchone()[0])
+
+    async def get(self, order_id: int) -> Optional[dict]:
+        row = await self._read(lambda conn: conn.execute(SELECT_ORDER, (order_id,)).fetchone())
+        return row_to_order(row) if row else None
+
+    async def create(self, product: str, quantity: int, price: float) -> dict:
+        created_at = time.time()
+
+        def write(conn):
+            return conn.execute(INSERT_ORDER, (product, quantity, price, created_at)).lastrowid
+
+        order_id = await self._writer.submit(write)
+        return {
+            "id": order_id,
+            "product": product,
+            "quantity": quantity,
+            "price": price,
+            "status": "pending",
+            "created_at": created_at,
+            "version": 1
+        }
+
+    async def update(self, order_id: int, status: Optional[str] = None,
+                     quantity: Optional[int] = None, version: Optional[int] = None) -> Optional[dict]:
+        def write(conn):
+            cursor = conn.execute(UPDATE_ORDER, (status or None, quantity or None, time.time(), order_id,
+                                                 version, version))
+            if cursor.rowcount == 0:
+                return _missed(conn, order_id)
+            return conn.execute(SELECT_ORDER, (order_id,)).fetchone()
+
+        row = await self._writer.submit(write)
+        return row_to_order(row) if row else None
+
+    async def delete(self, order_id: int, version: Optional[int] = None) -> bool:
+        def write(conn):
+            if conn.execute(DELETE_ORDER, (order_id, version, version)).rowcount > 0:
+                return True
+            return _missed(conn, order_id)
+
+        return await self._writer.submit(write)
+
+    async def create_many(self, items: List[Tuple[str, int, float]]) -> List[dict]:
+        created_at = time.time()
+
+        def write(conn):
+            return [conn.execute(INSERT_ORDER, (product, quantity, price, created_at)).lastrowid
+                    for product, quantity, price in items]
+
+        order_ids = await self._writer.submit(write)
+        return [
+            {
+                "id": order_id,
+                "product": product,
+                "quantity": quantity,
+                "price": price,
+                "status": "pending",
+                "created_at": created_at,
+                "version": 1
+            }
+            for order_id, (product, quantity, price) in zip(order_ids, items)
+        ]
+
+    async def update_many(self, updates: List[Tuple[int, Optional[str], Optional[int]]],
+                          versions: Optional[Dict[int, int]] = None) -> List[dict]:
+        versions = versions or {}
+
+        def write(conn):
+            _require(conn, [order_id for order_id, _, _ in updates])
+            stale = {order_id for order_id, _, _ in updates
+                     if order_id in versions and conn.execute(SELECT_VERSION, (order_id,)).fetchone()[0]
+                     != versions[order_id]}
+            if stale:
+                raise VersionConflict(stale)
+            now = time.time()
+            conn.executemany(UPDATE_ORDER, [
+                (status or None, quantity or None, now, order_id, None, None)
+                for order_id, status, quantity in updates
+            ])
+            return [conn.execute(SELECT_ORDER, (order_id,)).fetchone() for order_id, _, _ in updates]
+
+        rows = await self._writer.submit(write)
+        return [row_to_order(row) for row in rows]
+
+    async def delete_many(self, order_ids: List[int]) -> int:
+        order_ids = list(dict.fromkeys(order_ids))
+
+        def write(conn):
+            _require(conn, order_ids)
+            conn.executemany(DELETE_ORDER, [(order_id, None, None) for order_id in order_ids])
+            return len(order_ids)
+
+        return await self._writer.submit(write)
+
+    async def list(self, limit: int, cursor: Optional[int] = None, descending: bool = False,
+                   status: Optional[str] = None, product: Optional[str] = None,
+                   created_after: Optional[float] = None,
+                   created_before: Optional[float] = None) -> List[dict]:
+        clauses, params = [], []
+        if cursor is not None:
+            clauses.append("id < ?" if descending else "id > ?")
+            params.append(cursor)
+        if status is not None:
+            clauses.append("status = ?")
+            params.append(status)
+        if product is not None:
+            clauses.append("product = ?")
+            params.append(product)
+        if created_after is not None:
+            clauses.append("created_at >= ?")
+            params.append(created_after)
+        if created_before is not None:
+            clauses.append("created_at < ?")
+            params.append(created_before)
+
+        sql = f"SELECT {COLUMNS} FROM orders"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += f" ORDER BY id {'DESC' if descending else 'ASC'} LIMIT ?"
+        params.append(limit)
+
+        rows = await self._read(lambda conn: conn.execute(sql, params).fetchall())
+        return [row_to_order(row) for row in rows]
+
+    async def close(self):
+        await run_in_threadpool(self._writer.stop)
+        self._readers.close()
@@ -3,7 +3,7 @@ Application Configuration
 Centralized configuration management for all environments
 """
 import os
-from typing import Optional
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 
 
@@ -30,19 +30,78 @@ class Settings(BaseSettings):
     # Logging
     LOG_LEVEL: str = "INFO"
     LOG_FILE: Optional[str] = "logs/app.log"
+    LOG_CONSOLE: bool = True  # also write the JSON lines to stderr
+    LOG_QUEUE_SIZE: int = 10000
+    LOG_BATCH_SIZE: int = 512
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024  # rotate app.log past this size
+    LOG_BACKUP_COUNT: int = 5
+    LOG_SAMPLE_EVERY: int = 10  # keep 1 in N INFO/DEBUG records when the queue is backed up
 
-    # Database (for future expansion)
+    # Database: unset keeps orders in memory, sqlite:///data/orders.db persists them
     DATABASE_URL: Optional[str] = None
+    DATABASE_POOL_SIZE: int = 4
+    DATABASE_WRITE_BATCH: int = 256
 
-    # Cache
+    # Orders API
+    ORDERS_PAGE_SIZE: int = 100
+    ORDERS_MAX_PAGE_SIZE: int = 1000
+    BATCH_MAX_SIZE: int = 1000
+    EXPORT_CHUNK_SIZE: int = 1000  # orders read from the store per streamed chunk
+
+    # Fault injection
+    FAULT_MAX_MEMORY_MB: int = 512
+
+    # Cache: serialized read responses, invalidated by writes; 0 disables
     CACHE_TTL: int = 300  # 5 minutes
+    CACHE_MAX_BYTES: int = 64 * 1024 * 1024
+    STATS_CACHE_TTL: float = 1.0  # /api/stats counters move on every request
+
+    # Event stream (/events): per-client queue bound, then the client is dropped
+    EVENTS_QUEUE_SIZE: int = 64
+    EVENTS_MAX_SUBSCRIBERS: int = 1000
+    EVENTS_HEARTBEAT: float = 15.0
+    EVENTS_MAX_AGE: float = 300.0  # streams end after this long and clients reconnect; 0 = never
+    EVENTS_STATS_INTERVAL: float = 5.0
+    EVENTS_FLUSH_INTERVAL: float = 0.5  # order changes are batched per interval
+
+    # Admission control: adaptive concurrency limit, then a bounded queue, then 503
+    ADMISSION_ENABLED: bool = True
+    ADMISSION_INITIAL_LIMIT: int = 50
+    ADMISSION_MIN_LIMIT: int = 4
+    ADMISSION_MAX_LIMIT: int = 1000
+    ADMISSION_QUEUE_SIZE: int = 100
+    ADMISSION_MAX_WAIT: float = 0.5  # seconds a request may queue before it is shed
+    ADMISSION_TOLERANCE: float = 1.5  # latency growth over the long-term average tolerated
+
+    # Rate limiting: token bucket per client (API key or IP) and route group,
+    # as "<requests>/<second|minute|hour>"; groups left out are not limited
+    RATE_LIMIT_ENABLED: bool = True
+    RATE_LIMITS: Dict[str, str] = {
+        "orders_read": "3000/minute",
+        "orders_write": "600/minute",
+        "api": "600/minute",
+        "simulate": "60/minute"
+    }
+    RATE_LIMIT_STORAGE_URL: Optional[str] = None  # redis://host:6379/0 shares limits across replicas
+    RATE_LIMIT_MAX_CLIENTS: int = 100_000  # in-memory client states, least recently used evicted
+    RATE_LIMIT_KEY_HEADER: str = "X-API-Key"
+    RATE_LIMIT_API_KEYS: List[str] = []  # keys with their own bucket; other clients are keyed by IP
+    RATE_LIMIT_TRUST_FORWARDED: bool = False  # key on X-Forwarded-For (only behind a trusted proxy)
+
+    # Runtime metrics: event loop lag, GC pauses, threadpool and process gauges
+    RUNTIME_METRICS_ENABLED: bool = True
+    RUNTIME_SAMPLE_INTERVAL: float = 0.5  # seconds between loop lag samples
+    SLOW_CALLBACK_THRESHOLD: float = 0.1  # loop stalls longer than this are logged with their stack; 0 disables
 
     # Security
     SECRET_KEY: str = "your-secret-key-change-in-production"
 
-    # External Services
+    # External Services: probed by /api/dependencies; an empty URL is not probed
     PROMETHEUS_URL: str = "http://localhost:19090"
     GRAFANA_URL: str = "http://localhost:3000"
+    NODE_EXPORTER_URL: str = "http://localhost:9100"
+    DEPENDENCY_TIMEOUT: float = 2.0  # per probe, and for the readiness check
+    DEPENDENCY_CACHE_TTL: float = 15.0  # probe results are shared by every caller this long
 
     class Config:
         env_file = ".env"
@@ -0,0 +1,308 @@
+#!/usr/bin/env python3
+"""
+API Benchmark Suite
+Latency and throughput of the API hot paths, with a regression gate
+
+Each case runs a closed loop of --concurrency clients for --duration seconds
+(after a short warm-up) and reports throughput and p50/p99 latency:
+- create: POST /orders
+- get: GET /orders/{id}
+- list@N: GET /orders?limit=100 at a random cursor with N orders stored
+- metrics, stats: GET /metrics, GET /api/stats
+- health: GET /health, plus (in-process only) the same route on a bare app
+  with no middleware, so the middleware overhead can be read off the
+  difference in time per request
+
+The app runs in-process over ASGI (--target asgi, no network or server in
+the way) or as a uvicorn subprocess (--target uvicorn). Results can be saved
+as a JSON baseline and later runs compared against it; the run fails when a
+case's p99 or throughput regresses past the allowed threshold. With --repeat
+each case runs several times and the median of each figure is kept, so one
+noisy round on a shared runner does not decide the gate.
+
+Usage:
+  python benchmarks/bench_api.py --output baseline.json
+  python benchmarks/bench_api.py --target uvicorn --baseline baseline.json
+  python benchmarks/bench_api.py --quick --baseline baseline.json --gate-on throughput   # CI
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).parent.parent
+# Add project root to Python path for imports
+sys.path.insert(0, str(PROJECT_ROOT))
+
+# A benchmark is one client by design; keep the per-client rate limit out of
+# the way (the uvicorn target inherits this too)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "false")
+# Keep the app's per-request logging (it is part of the hot path) but write
+# it nowhere, so the terminal shows only results
+os.environ.setdefault("LOG_CONSOLE", "false")
+os.environ.setdefault("LOG_FILE", "")
+
+from backend.config import settings  # noqa: E402
+from loadgen.engine import LoadEngine  # noqa: E402
+from loadgen.report import RunReport  # noqa: E402
+
+PRODUCTS = ["Laptop", "Smartphone", "Headphones", "Monitor", "Keyboard"]
+PAGE_SIZE = 100
+
+
+class Target(ABC):
+    """Where requests go, and how the order store is filled before list cases"""
+
+    name = ""
+
+    @abstractmethod
+    def engine(self, concurrency: int) -> LoadEngine:
+        """Load engine sending requests to this target"""
+
+    @abstractmethod
+    async def seed(self, total: int):
+        """Grow the store to at least ``total`` orders"""
+
+    def close(self):
+        pass
+
+
+class AsgiTarget(Target):
+    """The app called in-process; orders are seeded straight into its store"""
+
+    name = "asgi"
+
+    def __init__(self):
+        from backend.app.main import app, order_store
+        self.app = app
+        self.store = order_store
+
+    def engine(self, concurrency: int, app=None) -> LoadEngine:
+        return LoadEngine("http://bench", max_connections=concurrency,
+                          transport=httpx.ASGITransport(app=app or self.app))
+
+    async def seed(self, total: int):
+        missing = total - await self.store.count()
+        while missing > 0:
+            chunk = min(missing, 10_000)
+            await self.store.create_many([(random.choice(PRODUCTS), 1, 9.99)] * chunk)
+            missing -= chunk
+
+
+class UvicornTarget(Target):
+    """A real uvicorn server in a subprocess; orders are seeded over HTTP"""
+
+    name = "uvicorn"
+
+    def __init__(self):
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+        self.url = f"http://127.0.0.1:{port}"
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "backend.app.main:app", "--port", str(port),
+             "--log-level", "warning", "--no-access-log"],
+            cwd=PROJECT_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                httpx.get(f"{self.url}/health").raise_for_status()
+                break
+            except httpx.HTTPError:
+                if self.process.poll() is not None or time.monotonic() > deadline:
+                    self.close()
+                    raise RuntimeError("uvicorn did not start")
+                time.sleep(0.2)
+
+    def engine(self, concurrency: int) -> LoadEngine:
+        return LoadEngine(self.url, max_connections=concurrency)
+
+    async def seed(self, total: int):
+        async with LoadEngine(self.url) as engine:
+            response = await engine.request("GET", "/orders", params={"limit": 1})
+            missing = total - response.json()["total"]
+            while missing > 0:
+                chunk = min(missing, settings.BATCH_MAX_SIZE)
+                orders = [{"product": random.choice(PRODUCTS), "quantity": 1, "price": 9.99}] * chunk
+                response = await engine.request("POST", "/orders:batch", json={"orders": orders})
+                response.raise_for_status()
+                missing -= chunk
+
+    def close(self):
+        self.process.terminate()
+        self.process.wait(timeout=10)
+
+
+async def measure(engine: LoadEngine, request, concurrency: int, duration: float, warmup: float) -> dict:
+    """Closed-loop run of ``request(engine)``; the warm-up is not counted"""
+    async def action(scheduled):
+        await request(engine)
+
+    async with engine:
+        await engine.run_closed_loop(concurrency, warmup, action)
+        engine.report = RunReport()
+        await engine.run_closed_loop(concurrency, duration, action)
+    summary = engine.report.summary()
+    if summary["errors"]:
+        raise RuntimeError(f"benchmark requests failed: {summary['statuses']}")
+    latency = summary["latency_ms"]["service"]
+    return {
+        "requests": summary["requests"],
+        "rps": round(summary["requests"] / duration, 1),
+        "p50_ms": latency["p50"],
+        "p99_ms": latency["p99"]
+    }
+
+
+def bare_app():
+    """The health route with none of the app's middleware"""
+    from fastapi import FastAPI
+    bare = FastAPI()
+
+    @bare.get("/health")
+    async def health():
+        return {"status": "ok", "timestamp": time.time(), "uptime": 0}
+
+    return bare
+
+
+async def run_cases(target: Target, sizes, concurrency: int, duration: float, warmup: float,
+                    repeat: int = 1) -> dict:
+    rng = random.Random(0)
+    results = {}
+
+    async def case(name, request, **engine_options):
+        rounds = [await measure(target.engine(concurrency, **engine_options), request,
+                                concurrency, duration, warmup) for _ in range(repeat)]
+        results[name] = {key: statistics.median(measured[key] for measured in rounds) for key in rounds[0]}
+        print(f"{name:<16} {results[name]['rps']:>10,.0f}/s  p50={results[name]['p50_ms']:>8.3f}ms  "
+              f"p99={results[name]['p99_ms']:>8.3f}ms")
+
+    await target.seed(sizes[0])
+    await case("create", lambda e: e.request(
+        "POST", "/orders", json={"product": rng.choice(PRODUCTS), "quantity": 1, "price": 9.99}
+    ))
+    await case("get", lambda e: e.request(
+        "GET", f"/orders/{rng.randint(1, sizes[0])}", endpoint="/orders/{order_id}"
+    ))
+    await case("metrics", lambda e: e.request("GET", "/metrics"))
+    await case("stats", lambda e: e.request("GET", "/api/stats"))
+    await case("health", lambda e: e.request("GET", "/health"))
+    if isinstance(target, AsgiTarget):
+        await case("health (bare)", lambda e: e.request("GET", "/health"), app=bare_app())
+
+    for size in sizes:
+        await target.seed(size)
+        await case(f"list@{size}", lambda e, size=size: e.request(
+            "GET", "/orders", params={"limit": PAGE_SIZE, "cursor": rng.randint(0, max(size - PAGE_SIZE, 0))}
+        ))
+    return results
+
+
+def compare(results: dict, baseline: dict, max_p99: float, max_throughput: float,
+            gate_on=("p99", "throughput")) -> list:
+    """Cases whose p99 or throughput regressed past the thresholds; only ``gate_on`` fails a case"""
+    regressions = []
+    for name, base in baseline["cases"].items():
+        current = results["cases"].get(name)
+        if current is None:
+            continue
+        p99_change = current["p99_ms"] / base["p99_ms"] - 1 if base["p99_ms"] else 0.0
+        rps_change = current["rps"] / base["rps"] - 1 if base["rps"] else 0.0
+        flag = ""
+        if p99_change > max_p99:
+            flag += " p99"
+        if rps_change < -max_throughput:
+            flag += " throughput"
+        failed = any(metric in flag for metric in gate_on)
+        print(f"{name:<16} p99 {base['p99_ms']:>8.3f} -> {current['p99_ms']:>8.3f}ms ({p99_change:+.0%})  "
+              f"rps {base['rps']:>9,.0f} -> {current['rps']:>9,.0f} ({rps_change:+.0%})"
+              + (f"  {'❌' if failed else '⚠️'}{flag}" if flag else ""))
+        if failed:
+            regressions.append(name)
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the API hot paths and gate on regressions')
+    parser.add_argument('--target', choices=['asgi', 'uvicorn'], default='asgi',
+                        help='In-process ASGI app or a uvicorn subprocess (default: asgi)')
+    parser.add_argument('--sizes', default='1000,100000,1000000',
+                        help='Store sizes for the list cases (default: 1000,100000,1000000)')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients (default: 8)')
+    parser.add_argument('--duration', type=float, default=3.0, help='Seconds per case (default: 3)')
+    parser.add_argument('--warmup', type=float, default=0.5, help='Uncounted seconds per case (default: 0.5)')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='Runs per case; the median of each figure is kept (default: 1)')
+    parser.add_argument('--quick', action='store_true',
+                        help='CI preset: sizes 1000,100000, 1s per case, 0.2s warm-up, 3 runs per case')
+    parser.add_argument('--output', metavar='PATH', help='Write results as JSON (e.g. to save a baseline)')
+    parser.add_argument('--baseline', metavar='PATH', help='Compare against a saved baseline and gate on it')
+    parser.add_argument('--max-p99-regression', type=float, default=0.3,
+                        help='Allowed relative p99 increase per case (default: 0.3)')
+    parser.add_argument('--max-throughput-regression', type=float, default=0.2,
+                        help='Allowed relative throughput drop per case (default: 0.2)')
+    parser.add_argument('--gate-on', default='p99,throughput',
+                        help='Regressions that fail the run; the others are only reported (default: p99,throughput)')
+    args = parser.parse_args()
+    if args.quick:
+        args.sizes, args.duration, args.warmup, args.repeat = '1000,100000', 1.0, 0.2, 3
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    target = AsgiTarget() if args.target == 'asgi' else UvicornTarget()
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    try:
+        cases = asyncio.run(run_cases(target, sizes, args.concurrency, args.duration, args.warmup, args.repeat))
+    finally:
+        target.close()
+
+    results = {
+        "target": target.name,
+        "python": platform.python_version(),
+        "concurrency": args.concurrency,
+        "duration": args.duration,
+        "repeat": args.repeat,
+        "cases": cases
+    }
+    if "health (bare)" in cases:
+        # In-process, everything shares one event loop, so time per request
+        # (1 / throughput) is CPU cost; latency would also include queueing
+        # behind the other clients, which the bare app never yields to.
+        results["middleware_overhead_ms"] = round(
+            1000 / cases["health"]["rps"] - 1000 / cases["health (bare)"]["rps"], 3
+        )
+        print(f"\nMiddleware overhead: {results['middleware_overhead_ms']:.3f}ms of CPU per request")
+
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        if baseline.get("target") != results["target"]:
+            print(f"❌ Baseline is for target {baseline.get('target')}, not {results['target']}")
+            sys.exit(1)
+        print(f"\nAgainst {args.baseline}:")
+        regressions = compare(results, baseline, args.max_p99_regression, args.max_throughput_regression,
+                              args.gate_on.split(','))
+        if regressions:
+            print(f"❌ Performance regressed: {', '.join(regressions)}")
+            sys.exit(1)
+        print("✅ No performance regressions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""
+Order Memory Benchmark
+Reports bytes per order held by the in-memory store, against one dict per order
+
+The dict layout rebuilds what the store kept before orders were stored
+column-wise: a dict per order keyed by id, plus the sorted id, created_at,
+status and product index lists.
+
+Usage:
+  python benchmarks/bench_memory.py --orders 1000000
+"""
+import argparse
+import bisect
+import gc
+import random
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+# Add project root to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.store import MemoryOrderStore  # noqa: E402
+
+PRODUCTS = ["Laptop", "Smartphone", "Headphones", "Monitor", "Keyboard",
+            "Mouse", "Webcam", "Tablet", "Smartwatch", "Speaker"]
+
+
+def dict_layout(items):
+    """One dict per order, as the store used to hold them"""
+    orders, ids, created, by_status, by_product = {}, [], [], {}, {}
+    for order_id, (product, quantity, price) in enumerate(items, start=1):
+        order = {
+            "id": order_id,
+            "product": product,
+            "quantity": quantity,
+            "price": price,
+            "status": "pending",
+            "created_at": time.time()
+        }
+        orders[order_id] = order
+        ids.append(order_id)
+        created.append(order["created_at"])
+        by_status.setdefault("pending", []).append(order_id)
+        by_product.setdefault(product, []).append(order_id)
+
+    def update(order_id):
+        order = orders[order_id]
+        pending = by_status[order["status"]]
+        del pending[bisect.bisect_left(pending, order_id)]
+        bisect.insort(by_status.setdefault("shipped", []), order_id)
+        order["status"] = "shipped"
+        order["updated_at"] = time.time()
+    return (orders, ids, created, by_status, by_product), update
+
+
+def columnar_layout(items):
+    """The current MemoryOrderStore"""
+    store = MemoryOrderStore()
+    for product, quantity, price in items:
+        store._create(product, quantity, price)
+
+    def update(order_id):
+        store._update(store._find(order_id), "shipped", None)
+    return store, update
+
+
+def measure(layout, items, updated):
+    """Bytes per order after creating ``items``, then after updating some of them"""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held, update = layout(items)
+    created = tracemalloc.get_traced_memory()[0] - before
+    for order_id in updated:
+        update(order_id)
+    after_updates = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return created / len(items), after_updates / len(items)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure memory per stored order')
+    parser.add_argument('--orders', type=int, default=1_000_000, help='Orders to store (default: 1000000)')
+    parser.add_argument('--updated', type=float, default=0.1,
+                        help='Fraction of orders (the newest) updated in the second measurement (default: 0.1)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    # Prices are drawn up front so both layouts hold equal (but distinct) floats
+    items = [(rng.choice(PRODUCTS), rng.randint(1, 5), round(rng.uniform(10, 1000), 2))
+             for _ in range(args.orders)]
+    # Recent orders are the ones that get shipped; updating them in id order
+    # keeps index maintenance at the tail of the status indexes
+    updated = range(args.orders - int(args.orders * args.updated) + 1, args.orders + 1)
+
+    print(f"{args.orders:,} orders, {len(updated):,} updated")
+    print(f"{'layout':<12}{'bytes/order':>14}{'after updates':>16}")
+    results = {}
+    for name, layout in (("dicts", dict_layout), ("columnar", columnar_layout)):
+        results[name] = measure(layout, items, updated)
+        created, after_updates = results[name]
+        print(f"{name:<12}{created:>14.1f}{after_updates:>16.1f}")
+    print(f"columnar uses {results['columnar'][1] / results['dicts'][1]:.0%} of the dict layout's memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Metrics Cardinality Benchmark
+Checks that /metrics scrape size stays flat as distinct order IDs are requested
+
+Requests go straight through the ASGI app (no network), cycling through
+/orders/{id}, /static/* and unknown paths with a new id every time. The
+scrape size is sampled at checkpoints; the run fails if it keeps growing.
+The default 1M requests takes several minutes.
+
+Usage:
+  python benchmarks/bench_metrics_cardinality.py --requests 1000000
+"""
+import argparse
+import asyncio
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from prometheus_client import generate_latest  # noqa: E402
+
+from backend.app.main import app  # noqa: E402
+
+
+async def call(path: str) -> int:
+    """Send one GET through the ASGI app and return the status code"""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    status = 0
+    request_sent = False
+
+    async def receive():
+        nonlocal request_sent
+        if request_sent:
+            # Nothing more to read; the client stays connected until cancelled
+            await asyncio.Event().wait()
+        request_sent = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+
+    await app(scope, receive, send)
+    return status
+
+
+async def run(total: int, checkpoints: int):
+    paths = ("/orders/{}", "/static/missing-{}.js", "/unknown/{}")
+    step = max(total // checkpoints, 1)
+    sizes = []
+    start = time.perf_counter()
+    for i in range(1, total + 1):
+        await call(paths[i % len(paths)].format(i))
+        if i % step == 0:
+            size = len(generate_latest())
+            sizes.append(size)
+            rate = i / (time.perf_counter() - start)
+            print(f"{i:>10} requests  scrape={size:>8} bytes  ({rate:,.0f} req/s)")
+    return sizes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check /metrics size stays flat under distinct paths')
+    parser.add_argument('--requests', type=int, default=1_000_000, help='Requests to send (default: 1000000)')
+    parser.add_argument('--checkpoints', type=int, default=10, help='Scrape size samples (default: 10)')
+    parser.add_argument('--tolerance', type=float, default=0.05,
+                        help='Allowed relative growth after the first checkpoint (default: 0.05)')
+    args = parser.parse_args()
+
+    # Not-found warnings for every request would dominate the run
+    logging.disable(logging.WARNING)
+
+    sizes = asyncio.run(run(args.requests, args.checkpoints))
+    growth = (sizes[-1] - sizes[0]) / sizes[0]
+    print(f"\nScrape size growth after first checkpoint: {growth:.2%}")
+    if growth > args.tolerance:
+        print("❌ /metrics size keeps growing with distinct paths")
+        sys.exit(1)
+    print("✅ /metrics size is bounded")
+
+
+if __name__ == "__main__":
+    main()
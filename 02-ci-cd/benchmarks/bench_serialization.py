@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Serialization Benchmark
+Cost of turning stored orders into a JSON response body, per encoding path
+
+Paths:
+  fastapi     jsonable_encoder + JSONResponse, what returning a dict costs
+  json        stdlib encoder without jsonable_encoder
+  fast        backend.app.responses.dumps (orjson when installed)
+  store+fast  building the order dicts from the store's columns, then ``fast``
+
+Usage:
+  python benchmarks/bench_serialization.py --orders 10000
+"""
+import argparse
+import asyncio
+import random
+import sys
+import time
+from pathlib import Path
+
+# Add project root to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+
+from backend.app.responses import dumps, orjson  # noqa: E402
+from backend.app.store import MemoryOrderStore  # noqa: E402
+
+PRODUCTS = ["Laptop", "Smartphone", "Headphones", "Monitor", "Keyboard"]
+
+
+def best_of(repeat, fn):
+    """Fastest of ``repeat`` runs, in milliseconds"""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSON serialization of order pages')
+    parser.add_argument('--orders', type=int, default=10000, help='Orders per response (default: 10000)')
+    parser.add_argument('--repeat', type=int, default=20, help='Runs per path, best is kept (default: 20)')
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    store = MemoryOrderStore()
+    asyncio.run(store.create_many([(rng.choice(PRODUCTS), rng.randint(1, 5), round(rng.uniform(10, 1000), 2))
+                                   for _ in range(args.orders)]))
+    for order_id in range(1, args.orders + 1, 3):
+        store._update(store._find(order_id), "shipped", None)
+
+    def page():
+        orders = asyncio.run(store.list(args.orders))
+        return {"orders": orders, "total": len(orders), "next_cursor": None}
+
+    content = page()
+    paths = {
+        "fastapi": lambda: JSONResponse(jsonable_encoder(content)).body,
+        "json": lambda: JSONResponse(content).body,
+        "fast": lambda: dumps(content),
+        "store+fast": lambda: dumps({"orders": store._orders(slice(0, args.orders)), "total": args.orders,
+                                     "next_cursor": None}),
+    }
+    size = len(dumps(content))
+
+    print(f"{args.orders:,} orders, {size / 1024:.0f} KiB body, encoder: {'orjson' if orjson else 'json'}")
+    print(f"{'path':<12}{'ms/10k orders':>15}{'MB/s':>10}")
+    scale = 10000 / args.orders
+    for name, fn in paths.items():
+        ms = best_of(args.repeat, fn)
+        print(f"{name:<12}{ms * scale:>15.2f}{size / 1e6 / (ms / 1000):>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
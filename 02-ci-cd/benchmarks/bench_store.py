@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Order Store Benchmark
+Compares throughput of the order storage backends
+
+Usage:
+  python benchmarks/bench_store.py --orders 10000 --concurrency 64
+"""
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add project root to Python path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from backend.app.store import MemoryOrderStore, SQLiteOrderStore  # noqa: E402
+
+PRODUCTS = ["Laptop", "Smartphone", "Headphones", "Monitor", "Keyboard"]
+
+
+async def timed(operations, concurrency):
+    """Run operation factories with bounded concurrency, return ops/sec"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one(make):
+        async with semaphore:
+            await make()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(make) for make in operations))
+    return len(operations) / (time.perf_counter() - start)
+
+
+async def bench(store, orders, concurrency):
+    results = {}
+    results["create"] = await timed(
+        [lambda: store.create(random.choice(PRODUCTS), 1, 9.99) for _ in range(orders)],
+        concurrency
+    )
+    ids = list(range(1, orders + 1))
+    results["get"] = await timed(
+        [lambda: store.get(random.choice(ids)) for _ in range(orders)],
+        concurrency
+    )
+    results["list(100)"] = await timed(
+        [lambda: store.list(100, cursor=random.choice(ids)) for _ in range(orders // 10)],
+        concurrency
+    )
+    results["update"] = await timed(
+        [lambda: store.update(random.choice(ids), status="shipped") for _ in range(orders)],
+        concurrency
+    )
+    # Random batches from the middle: the per-order cost should not grow with --orders
+    doomed = random.sample(ids, orders // 2)
+    batches = [doomed[i:i + 100] for i in range(0, len(doomed), 100)]
+    results["delete"] = await timed(
+        [lambda batch=batch: store.delete_many(batch) for batch in batches],
+        concurrency
+    ) * 100
+    await store.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark order store backends')
+    parser.add_argument('--orders', type=int, default=10000, help='Orders to create (default: 10000)')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent operations (default: 64)')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backends = {
+            "memory": MemoryOrderStore(),
+            "sqlite": SQLiteOrderStore(str(Path(tmp) / "bench.db")),
+        }
+        report = {name: asyncio.run(bench(store, args.orders, args.concurrency))
+                  for name, store in backends.items()}
+
+    operations = list(next(iter(report.values())))
+    print(f"{'backend':<10}" + "".join(f"{op:>14}" for op in operations))
+    for name, results in report.items():
+        print(f"{name:<10}" + "".join(f"{results[op]:>12.0f}/s" for op in operations))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,7 @@
 // State
 let simulationRunning = false;
 let simulationInterval = null;
+let recentOrders = [];
 let sessionStats = {
     requests: 0,
     success: 0,
@@ -16,11 +17,26 @@ const PRODUCTS = [
 // Initialize
 document.addEventListener('DOMContentLoaded', () => {
     checkSystemHealth();
-    loadOrders();
-    refreshMetrics();
-    setInterval(refreshMetrics, 5000);
+    subscribeEvents();
 });
 
+// Stats snapshots and order changes are pushed by the server instead of polled
+function subscribeEvents() {
+    const events = new EventSource('/events');
+    const statusDot = document.getElementById('systemStatus');
+
+    events.addEventListener('open', () => {
+        statusDot.style.background = '#10b981';
+        // Changes made while disconnected were missed, so start from a fresh page
+        loadOrders();
+    });
+    events.addEventListener('error', () => {
+        statusDot.style.background = '#ef4444';
+    });
+    events.addEventListener('stats', (event) => renderMetrics(JSON.parse(event.data)));
+    events.addEventListener('orders', (event) => applyOrderChanges(JSON.parse(event.data)));
+}
+
 async function checkSystemHealth() {
     try {
         const response = await fetch('/health');
@@ -37,70 +53,90 @@ async function checkSystemHealth() {
 
 async function refreshMetrics() {
     try {
-        // Get stats from backend
-        const statsResponse = await fetch('/api/stats');
-        const stats = await statsResponse.json();
-
-        // Get orders
-        const ordersResponse = await fetch('/orders');
-        const ordersData = await ordersResponse.json();
-
-        // Update display
-        document.getElementById('totalOrders').textContent = ordersData.total || 0;
-
-        // Calculate requests per minute (use session stats if available, otherwise use total)
-        let reqPerMin = 0;
-        if (sessionStats.requests > 0 && window.sessionStart) {
-            reqPerMin = Math.round(sessionStats.requests / ((Date.now() - window.sessionStart) / 60000));
-        } else if (stats.uptime_seconds > 0) {
-            reqPerMin = Math.round((stats.total_requests / stats.uptime_seconds) * 60);
-        }
-        document.getElementById('requestsPerMin').textContent = reqPerMin;
-
-        // Error rate
-        let errorRate = 0;
-        if (sessionStats.requests > 0) {
-            errorRate = ((sessionStats.errors / sessionStats.requests) * 100).toFixed(1);
-        } else if (stats.total_requests > 0) {
-            errorRate = stats.error_rate.toFixed(1);
-        }
-        document.getElementById('errorRate').textContent = errorRate + '%';
-
-        // Avg response time
-        const avgTime = sessionStats.times.length > 0
-            ? Math.round(sessionStats.times.reduce((a, b) => a + b, 0) / sessionStats.times.length)
-            : Math.floor(Math.random() * 100 + 50); // Fallback for demo
-        document.getElementById('avgResponse').textContent = avgTime + 'ms';
-
+        const response = await fetch('/api/stats');
+        renderMetrics(await response.json());
     } catch (error) {
         console.error('Failed to refresh metrics:', error);
     }
 }
 
+function renderMetrics(stats) {
+    document.getElementById('totalOrders').textContent = stats.active_orders || 0;
+
+    // Calculate requests per minute (use session stats if available, otherwise use total)
+    let reqPerMin = 0;
+    if (sessionStats.requests > 0 && window.sessionStart) {
+        reqPerMin = Math.round(sessionStats.requests / ((Date.now() - window.sessionStart) / 60000));
+    } else if (stats.uptime_seconds > 0) {
+        reqPerMin = Math.round((stats.total_requests / stats.uptime_seconds) * 60);
+    }
+    document.getElementById('requestsPerMin').textContent = reqPerMin;
+
+    // Error rate
+    let errorRate = 0;
+    if (sessionStats.requests > 0) {
+        errorRate = ((sessionStats.errors / sessionStats.requests) * 100).toFixed(1);
+    } else if (stats.total_requests > 0) {
+        errorRate = stats.error_rate.toFixed(1);
+    }
+    document.getElementById('errorRate').textContent = errorRate + '%';
+
+    // Avg response time
+    const avgTime = sessionStats.times.length > 0
+        ? Math.round(sessionStats.times.reduce((a, b) => a + b, 0) / sessionStats.times.length)
+        : Math.floor(Math.random() * 100 + 50); // Fallback for demo
+    document.getElementById('avgResponse').textContent = avgTime + 'ms';
+}
+
 async function loadOrders() {
     try {
-        const response = await fetch('/orders');
+        const response = await fetch('/orders?limit=10&order=desc');
         const data = await response.json();
-        const orders = data.orders || [];
-
-        const container = document.getElementById('recentOrdersList');
-        if (orders.length === 0) {
-            container.innerHTML = '<p style="text-align: center; color: #94a3b8; padding: 2rem;">No orders yet</p>';
-        } else {
-            container.innerHTML = orders.slice(-10).reverse().map(order => `
-                <div class="order-row">
-                    <div class="order-id">#${order.id}</div>
-                    <div>${order.product}</div>
-                    <div>$${order.price.toFixed(2)}</div>
-                    <div class="order-status status-${order.status}">${order.status}</div>
-                </div>
-            `).join('');
-        }
+        recentOrders = data.orders || [];
+        document.getElementById('totalOrders').textContent = data.total || 0;
+        renderRecentOrders();
     } catch (error) {
         console.error('Failed to load orders:', error);
     }
 }
 
+// Apply an `orders` event: created, then updated, then deleted
+function applyOrderChanges(changes) {
+    const byId = new Map(recentOrders.map(order => [order.id, order]));
+    changes.created.forEach(order => byId.set(order.id, order));
+    changes.updated.forEach(order => {
+        if (byId.has(order.id)) byId.set(order.id, order);
+    });
+    changes.deleted.forEach(id => byId.delete(id));
+
+    if (changes.total !== undefined) {
+        document.getElementById('totalOrders').textContent = changes.total;
+    }
+    if (changes.deleted.length > 0 && byId.size < 10) {
+        // Older orders that moved into the top 10 are not in the event
+        loadOrders();
+        return;
+    }
+    recentOrders = [...byId.values()].sort((a, b) => b.id - a.id).slice(0, 10);
+    renderRecentOrders();
+}
+
+function renderRecentOrders() {
+    const container = document.getElementById('recentOrdersList');
+    if (recentOrders.length === 0) {
+        container.innerHTML = '<p style="text-align: center; color: #94a3b8; padding: 2rem;">No orders yet</p>';
+    } else {
+        container.innerHTML = recentOrders.map(order => `
+            <div class="order-row">
+                <div class="order-id">#${order.id}</div>
+                <div>${order.product}</div>
+                <div>$${order.price.toFixed(2)}</div>
+                <div class="order-status status-${order.status}">${order.status}</div>
+            </div>
+        `).join('');
+    }
+}
+
 function startSimulation() {
     if (simulationRunning) return;
 
@@ -176,9 +212,7 @@ function stopSimulation() {
 }
 
 async function createRandomOrder() {
-    const product = PRODUCTS[Math.floor(Math.random() * PRODUCTS.length)];
-    const quantity = Math.floor(Math.random() * 5) + 1;
-    const price = parseFloat((Math.random() * 990 + 10).toFixed(2));
+    const { product, quantity, price } = randomOrder();
 
     const startTime = performance.now();
 
@@ -204,7 +238,6 @@ async function createRandomOrder() {
         }
 
         updateSessionStats();
-        loadOrders();
 
     } catch (error) {
         sessionStats.requests++;
@@ -240,41 +273,93 @@ async function simulateError(type) {
     }
 }
 
+function randomOrder() {
+    const product = PRODUCTS[Math.floor(Math.random() * PRODUCTS.length)];
+    const quantity = Math.floor(Math.random() * 5) + 1;
+    const price = parseFloat((Math.random() * 990 + 10).toFixed(2));
+    return { product, quantity, price };
+}
+
 async function createBulkOrders() {
     addLog('📦 Creating 10 orders...', 'success');
 
-    const promises = [];
-    for (let i = 0; i < 10; i++) {
-        promises.push(createRandomOrder());
-    }
+    const orders = Array.from({ length: 10 }, randomOrder);
+    const startTime = performance.now();
+
+    try {
+        const response = await fetch('/orders:batch', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ orders })
+        });
+
+        sessionStats.times.push(performance.now() - startTime);
+        sessionStats.requests++;
+
+        if (response.ok) {
+            sessionStats.success++;
+            showToast('Created 10 orders successfully!', 'success');
+        } else {
+            sessionStats.errors++;
+            addLog(`❌ Failed to create orders (${response.status})`, 'error');
+        }
 
-    await Promise.all(promises);
-    showToast('Created 10 orders successfully!', 'success');
+        updateSessionStats();
+    } catch (error) {
+        sessionStats.requests++;
+        sessionStats.errors++;
+        addLog(`❌ Error: ${error.message}`, 'error');
+        updateSessionStats();
+    }
 }
 
 async function clearAllOrders() {
     if (!confirm('Clear all orders? This cannot be undone.')) return;
 
     try {
-        const response = await fetch('/orders');
-        const data = await response.json();
-        const orders = data.orders || [];
-
-        const deletePromises = orders.map(order =>
-            fetch(`/orders/${order.id}`, { method: 'DELETE' })
-        );
-
-        await Promise.all(deletePromises);
+        const orders = await fetchAllOrders();
+
+        // Delete in batches of up to 1000 ids per request
+        for (let i = 0; i < orders.length; i += 1000) {
+            const ids = orders.slice(i, i + 1000).map(order => order.id);
+            const response = await fetch('/orders:batch', {
+                method: 'DELETE',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ ids })
+            });
+            if (!response.ok) {
+                // Each batch is atomic, so this one deleted nothing
+                const error = await response.json().catch(() => ({}));
+                const detail = typeof error.detail === 'string' ? error.detail : `HTTP ${response.status}`;
+                showToast(`Failed to clear orders: ${detail}`, 'error');
+                addLog(`❌ Cleared ${i} of ${orders.length} orders: ${detail}`, 'error');
+                return;
+            }
+        }
 
         showToast('All orders cleared!', 'success');
         addLog('🗑️ Cleared all orders', 'warning');
-        loadOrders();
 
     } catch (error) {
         showToast('Failed to clear orders', 'error');
+        addLog(`❌ Error: ${error.message}`, 'error');
     }
 }
 
+async function fetchAllOrders() {
+    const orders = [];
+    let cursor = null;
+    do {
+        const query = cursor === null ? '' : `&cursor=${cursor}`;
+        const response = await fetch(`/orders?limit=1000${query}`);
+        if (!response.ok) throw new Error(`listing orders failed (HTTP ${response.status})`);
+        const data = await response.json();
+        orders.push(...(data.orders || []));
+        cursor = data.next_cursor;
+    } while (cursor !== null && cursor !== undefined);
+    return orders;
+}
+
 async function generateLoad() {
     addLog('🔥 Generating load...', 'warning');
 
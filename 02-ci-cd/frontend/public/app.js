@@ -1,5 +1,6 @@
 // State management
 let allOrders = [];
+let totalOrders = 0;
 let currentFilter = 'all';
 let requestTimes = [];
 
@@ -12,11 +13,40 @@ const PRODUCTS = [
 // Initialize app
 document.addEventListener('DOMContentLoaded', () => {
     checkHealth();
-    refreshOrders();
-    setInterval(checkHealth, 10000); // Check health every 10s
-    setInterval(refreshOrders, 5000); // Refresh orders every 5s
+    subscribeEvents();
 });
 
+// Order changes are pushed by the server instead of polled
+function subscribeEvents() {
+    const events = new EventSource('/events');
+    events.addEventListener('open', () => {
+        // Changes made while disconnected were missed, so reload the list
+        checkHealth();
+        refreshOrders();
+    });
+    events.addEventListener('error', () => {
+        document.getElementById('healthStatus').className = 'status-dot unhealthy';
+        document.getElementById('healthText').textContent = 'Reconnecting';
+    });
+    events.addEventListener('orders', (event) => applyOrderChanges(JSON.parse(event.data)));
+}
+
+// Apply an `orders` event: created, then updated, then deleted
+function applyOrderChanges(changes) {
+    const byId = new Map(allOrders.map(order => [order.id, order]));
+    changes.created.forEach(order => byId.set(order.id, order));
+    changes.updated.forEach(order => {
+        if (byId.has(order.id)) byId.set(order.id, order);
+    });
+    changes.deleted.forEach(id => byId.delete(id));
+
+    // Same window as a refresh: the newest page of orders
+    allOrders = [...byId.values()].sort((a, b) => b.id - a.id).slice(0, Math.max(allOrders.length, 100));
+    if (changes.total !== undefined) totalOrders = changes.total;
+    renderOrders();
+    updateStats();
+}
+
 // Health check
 async function checkHealth() {
     const statusDot = document.getElementById('healthStatus');
@@ -40,7 +70,7 @@ async function checkHealth() {
 
 // Update statistics
 function updateStats() {
-    document.getElementById('totalOrders').textContent = allOrders.length;
+    document.getElementById('totalOrders').textContent = totalOrders;
 
     // Calculate success rate (mock for now)
     const successRate = allOrders.length > 0 ? '99.5%' : '100%';
@@ -58,7 +88,7 @@ async function refreshOrders() {
     const startTime = performance.now();
 
     try {
-        const response = await fetch('/orders');
+        const response = await fetch('/orders?order=desc');
         const data = await response.json();
 
         const endTime = performance.now();
@@ -67,6 +97,7 @@ async function refreshOrders() {
         if (requestTimes.length > 10) requestTimes.shift(); // Keep last 10
 
         allOrders = data.orders || [];
+        totalOrders = data.total || 0;
         renderOrders();
         updateStats();
     } catch (error) {
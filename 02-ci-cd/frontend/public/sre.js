@@ -5,6 +5,8 @@ let metricsHistory = {
     latencies: [],
     timestamps: []
 };
+let timeRangeMinutes = 15;
+let historyTimer = null;
 let alerts = [];
 let operations = [];
 let startTime = Date.now();
@@ -13,18 +15,25 @@ let startTime = Date.now();
 document.addEventListener('DOMContentLoaded', () => {
     checkHealth();
     checkAllServices();
-    loadMetrics();
     setupChart();
+    loadHistory();
     startMonitoring();
 });
 
 function startMonitoring() {
-    // Update metrics every 5 seconds
-    setInterval(() => {
-        loadMetrics();
-        updateChart();
-        updateUptime();
-    }, 5000);
+    // Stats snapshots are pushed by the server (every 5 seconds) instead of polled
+    const events = new EventSource('/events');
+    events.addEventListener('open', () => {
+        checkHealth();
+        logOperation('GET', '/events', 200);
+    });
+    events.addEventListener('error', () => {
+        document.getElementById('healthDot').classList.add('unhealthy');
+        document.getElementById('healthText').textContent = 'Reconnecting...';
+    });
+    events.addEventListener('stats', (event) => renderMetrics(JSON.parse(event.data)));
+
+    setInterval(updateUptime, 5000);
 
     // Check services every 30 seconds
     setInterval(checkAllServices, 30000);
@@ -53,24 +62,37 @@ async function checkHealth() {
 
 async function checkAllServices() {
     // Check API
-    checkService('apiStatus', '/health');
-
-    // Check other services (these might fail if not running)
-    checkService('prometheusStatus', 'http://localhost:19090/-/healthy', true);
-    checkService('grafanaStatus', 'http://localhost:3000/api/health', true);
-    checkService('nodeStatus', 'http://localhost:9100/metrics', true);
+    checkService('apiStatus', '/health/ready');
+
+    // The API probes the other services itself and shares the cached result
+    // between dashboards; a browser could not read their status anyway
+    const elements = {
+        prometheus: 'prometheusStatus',
+        grafana: 'grafanaStatus',
+        node_exporter: 'nodeStatus'
+    };
+    try {
+        const response = await fetch('/api/dependencies');
+        const data = await response.json();
+        data.dependencies.forEach(dependency => {
+            const element = document.getElementById(elements[dependency.name]);
+            if (!element) return;
+            element.innerHTML = dependency.status === 'up'
+                ? `<span class="status-badge healthy" title="${dependency.latency_ms}ms">Healthy</span>`
+                : `<span class="status-badge unhealthy" title="${dependency.error || dependency.http_status}">Down</span>`;
+        });
+    } catch (error) {
+        Object.values(elements).forEach(id => {
+            document.getElementById(id).innerHTML = '<span class="status-badge checking">Unknown</span>';
+        });
+    }
 }
 
-async function checkService(elementId, url, external = false) {
+async function checkService(elementId, url) {
     const element = document.getElementById(elementId);
     try {
-        const response = await fetch(url, {
-            mode: external ? 'no-cors' : 'cors',
-            timeout: 5000
-        });
-
-        // For no-cors mode, we can't read status, so we assume success
-        if (external || response.ok) {
+        const response = await fetch(url);
+        if (response.ok) {
             element.innerHTML = '<span class="status-badge healthy">Healthy</span>';
         } else {
             element.innerHTML = '<span class="status-badge unhealthy">Down</span>';
@@ -80,43 +102,17 @@ async function checkService(elementId, url, external = false) {
     }
 }
 
-async function loadMetrics() {
+function renderMetrics(stats) {
     try {
-        // Get real stats from backend
-        const statsResponse = await fetch('/api/stats');
-        const stats = await statsResponse.json();
-
-        // Get orders
-        const ordersResponse = await fetch('/orders');
-        const ordersData = await ordersResponse.json();
-
         // Update active orders (real data)
-        const activeOrders = ordersData.total || 0;
-        document.getElementById('activeOrders').textContent = activeOrders;
-
-        // Track metrics history (real requests)
-        const now = Date.now();
-        metricsHistory.timestamps.push(now);
-
-        // Calculate current request rate
-        const currentRate = stats.uptime_seconds > 0
-            ? Math.round((stats.total_requests / stats.uptime_seconds) * 60)
-            : 0;
-        metricsHistory.requests.push(currentRate);
-
-        // Keep last 20 data points
-        if (metricsHistory.timestamps.length > 20) {
-            metricsHistory.timestamps.shift();
-            metricsHistory.requests.shift();
-        }
+        document.getElementById('activeOrders').textContent = stats.active_orders || 0;
+
+        // Current request rate over the last minute, per minute
+        const currentRate = Math.round(stats.request_rates['1m'] * 60);
 
         // Display real metrics
         document.getElementById('requestRate').textContent = currentRate;
-        document.getElementById('errorRate').textContent = stats.error_rate.toFixed(1) + '%';
-
-        // P95 latency (simulated for now, would need histogram from Prometheus)
-        const p95 = Math.floor(Math.random() * 200 + 50);
-        document.getElementById('p95Latency').textContent = p95;
+        document.getElementById('errorRate').textContent = stats.error_rates['5m'].toFixed(1) + '%';
 
         // Update SLO metrics (calculate from real data)
         const availability = stats.total_requests > 0
@@ -124,21 +120,46 @@ async function loadMetrics() {
             : 100;
         updateSLO('availabilitySLO', 'availabilityValue', availability);
 
-        const latencySLO = 98; // Would calculate from P95 < 500ms
-        updateSLO('latencySLO', 'latencyValue', latencySLO);
-
         const errorBudget = 100 - stats.error_rate;
         updateSLO('errorBudget', 'budgetValue', errorBudget);
 
-        // Log operation
-        logOperation('GET', '/api/stats', 200);
-
     } catch (error) {
-        console.error('Failed to load metrics:', error);
+        console.error('Failed to render metrics:', error);
         addAlert('Metrics collection failed', 'warning');
     }
 }
 
+async function loadHistory() {
+    // About 60 points over the selected range, downsampled by the server
+    const range = timeRangeMinutes * 60;
+    try {
+        const response = await fetch(`/api/stats/history?range=${range}&step=${range / 60}`);
+        if (!response.ok) return;
+        const history = await response.json();
+
+        metricsHistory.timestamps = history.timestamps.map(t => t * 1000);
+        metricsHistory.requests = history.request_rate.map(rate => Math.round(rate * 60));
+        metricsHistory.errors = history.error_rate;
+        metricsHistory.latencies = history.latency_p95_ms;
+        updateChart();
+
+        // Latest P95, and the share of points whose P95 stayed under 500ms
+        const latencies = history.latency_p95_ms.filter(value => value !== null);
+        document.getElementById('p95Latency').textContent =
+            latencies.length ? Math.round(latencies[latencies.length - 1]) : 0;
+        const latencySLO = latencies.length
+            ? (latencies.filter(value => value < 500).length / latencies.length) * 100
+            : 100;
+        updateSLO('latencySLO', 'latencyValue', latencySLO);
+    } catch (error) {
+        console.error('Failed to load metrics history:', error);
+    } finally {
+        // The chart gains a point once per step, so refresh at that pace
+        clearTimeout(historyTimer);
+        historyTimer = setTimeout(loadHistory, Math.max(15, range / 60) * 1000);
+    }
+}
+
 function calculateRequestRate() {
     if (metricsHistory.requests.length < 2) return 0;
 
@@ -326,8 +347,9 @@ function updateUptime() {
 }
 
 function updateTimeRange(value) {
+    timeRangeMinutes = parseInt(value, 10);
+    loadHistory();
     showToast(`Updated range to ${value} minutes`, 'info');
-    // In a real implementation, this would fetch historical data
 }
 
 async function runHealthCheck() {
@@ -353,25 +375,16 @@ function viewMetrics() {
     showToast('Opening raw metrics...', 'info');
 }
 
-async function exportData() {
-    try {
-        const response = await fetch('/orders');
-        const data = await response.json();
+function exportData() {
+    // The server streams the export, so the browser saves it without it
+    // being assembled in memory on either side
+    const a = document.createElement('a');
+    a.href = '/orders/export?format=ndjson';
+    a.download = `export-${Date.now()}.ndjson`;
+    a.click();
 
-        const dataStr = JSON.stringify(data, null, 2);
-        const blob = new Blob([dataStr], { type: 'application/json' });
-        const url = URL.createObjectURL(blob);
-
-        const a = document.createElement('a');
-        a.href = url;
-        a.download = `export-${Date.now()}.json`;
-        a.click();
-
-        showToast('Data exported successfully!', 'success');
-        logOperation('GET', '/orders', 200);
-    } catch (error) {
-        showToast('Export failed!', 'error');
-    }
+    showToast('Export started', 'success');
+    logOperation('GET', '/orders/export', 200);
 }
 
 function viewLogs() {
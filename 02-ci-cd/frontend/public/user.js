@@ -176,7 +176,7 @@ async function checkout() {
 
 async function loadOrders() {
     try {
-        const response = await fetch('/orders');
+        const response = await fetch('/orders?order=desc');
         const data = await response.json();
         window.userOrders = data.orders || [];
     } catch (error) {
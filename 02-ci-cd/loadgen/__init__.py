@@ -0,0 +1 @@
+"""Load generation engine for the traffic simulator"""
@@ -0,0 +1,124 @@
+"""
+Distributed Load Generation
+Split one scenario across worker processes or hosts and merge their reports
+
+A scenario is a plain dict (mode, url, rate, users, duration, ...). The
+coordinator divides its arrival rate and user count between workers, gives
+every share the same wall-clock ``start_at`` so they begin together, and
+merges the reports that come back into one.
+
+Workers run locally in a process pool, or on other hosts: each remote worker
+connects to the coordinator over TCP and the two exchange one line of JSON
+each way, the share out and ``{"report": ..., "stats": ...}`` back.
+"""
+import json
+import logging
+import socket
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Tuple
+
+from loadgen.report import RunReport
+
+logger = logging.getLogger(__name__)
+
+# Runs one share in the calling process and returns its result dict. It must
+# be a module-level function so the process pool can pickle it.
+RunShare = Callable[[dict], dict]
+
+# Time given to workers to come up before the common start
+START_DELAY = 2.0
+
+
+def split_scenario(scenario: dict, workers: int, start_delay: float = START_DELAY) -> List[dict]:
+    """Per-worker shares: rate divided evenly, users spread as evenly as possible"""
+    start_at = time.time() + start_delay
+    shares = []
+    for index in range(workers):
+        share = dict(scenario, worker=index, workers=workers, start_at=start_at)
+        if scenario.get("rate"):
+            share["rate"] = scenario["rate"] / workers
+        if scenario.get("users"):
+            share["users"] = scenario["users"] // workers + (index < scenario["users"] % workers)
+        shares.append(share)
+    return shares
+
+
+def merge_results(results: List[dict]) -> Tuple[RunReport, dict]:
+    """One report and summed engine counters from every worker's result"""
+    report = RunReport()
+    stats: dict = {}
+    for result in results:
+        report.merge(RunReport.from_dict(result["report"]))
+        for name, value in result["stats"].items():
+            stats[name] = stats.get(name, 0) + value
+    return report, stats
+
+
+def run_local(run_share: RunShare, scenario: dict, workers: int) -> Tuple[RunReport, dict]:
+    """Run the scenario across a pool of local worker processes"""
+    shares = split_scenario(scenario, workers)
+    logger.info(f"🧵 Running {workers} local workers")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(run_share, shares))
+    return merge_results(results)
+
+
+def _send(conn: socket.socket, message: dict):
+    conn.sendall(json.dumps(message).encode() + b"\n")
+
+
+def _receive(conn: socket.socket) -> dict:
+    with conn.makefile("rb") as stream:
+        line = stream.readline()
+    if not line:
+        raise ConnectionError("peer closed the connection without a message")
+    return json.loads(line)
+
+
+def coordinate(scenario: dict, workers: int, host: str, port: int) -> Tuple[RunReport, dict]:
+    """Wait for ``workers`` remote workers, hand out shares, merge their reports"""
+    with socket.create_server((host, port)) as server:
+        logger.info(f"📡 Waiting for {workers} workers on {host}:{port}")
+        connections = []
+        while len(connections) < workers:
+            conn, address = server.accept()
+            connections.append(conn)
+            logger.info(f"🤝 Worker {len(connections)}/{workers} connected from {address[0]}")
+
+    try:
+        for conn, share in zip(connections, split_scenario(scenario, workers)):
+            _send(conn, share)
+        results = [_receive(conn) for conn in connections]
+    finally:
+        for conn in connections:
+            conn.close()
+    return merge_results(results)
+
+
+def _connect(host: str, port: int, wait: float) -> socket.socket:
+    """Connect, retrying for ``wait`` seconds while the coordinator starts"""
+    deadline = time.monotonic() + wait
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except ConnectionRefusedError:
+            if time.monotonic() >= deadline:
+                raise
+            time.sleep(0.2)
+
+
+def serve_worker(run_share: RunShare, host: str, port: int, wait: float = 30.0):
+    """Connect to a coordinator, run the share it assigns and send back the result"""
+    with _connect(host, port, wait) as conn:
+        logger.info(f"🤝 Connected to coordinator at {host}:{port}")
+        share = _receive(conn)
+        logger.info(f"📋 Worker {share['worker'] + 1}/{share['workers']}: {share['mode']} share")
+        _send(conn, run_share(share))
+
+
+def wait_for_start(share: dict):
+    """Block until the share's common start time"""
+    delay = share.get("start_at", 0) - time.time()
+    if delay > 0:
+        time.sleep(delay)
@@ -0,0 +1,156 @@
+"""
+Load Engine
+Async HTTP load generation with pooled keep-alive connections
+
+Two pacing models are provided:
+- open loop: requests are launched at a constant arrival rate, whatever the
+  server's latency, so a slow server cannot slow the offered load down
+- closed loop: N virtual users each send a request, wait for the response
+  and (optionally) think before the next one
+"""
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, Optional
+
+import httpx
+
+from loadgen.report import RunReport
+from loadgen.trace import TraceWriter
+
+logger = logging.getLogger(__name__)
+
+# An action receives the loop time at which it was scheduled to start
+Action = Callable[[float], Awaitable[None]]
+
+
+class EngineStats:
+    """Counters shared by every request the engine sends"""
+
+    def __init__(self):
+        self.sent = 0
+        self.succeeded = 0
+        self.failed = 0
+        self.dropped = 0
+
+    def as_dict(self) -> dict:
+        return {
+            "sent": self.sent,
+            "succeeded": self.succeeded,
+            "failed": self.failed,
+            "dropped": self.dropped
+        }
+
+
+class LoadEngine:
+    """Sends requests through one pooled AsyncClient and paces them"""
+
+    def __init__(self, base_url: str, max_connections: int = 200, timeout: float = 10.0,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        self.base_url = base_url.rstrip('/')
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+            timeout=timeout,
+            transport=transport
+        )
+        self.stats = EngineStats()
+        self.report = RunReport()
+        # Set to record every request sent, for replay
+        self.trace: Optional[TraceWriter] = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def close(self):
+        await self.client.aclose()
+
+    async def request(self, method: str, path: str, endpoint: Optional[str] = None,
+                      scheduled: Optional[float] = None, **kwargs) -> Optional[httpx.Response]:
+        """Send one request; transport errors are counted and return None.
+
+        ``endpoint`` is the route template the request is reported under
+        (defaults to ``path``) and ``scheduled`` the loop time it was due,
+        from which its coordinated-omission-corrected latency is measured.
+        """
+        loop = asyncio.get_running_loop()
+        label = f"{method} {endpoint or path}"
+        self.stats.sent += 1
+        sent = loop.time()
+        if self.trace is not None:
+            self.trace.record(sent if scheduled is None else scheduled, method, path, endpoint,
+                              kwargs.get("params"), kwargs.get("json"))
+        try:
+            response = await self.client.request(method, path, **kwargs)
+        except httpx.HTTPError as e:
+            self.stats.failed += 1
+            self.report.record(label, None, sent if scheduled is None else scheduled, sent, loop.time())
+            logger.debug(f"❌ {method} {path} failed: {e!r}")
+            return None
+        self.report.record(label, response.status_code, sent if scheduled is None else scheduled, sent, loop.time())
+        if response.status_code < 400:
+            self.stats.succeeded += 1
+        else:
+            self.stats.failed += 1
+        return response
+
+    async def run_open_loop(self, rate: float, duration: float, action: Action, max_in_flight: int = 10_000):
+        """Launch ``action`` at ``rate`` per second for ``duration`` seconds.
+
+        Arrivals are computed from the start time rather than by sleeping a
+        fixed interval after each request, so the rate does not drift with
+        latency. Every arrival that is due is launched at once after a late
+        wake-up. Arrivals beyond ``max_in_flight`` outstanding are dropped.
+        """
+        loop = asyncio.get_running_loop()
+        total = int(rate * duration)
+        in_flight = set()
+        start = loop.time()
+        launched = 0
+
+        while launched < total:
+            due = min(int((loop.time() - start) * rate) + 1, total)
+            while launched < due:
+                scheduled = start + launched / rate
+                launched += 1
+                if len(in_flight) >= max_in_flight:
+                    self.stats.dropped += 1
+                    continue
+                task = asyncio.create_task(action(scheduled))
+                in_flight.add(task)
+                task.add_done_callback(in_flight.discard)
+            if launched < total:
+                await asyncio.sleep(max(0.0, start + launched / rate - loop.time()))
+
+        if in_flight:
+            await asyncio.gather(*in_flight, return_exceptions=True)
+
+    async def run_closed_loop(self, users: int, duration: float, action: Action,
+                              think_time: Optional[Callable[[], float]] = None):
+        """Run ``users`` virtual users, each repeating ``action`` until time is up"""
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + duration
+
+        async def user():
+            while loop.time() < deadline:
+                await action(loop.time())
+                if think_time is not None:
+                    await asyncio.sleep(think_time())
+
+        await asyncio.gather(*(user() for _ in range(users)))
+
+    async def report_progress(self, interval: float = 5.0):
+        """Log throughput every ``interval`` seconds until cancelled"""
+        last_sent, last_time = self.stats.sent, time.monotonic()
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            rate = (self.stats.sent - last_sent) / (now - last_time)
+            last_sent, last_time = self.stats.sent, now
+            logger.info(
+                f"📊 {rate:,.0f} req/s | sent={self.stats.sent} ok={self.stats.succeeded} "
+                f"failed={self.stats.failed} dropped={self.stats.dropped}"
+            )
@@ -0,0 +1,197 @@
+"""
+Run Report
+Per-endpoint latency, status breakdown and throughput over time for a load run
+
+Two latencies are kept for every request:
+- service time: from the moment the request was sent to its response
+- response time: from the moment it was *scheduled* to be sent. In the paced
+  (open-loop) modes this corrects for coordinated omission: when the client
+  or server stalls, requests queue up behind the stall and their wait counts
+  against latency instead of silently disappearing from the samples.
+The two are equal for unpaced requests.
+"""
+import csv
+import json
+from typing import Dict, List, Optional
+
+from prometheus_client import Histogram
+
+from loadgen.histogram import PERCENTILES, LatencyHistogram
+
+# Same bounds as the server's app_request_duration_seconds buckets, so the
+# client-side distribution can be compared bucket by bucket
+SERVER_BUCKETS = Histogram.DEFAULT_BUCKETS[:-1]
+
+TRANSPORT_ERROR = "transport_error"
+
+
+class EndpointStats:
+    """Latencies and outcomes for one ``METHOD /route`` key"""
+
+    def __init__(self):
+        self.service = LatencyHistogram()
+        self.response = LatencyHistogram()
+        self.statuses: Dict[str, int] = {}
+        self.errors = 0
+
+    def merge(self, other: "EndpointStats"):
+        self.service.merge(other.service)
+        self.response.merge(other.response)
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.errors += other.errors
+
+    def to_dict(self) -> dict:
+        return {
+            "service": self.service.to_dict(),
+            "response": self.response.to_dict(),
+            "statuses": self.statuses,
+            "errors": self.errors
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "EndpointStats":
+        stats = cls()
+        stats.service = LatencyHistogram.from_dict(data["service"])
+        stats.response = LatencyHistogram.from_dict(data["response"])
+        stats.statuses = dict(data["statuses"])
+        stats.errors = data["errors"]
+        return stats
+
+
+class RunReport:
+    """Collects every request of a run; times are event-loop seconds"""
+
+    def __init__(self):
+        self.endpoints: Dict[str, EndpointStats] = {}
+        # second since start -> [completed, errors]
+        self.timeline: Dict[int, List[int]] = {}
+        self.start: Optional[float] = None
+        self.end: Optional[float] = None
+
+    def record(self, endpoint: str, status: Optional[int], scheduled: float, sent: float, done: float):
+        """Record one request; ``status`` is None for transport errors"""
+        if self.start is None or scheduled < self.start:
+            self.start = scheduled
+        if self.end is None or done > self.end:
+            self.end = done
+
+        stats = self.endpoints.get(endpoint)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats()
+        stats.service.record((done - sent) * 1e6)
+        stats.response.record((done - min(scheduled, sent)) * 1e6)
+
+        key = TRANSPORT_ERROR if status is None else str(status)
+        stats.statuses[key] = stats.statuses.get(key, 0) + 1
+        failed = status is None or status >= 400
+        if failed:
+            stats.errors += 1
+
+        second = self.timeline.setdefault(int(done - self.start), [0, 0])
+        second[0] += 1
+        second[1] += failed
+
+    def merge(self, other: "RunReport"):
+        """Fold in another run's results.
+
+        Timelines are combined second by second, which lines up when the
+        runs were started together (as distributed workers are).
+        """
+        for endpoint, stats in other.endpoints.items():
+            self.endpoints.setdefault(endpoint, EndpointStats()).merge(stats)
+        for second, (completed, errors) in other.timeline.items():
+            counts = self.timeline.setdefault(second, [0, 0])
+            counts[0] += completed
+            counts[1] += errors
+        if other.start is not None:
+            # Each process has its own clock, so only the longest span is kept
+            if self.start is None or other.duration > self.duration:
+                self.start, self.end = other.start, other.end
+
+    def to_dict(self) -> dict:
+        """JSON-safe form, for shipping a report from a worker"""
+        return {
+            "endpoints": {endpoint: stats.to_dict() for endpoint, stats in self.endpoints.items()},
+            "timeline": sorted(self.timeline.items()),
+            "start": self.start,
+            "end": self.end
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunReport":
+        report = cls()
+        report.endpoints = {endpoint: EndpointStats.from_dict(stats) for endpoint, stats in data["endpoints"].items()}
+        report.timeline = {int(second): list(counts) for second, counts in data["timeline"]}
+        report.start = data["start"]
+        report.end = data["end"]
+        return report
+
+    @property
+    def duration(self) -> float:
+        return (self.end - self.start) if self.start is not None else 0.0
+
+    def totals(self) -> EndpointStats:
+        combined = EndpointStats()
+        for stats in self.endpoints.values():
+            combined.merge(stats)
+        return combined
+
+    def summary(self) -> dict:
+        combined = self.totals()
+        duration = self.duration
+        return {
+            "duration_seconds": round(duration, 3),
+            "requests": combined.service.total,
+            "errors": combined.errors,
+            "throughput_rps": round(combined.service.total / duration, 1) if duration else 0.0,
+            "statuses": dict(sorted(combined.statuses.items())),
+            "latency_ms": {
+                "service": combined.service.summary(),
+                "response": combined.response.summary()
+            },
+            "server_buckets": {
+                f"{bound:g}": combined.service.count_at_or_below(bound * 1e6) for bound in SERVER_BUCKETS
+            },
+            "endpoints": {
+                endpoint: {
+                    "errors": stats.errors,
+                    "statuses": dict(sorted(stats.statuses.items())),
+                    "service_ms": stats.service.summary(),
+                    "response_ms": stats.response.summary()
+                }
+                for endpoint, stats in sorted(self.endpoints.items())
+            },
+            "timeline": [
+                {"second": second, "requests": completed, "errors": errors}
+                for second, (completed, errors) in sorted(self.timeline.items())
+            ]
+        }
+
+    def write_json(self, path: str):
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def write_csv(self, path: str):
+        """One row per endpoint and latency kind, plus an ``all`` row"""
+        columns = ["count", "mean"] + [f"p{p:g}" for p in PERCENTILES] + ["max"]
+        rows = [("all", self.totals())] + sorted(self.endpoints.items())
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["endpoint", "latency", "errors"] + [f"{c}_ms" if c != "count" else c for c in columns])
+            for endpoint, stats in rows:
+                for kind, histogram in (("service", stats.service), ("response", stats.response)):
+                    summary = histogram.summary()
+                    writer.writerow([endpoint, kind, stats.errors] + [summary[c] for c in columns])
+
+    def format_table(self) -> str:
+        """Plain-text per-endpoint table for the end-of-run log"""
+        header = f"{'endpoint':<28} {'count':>7} {'err':>5} {'p50':>8} {'p90':>8} {'p99':>8} {'p99.9':>8} {'max':>8}"
+        lines = [header, "-" * len(header)]
+        for endpoint, stats in [*sorted(self.endpoints.items()), ("all", self.totals())]:
+            s = stats.response.summary()
+            lines.append(
+                f"{endpoint:<28} {s['count']:>7} {stats.errors:>5} {s['p50']:>8} {s['p90']:>8} "
+                f"{s['p99']:>8} {s['p99.9']:>8} {s['max']:>8}"
+            )
+        return "\n".join(lines)
@@ -0,0 +1,166 @@
+"""
+Traffic Traces
+Record the exact request sequence of a run and replay it later
+
+A trace is JSON Lines, gzip-compressed when the file name ends in ``.gz``.
+The first line is a header (format version, seed, where it came from); every
+other line is one request:
+
+    {"at": 0.125, "method": "PUT", "path": "/orders/3",
+     "endpoint": "/orders/{order_id}", "json": {"status": "shipped"}}
+
+``at`` is the offset in seconds from the first request of the trace.
+Replays send the same paths and payloads at the same offsets (or scaled, or
+as fast as possible), so two runs against the same starting state send the
+same workload.
+"""
+import asyncio
+import gzip
+import json
+import re
+from datetime import datetime
+from typing import IO, Callable, Iterable, Iterator, List, Optional
+
+TRACE_VERSION = 1
+
+# "GET /orders?limit=10 HTTP/1.1" in uvicorn, nginx and Apache access logs
+REQUEST_LINE = re.compile(r'"(?P<method>[A-Z]+) (?P<path>\S+) HTTP/[\d.]+"')
+# Common/combined log format timestamp: [10/Oct/2025:13:55:36 +0000]
+CLF_TIME = re.compile(r"\[(?P<time>\d{2}/\w{3}/\d{4}:\d{2}:\d{2}:\d{2} [+-]\d{4})\]")
+# Python logging's default asctime: 2025-10-10 13:55:36,123
+ASCTIME = re.compile(r"^(?P<time>\d{4}-\d{2}-\d{2} \d{2}:\d{2}:\d{2}),(?P<ms>\d{3})")
+
+
+def _open(path: str, mode: str) -> IO[str]:
+    if str(path).endswith(".gz"):
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+class TraceWriter:
+    """Appends requests to a trace file as they are sent"""
+
+    def __init__(self, path: str, **header):
+        self.path = path
+        self._file = _open(path, "w")
+        self._file.write(json.dumps({"version": TRACE_VERSION, **header}) + "\n")
+        self._start: Optional[float] = None
+        self.count = 0
+
+    def record(self, at: float, method: str, path: str, endpoint: Optional[str] = None,
+               params: Optional[dict] = None, json_body=None):
+        """Record one request; ``at`` is any clock, offsets are taken from the first"""
+        if self._start is None:
+            self._start = at
+        entry = {"at": round(at - self._start, 6), "method": method, "path": path}
+        if endpoint and endpoint != path:
+            entry["endpoint"] = endpoint
+        if params:
+            entry["params"] = params
+        if json_body is not None:
+            entry["json"] = json_body
+        self._file.write(json.dumps(entry, separators=(",", ":")) + "\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+
+def write_trace(path: str, entries: Iterable[dict], **header) -> int:
+    """Write already-built entries (e.g. from an access log); returns the count"""
+    writer = TraceWriter(path, **header)
+    try:
+        for entry in entries:
+            writer.record(entry["at"], entry["method"], entry["path"], entry.get("endpoint"),
+                          entry.get("params"), entry.get("json"))
+    finally:
+        writer.close()
+    return writer.count
+
+
+def read_trace(path: str) -> tuple:
+    """The header and the list of entries of a trace file"""
+    with _open(path, "r") as f:
+        header = json.loads(f.readline())
+        if header.get("version") != TRACE_VERSION:
+            raise ValueError(f"unsupported trace version: {header.get('version')}")
+        entries = [json.loads(line) for line in f if line.strip()]
+    # Concurrent requests can be written slightly out of order
+    entries.sort(key=lambda entry: entry["at"])
+    return header, entries
+
+
+def _log_time(line: str) -> Optional[float]:
+    match = CLF_TIME.search(line)
+    if match:
+        return datetime.strptime(match.group("time"), "%d/%b/%Y:%H:%M:%S %z").timestamp()
+    match = ASCTIME.search(line)
+    if match:
+        return datetime.strptime(match.group("time"), "%Y-%m-%d %H:%M:%S").timestamp() + int(match.group("ms")) / 1000
+    return None
+
+
+def entries_from_access_log(lines: Iterable[str], payload: Optional[Callable[[str, str], Optional[dict]]] = None,
+                            interval: float = 0.1) -> Iterator[dict]:
+    """Trace entries for every request line found in an access log.
+
+    Timestamps are taken from common-log-format brackets or a leading
+    Python logging asctime; lines without one follow the previous request
+    by ``interval`` seconds. Access logs carry no bodies, so ``payload``
+    (method, path) -> body can supply one for writes.
+    """
+    start = last = None
+    for line in lines:
+        match = REQUEST_LINE.search(line)
+        if not match:
+            continue
+        at = _log_time(line)
+        if at is None:
+            at = (last + interval) if last is not None else 0.0
+        if start is None:
+            start = at
+        last = at
+
+        method, path = match.group("method"), match.group("path")
+        entry = {"at": max(at - start, 0.0), "method": method, "path": path}
+        body = payload(method, path) if payload is not None else None
+        if body is not None:
+            entry["json"] = body
+        yield entry
+
+
+async def replay(engine, entries: List[dict], speed: float = 1.0, concurrency: int = 64):
+    """Send a trace's requests through ``engine``.
+
+    With a ``speed`` > 0 each request is launched at its offset divided by
+    ``speed`` (1 = as recorded, 10 = ten times faster) and its latency is
+    measured from that scheduled time. With ``speed`` 0 the requests are
+    sent in order, as fast as ``concurrency`` connections allow.
+    """
+    def send(entry, scheduled=None):
+        kwargs = {field: entry[field] for field in ("endpoint", "params", "json") if field in entry}
+        return engine.request(entry["method"], entry["path"], scheduled=scheduled, **kwargs)
+
+    if not speed:
+        pending = iter(entries)
+
+        async def worker():
+            for entry in pending:
+                await send(entry)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    in_flight = set()
+    for entry in entries:
+        due = start + entry["at"] / speed
+        delay = due - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        task = asyncio.create_task(send(entry, due))
+        in_flight.add(task)
+        task.add_done_callback(in_flight.discard)
+    if in_flight:
+        await asyncio.gather(*in_flight, return_exceptions=True)
@@ -4,6 +4,24 @@ Pytest configuration and shared fixtures
 import sys
 from pathlib import Path
 
+import pytest
+
 # Add project root to Python path for imports
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
+
+
+class FakeClock:
+    """Manually advanced clock"""
+
+    def __init__(self, now=0.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    """A FakeClock starting at 0; tests move it by setting ``clock.now``"""
+    return FakeClock()
@@ -0,0 +1,67 @@
+"""
+Admission Control Tests
+Tests the adaptive limit, the prioritized queue and shedding through the app
+"""
+import asyncio
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from backend.app import main
+from backend.app.admission import HIGH, LOW, AdmissionController
+from backend.app.main import app
+
+
+def test_limit_follows_latency():
+    """Test the limit grows while latency is steady and backs off when it climbs"""
+    controller = AdmissionController(initial_limit=10, min_limit=4, max_limit=40)
+
+    async def load(latency, rounds):
+        for _ in range(rounds):
+            await asyncio.gather(*(controller.acquire(LOW) for _ in range(int(controller.limit))))
+            for _ in range(controller.in_flight):
+                controller.release(latency)
+
+    asyncio.run(load(0.01, 20))
+    assert controller.limit == 40  # steady latency: grows up to the cap
+    asyncio.run(load(0.2, 20))
+    assert controller.limit < 5  # 20x slower: shrinks to the floor
+    assert controller.in_flight == 0
+
+
+def test_queue_priorities_and_shedding():
+    """Test writes jump queued reads, reads get half the queue and waits are bounded"""
+    controller = AdmissionController(initial_limit=1, queue_size=2, max_wait=0.1)
+
+    async def scenario():
+        assert await controller.acquire(LOW)
+        read = asyncio.ensure_future(controller.acquire(LOW))
+        await asyncio.sleep(0)
+        assert not await controller.acquire(LOW)  # reads may only fill half the queue
+        write = asyncio.ensure_future(controller.acquire(HIGH))
+        await asyncio.sleep(0)
+        assert controller.queued == 2
+
+        controller.release()
+        assert await write and not read.done()  # the write was queued last but goes first
+        assert not await read  # timed out waiting
+        controller.release()
+        return controller.in_flight, controller.queued
+
+    assert asyncio.run(scenario()) == (0, 0)
+
+
+def test_overloaded_app_sheds_with_retry_after(monkeypatch):
+    """Test shed requests get a fast 503 with Retry-After while probes still pass"""
+    client = TestClient(app)
+    labels = {"method": "GET", "endpoint": "/orders", "status": "503"}
+    shed_before = REGISTRY.get_sample_value("app_requests_total", labels) or 0
+    monkeypatch.setattr(main.admission, "limit", 0)
+    monkeypatch.setattr(main.admission, "queue_size", 0)
+
+    response = client.get("/orders")
+    assert response.status_code == 503 and int(response.headers["Retry-After"]) >= 1
+    assert REGISTRY.get_sample_value("app_requests_total", labels) == shed_before + 1
+    assert REGISTRY.get_sample_value("app_admission_shed_total", {"priority": "low", "reason": "queue_full"}) >= 1
+    assert client.get("/health/ready").status_code == 200
+    assert client.get("/metrics").status_code == 200
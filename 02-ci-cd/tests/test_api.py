@@ -2,9 +2,17 @@
 API Tests for TechStore
 Tests all endpoints using FastAPI TestClient
 """
+import asyncio
+import csv
+import io
+import json
+
 import pytest
 from fastapi.testclient import TestClient
+from backend.app import main
 from backend.app.main import app
+from backend.app.store import MemoryOrderStore
+from backend.config import settings
 
 
 @pytest.fixture
@@ -36,6 +44,17 @@ def test_metrics_endpoint(client):
     assert "app_requests_total" in response.text
 
 
+def test_stats_endpoint(client):
+    """Test stats are served from the in-process aggregator"""
+    client.get("/simulate-error?error_type=404")
+    response = client.get("/api/stats")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total_requests"] >= 1
+    assert data["total_errors"] >= 1
+    assert set(data["error_rates"]) == {"1m", "5m", "15m"}
+
+
 def test_create_order(client):
     """Test order creation"""
     order_data = {
@@ -60,6 +79,61 @@ def test_get_orders(client):
     assert "total" in data
 
 
+def test_get_orders_pagination(client):
+    """Test cursor pagination and filtering of orders"""
+    for _ in range(3):
+        client.post("/orders", json={"product": "Pagination Test"})
+
+    response = client.get("/orders?product=Pagination Test&limit=2")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["orders"]) == 2
+    assert data["next_cursor"] == data["orders"][-1]["id"]
+
+    response = client.get(f"/orders?product=Pagination Test&limit=2&cursor={data['next_cursor']}")
+    data = response.json()
+    assert len(data["orders"]) >= 1
+    assert all(order["product"] == "Pagination Test" for order in data["orders"])
+
+
+def test_get_orders_limit_validation(client):
+    """Test page size is bounded"""
+    response = client.get("/orders?limit=0")
+    assert response.status_code == 422
+
+
+def test_export_orders_streams_all_pages(client, monkeypatch):
+    """Test NDJSON and CSV exports cover every matching order and resume from a cursor"""
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+    created = client.post("/orders:batch", json={"orders": [{"product": "Export Test"}] * 5}).json()["orders"]
+    ids = [order["id"] for order in created]
+
+    response = client.get("/orders/export?product=Export Test")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == ids
+
+    response = client.get(f"/orders/export?format=csv&product=Export Test&cursor={ids[1]}&order=asc")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [int(row["id"]) for row in rows] == ids[2:]
+    assert rows[0]["product"] == "Export Test" and rows[0]["updated_at"] == ""
+
+    assert client.get("/orders/export?format=xml").status_code == 422
+
+
+def test_export_orders_descending_ends(client, monkeypatch):
+    """Test a newest-first export stops at the oldest order when it fills the last chunk exactly"""
+    store = MemoryOrderStore()
+    asyncio.run(store.create_many([("Export Test", 1, 1.0)] * 4))
+    monkeypatch.setattr(main, "order_store", store)
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_SIZE", 2)
+
+    response = client.get("/orders/export?order=desc")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [4, 3, 2, 1]
+    response = client.get("/orders/export?order=desc&cursor=3")
+    assert [json.loads(line)["id"] for line in response.text.splitlines()] == [2, 1]
+
+
 def test_get_order_not_found(client):
     """Test getting non-existent order"""
     response = client.get("/orders/99999")
@@ -97,6 +171,46 @@ def test_delete_order(client):
     assert get_response.status_code == 404
 
 
+def test_conditional_order_requests(client):
+    """Test order ETags, If-None-Match and stale If-Match writes"""
+    created = client.post("/orders", json={"product": "ETag Test"})
+    order_id, tag = created.json()["id"], created.headers["ETag"]
+    assert tag == '"1"'
+
+    assert client.get(f"/orders/{order_id}", headers={"If-None-Match": tag}).status_code == 304
+    updated = client.put(f"/orders/{order_id}", json={"quantity": 2}, headers={"If-Match": tag})
+    assert updated.status_code == 200 and updated.headers["ETag"] == '"2"'
+
+    # The first write moved the order on, so a second one based on the same read fails
+    stale = client.put(f"/orders/{order_id}", json={"quantity": 3}, headers={"If-Match": tag})
+    assert stale.status_code == 412
+    assert client.delete(f"/orders/{order_id}", headers={"If-Match": "not-a-tag"}).status_code == 412
+    current = client.get(f"/orders/{order_id}", headers={"If-None-Match": tag})
+    assert current.status_code == 200 and current.json()["quantity"] == 2
+
+    response = client.patch("/orders:batch", json={"updates": [{"id": order_id, "status": "shipped", "version": 1}]})
+    assert response.status_code == 409
+    assert client.delete(f"/orders/{order_id}", headers={"If-Match": '"2"'}).status_code == 200
+
+
+def test_if_match_needs_a_current_strong_tag(client):
+    """Test weak tags never satisfy If-Match, and neither does * once the order is gone"""
+    created = client.post("/orders", json={"product": "ETag Test"})
+    order_id = created.json()["id"]
+
+    weak = client.put(f"/orders/{order_id}", json={"quantity": 2}, headers={"If-Match": 'W/"1"'})
+    assert weak.status_code == 412 and "weak" in weak.json()["detail"]
+    assert client.delete(f"/orders/{order_id}", headers={"If-Match": 'W/"1"'}).status_code == 412
+    # If-None-Match still compares weakly
+    assert client.get(f"/orders/{order_id}", headers={"If-None-Match": 'W/"1"'}).status_code == 304
+
+    assert client.put(f"/orders/{order_id}", json={"quantity": 2}, headers={"If-Match": "*"}).status_code == 200
+    assert client.delete(f"/orders/{order_id}", headers={"If-Match": "*"}).status_code == 200
+    assert client.put(f"/orders/{order_id}", json={"quantity": 3}, headers={"If-Match": "*"}).status_code == 412
+    assert client.delete(f"/orders/{order_id}", headers={"If-Match": "*"}).status_code == 412
+    assert client.delete(f"/orders/{order_id}").status_code == 404
+
+
 def test_simulate_error_500(client):
     """Test 500 error simulation"""
     response = client.get("/simulate-error?error_type=500")
@@ -134,3 +248,108 @@ def test_sre_frontend_loads(client):
     response = client.get("/sre")
     assert response.status_code == 200
     assert "SRE" in response.text
+
+
+def test_batch_create_update_delete(client):
+    """Test batch endpoints apply a list of orders in one request"""
+    response = client.post("/orders:batch", json={"orders": [
+        {"product": "Batch A", "quantity": 1},
+        {"product": "Batch B", "quantity": 2}
+    ]})
+    assert response.status_code == 201
+    orders = response.json()["orders"]
+    ids = [order["id"] for order in orders]
+    assert [order["product"] for order in orders] == ["Batch A", "Batch B"]
+
+    response = client.patch("/orders:batch", json={"updates": [
+        {"id": ids[0], "status": "shipped"},
+        {"id": ids[1], "quantity": 5}
+    ]})
+    assert response.status_code == 200
+    updated = response.json()["orders"]
+    assert updated[0]["status"] == "shipped"
+    assert updated[1]["quantity"] == 5
+
+    response = client.request("DELETE", "/orders:batch", json={"ids": ids})
+    assert response.status_code == 200
+    assert response.json()["count"] == 2
+    assert client.get(f"/orders/{ids[0]}").status_code == 404
+
+
+def test_batch_is_atomic(client):
+    """Test a batch with a missing order changes nothing"""
+    order_id = client.post("/orders", json={"product": "Atomic Test"}).json()["id"]
+
+    response = client.request("DELETE", "/orders:batch", json={"ids": [order_id, 99999]})
+    assert response.status_code == 404
+    assert client.get(f"/orders/{order_id}").status_code == 200
+
+    response = client.patch("/orders:batch", json={"updates": [
+        {"id": order_id, "status": "shipped"},
+        {"id": 99999, "status": "shipped"}
+    ]})
+    assert response.status_code == 404
+    assert client.get(f"/orders/{order_id}").json()["status"] == "pending"
+
+
+def test_batch_validation(client):
+    """Test empty batches are rejected"""
+    response = client.post("/orders:batch", json={"orders": []})
+    assert response.status_code == 422
+
+
+def test_quantity_out_of_range_is_rejected(client):
+    """Test quantities past 64 bits get 422 and later creates still work"""
+    assert client.post("/orders", json={"product": "Huge", "quantity": 10 ** 20}).status_code == 422
+    assert client.post("/orders:batch", json={"orders": [{"quantity": 2 ** 63}]}).status_code == 422
+    order = client.post("/orders", json={"product": "Fine", "quantity": 2 ** 63 - 1}).json()
+    assert client.put(f"/orders/{order['id']}", json={"quantity": -1}).status_code == 422
+    assert client.get(f"/orders/{order['id']}").json()["quantity"] == 2 ** 63 - 1
+
+
+def test_metrics_use_route_templates(client):
+    """Test request metrics are labelled by route template, not raw path"""
+    client.get("/orders/424242")
+    client.get("/static/user.css")
+    client.get("/no-such-page-123")
+    text = client.get("/metrics").text
+    assert 'endpoint="/orders/{order_id}"' in text
+    assert 'endpoint="/static"' in text
+    assert 'endpoint="unmatched"' in text
+    assert "424242" not in text
+    assert "no-such-page-123" not in text
+
+
+def test_frontend_conditional_request(client):
+    """Test cached pages carry validators and answer 304"""
+    response = client.get("/admin")
+    etag = response.headers["etag"]
+    assert response.headers["last-modified"]
+
+    response = client.get("/admin", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+
+def test_frontend_precompressed(client):
+    """Test pre-compressed variants are chosen by Accept-Encoding"""
+    response = client.get("/sre", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert "SRE" in response.text
+
+    response = client.get("/sre", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in response.headers
+
+    response = client.get("/static/user.css", headers={"Accept-Encoding": "gzip;q=abc"})
+    assert response.status_code == 200 and "content-encoding" not in response.headers
+
+
+def test_static_files_served_from_cache(client):
+    """Test /static serves cached files with validators"""
+    response = client.get("/static/sre.js")
+    assert response.status_code == 200
+    assert "javascript" in response.headers["content-type"]
+    etag = response.headers["etag"]
+    assert client.get("/static/sre.js", headers={"If-None-Match": etag}).status_code == 304
+    assert client.get("/static/../backend/app/main.py").status_code == 404
+    assert client.get("/static/missing.js").status_code == 404
@@ -0,0 +1,37 @@
+"""
+Asset Cache Tests
+Tests encoding negotiation and debug reloading of cached frontend files
+"""
+import os
+
+from backend.app.assets import AssetCache, brotli
+
+
+def test_encoding_negotiation(tmp_path):
+    """Test the best accepted variant is chosen and q=0 or a malformed q excludes a coding"""
+    (tmp_path / "page.html").write_text("<html>" + "TechStore " * 100 + "</html>")
+    asset = AssetCache(tmp_path).get("page.html")
+
+    best = "br" if brotli is not None else "gzip"
+    assert asset.choose_encoding("gzip, deflate, br") == best
+    assert asset.choose_encoding("gzip, br;q=0") == "gzip"
+    assert asset.choose_encoding("gzip;q=0") == "identity"
+    assert asset.choose_encoding("") == "identity"
+    assert asset.choose_encoding("gzip;q=abc") == "identity"  # malformed q-values are skipped
+    assert asset.choose_encoding("br;q=abc, gzip;q=0.5") == "gzip"
+
+
+def test_reload_picks_up_changes(tmp_path):
+    """Test reload mode re-reads changed files and finds new ones"""
+    page = tmp_path / "page.html"
+    page.write_text("first")
+    cache = AssetCache(tmp_path, reload=True)
+    first_etag = cache.get("page.html").etag
+
+    page.write_text("second")
+    os.utime(page, (0, 1))
+    assert cache.get("page.html").etag != first_etag
+
+    (tmp_path / "new.css").write_text("body {}")
+    assert cache.get("new.css") is not None
+    assert cache.get("../outside.txt") is None
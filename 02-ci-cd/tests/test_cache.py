@@ -0,0 +1,78 @@
+"""
+Response Cache Tests
+Tests LRU/TTL eviction, invalidation and the cached read endpoints
+"""
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from backend.app.cache import ResponseCache
+from backend.app.main import app
+
+
+def counter(name, namespace):
+    return REGISTRY.get_sample_value(name, {"namespace": namespace}) or 0
+
+
+def test_lru_eviction_by_size_and_ttl(clock):
+    """Test entries expire after the TTL and the least recently used go first"""
+    cache = ResponseCache(max_bytes=30, ttl=10, clock=clock)
+    evictions = counter("app_cache_evictions_total", "t")
+    a, b, c = cache.key("t", "a"), cache.key("t", "b"), cache.key("t", "c")
+
+    cache.set(a, b"x" * 10)
+    cache.set(b, b"y" * 10)
+    assert cache.get(a) == (b"x" * 10, {})  # a is now the most recently used
+    cache.set(c, b"z" * 15)
+    assert cache.get(b) is None
+    assert cache.get(a) is not None and cache.size == 25
+    assert counter("app_cache_evictions_total", "t") - evictions == 1
+
+    clock.now = 10
+    assert cache.get(a) is None and cache.get(c) is None
+    assert len(cache) == 0 and cache.size == 0
+
+
+def test_invalidate_and_discard():
+    """Test invalidating a namespace hides its entries and bumps the version"""
+    cache = ResponseCache()
+    page, order = cache.key("orders", 1), cache.key("order", 7)
+    cache.set(page, b"[]")
+    cache.set(order, b"{}")
+    version = cache.version
+
+    cache.invalidate("orders")
+    cache.discard("order", 7)
+    assert cache.get(cache.key("orders", 1)) is None
+    assert cache.get(cache.key("order", 7)) is None
+    assert cache.get(page) == (b"[]", {})  # old generation, only reachable by its old key
+    assert cache.version == version + 2
+
+
+def test_reads_are_cached_until_a_write():
+    """Test order reads hit the cache and writes invalidate them"""
+    client = TestClient(app)
+    order = client.post("/orders", json={"product": "Cache Mouse", "quantity": 1, "price": 20}).json()
+    url = f"/orders/{order['id']}"
+    hits = counter("app_cache_hits_total", "order")
+
+    assert client.get(url).headers["X-Cache"] == "MISS"
+    response = client.get(url)
+    assert response.headers["X-Cache"] == "HIT"
+    assert response.json() == order
+    assert counter("app_cache_hits_total", "order") - hits == 1
+
+    page = client.get("/orders?order=desc&limit=1")
+    assert client.get("/orders?order=desc&limit=1").headers["X-Cache"] == "HIT"
+
+    client.put(url, json={"status": "shipped"})
+    fresh = client.get(url)
+    assert fresh.headers["X-Cache"] == "MISS"
+    assert fresh.json()["status"] == "shipped"
+    refreshed = client.get("/orders?order=desc&limit=1")
+    assert refreshed.headers["X-Cache"] == "MISS"
+    assert refreshed.json()["total"] == page.json()["total"]
+    assert refreshed.json()["orders"][0]["status"] == "shipped"
+
+    client.delete(url)
+    assert client.get(url).status_code == 404
+    assert client.get(url).status_code == 404  # misses are never cached
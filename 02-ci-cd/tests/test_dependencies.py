@@ -0,0 +1,75 @@
+"""
+Dependency Probe Tests
+Tests concurrent cached probes, timeouts and the health endpoints
+"""
+import asyncio
+
+import httpx
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from backend.app import main
+from backend.app.dependencies import DependencyChecker
+from backend.app.main import app
+
+
+def fake_services(calls):
+    """Transport answering like the monitoring stack: Grafana down, node-exporter hanging"""
+    async def handler(request):
+        calls.append(request.url.host)
+        if request.url.host == "grafana":
+            return httpx.Response(503)
+        if request.url.host == "node":
+            await asyncio.sleep(5)
+        await asyncio.sleep(0.05)
+        return httpx.Response(200, text="Prometheus is Healthy.")
+    return httpx.MockTransport(handler)
+
+
+def test_probes_are_concurrent_cached_and_bounded(clock):
+    """Test concurrent callers share one probe cycle until the TTL runs out"""
+    calls = []
+    checker = DependencyChecker(
+        {"prometheus": "http://prometheus/-/healthy", "grafana": "http://grafana/api/health",
+         "node_exporter": "http://node/metrics", "disabled": ""},
+        timeout=0.2, ttl=10, clock=clock, transport=fake_services(calls)
+    )
+
+    async def dashboards():
+        return await asyncio.gather(*(checker.check() for _ in range(20)))
+
+    results = asyncio.run(dashboards())
+    assert all(result is results[0] for result in results)
+    assert sorted(calls) == ["grafana", "node", "prometheus"]
+
+    result = results[0]
+    by_name = {dependency["name"]: dependency for dependency in result["dependencies"]}
+    assert result["status"] == "degraded" and set(by_name) == {"prometheus", "grafana", "node_exporter"}
+    assert by_name["prometheus"]["status"] == "up" and by_name["grafana"]["http_status"] == 503
+    assert by_name["node_exporter"]["error"] == "TimeoutError"
+    assert by_name["node_exporter"]["latency_ms"] < 1000  # bounded by the timeout, probed in parallel
+    assert REGISTRY.get_sample_value("app_dependency_up", {"dependency": "grafana"}) == 0
+
+    asyncio.run(checker.check())
+    assert len(calls) == 3
+    clock.now = 10
+    asyncio.run(checker.check())
+    assert len(calls) == 6
+
+
+def test_health_endpoints(monkeypatch):
+    """Test liveness, readiness and /api/dependencies"""
+    client = TestClient(app)
+    assert client.get("/health/live").json() == {"status": "ok"}
+    assert client.get("/health/ready").json()["checks"] == {"store": "ok"}
+
+    async def stuck():
+        await asyncio.sleep(5)
+    monkeypatch.setattr(main.order_store, "count", stuck)
+    monkeypatch.setattr(main.settings, "DEPENDENCY_TIMEOUT", 0.05)
+    assert client.get("/health/ready").status_code == 503
+
+    checker = DependencyChecker({"prometheus": "http://prometheus/-/healthy"}, transport=fake_services([]))
+    monkeypatch.setattr(main, "dependency_checker", checker)
+    response = client.get("/api/dependencies")
+    assert response.status_code == 200 and response.json()["status"] == "ok"
@@ -0,0 +1,96 @@
+"""
+Event Stream Tests
+Tests the SSE broadcaster, per-client backpressure and order change events
+"""
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from backend.app.events import HEARTBEAT, RECONNECT, Broadcaster, format_event
+from backend.app.main import app, broadcaster
+
+
+def parse(message):
+    lines = dict(line.split(": ", 1) for line in message.decode().strip().split("\n"))
+    return lines["event"], json.loads(lines["data"])
+
+
+def test_slow_subscriber_is_dropped():
+    """Test a client whose queue fills is disconnected without affecting others"""
+    async def scenario():
+        hub = Broadcaster(queue_size=4)
+        fast, slow = hub.subscribe(), hub.subscribe()
+        dropped = REGISTRY.get_sample_value("app_event_subscribers_dropped_total")
+        received = []
+        for i in range(6):
+            hub.publish("tick", {"i": i})
+            received.append(fast.queue.get_nowait())
+        # retry + 3 ticks filled the slow queue; its 4th tick disconnected it
+        assert hub.subscribers == {fast}
+        assert slow.queue.get_nowait() is None
+        assert REGISTRY.get_sample_value("app_event_subscribers_dropped_total") - dropped == 1
+        assert [parse(message)[1]["i"] for message in received[1:]] == [0, 1, 2, 3, 4]
+    asyncio.run(scenario())
+
+
+def test_stream_heartbeats_and_ends_on_close():
+    """Test a stream yields retry, initial snapshot, events and heartbeats until closed"""
+    async def scenario():
+        hub = Broadcaster(heartbeat=0.01)
+        stream = hub.stream(format_event("stats", {"total_requests": 1}))
+        assert (await anext(stream)).startswith(b"retry: ")
+        assert parse(await anext(stream)) == ("stats", {"total_requests": 1})
+        assert await anext(stream) == HEARTBEAT
+        hub.publish("stats", {"total_requests": 2})
+        assert parse(await anext(stream))[1] == {"total_requests": 2}
+        hub.close()
+        assert [message async for message in stream] == []
+        assert not hub.subscribers
+    asyncio.run(scenario())
+
+
+def test_stream_ends_at_max_age():
+    """Test a stream asks the client to reconnect soon and ends once it is max_age old"""
+    async def scenario():
+        hub = Broadcaster(heartbeat=0.02, max_age=0.05)
+        stream = hub.stream()
+        messages = [message async for message in stream]
+        assert messages[0].startswith(b"retry: ") and messages[-1] == RECONNECT
+        assert set(messages[1:-1]) <= {HEARTBEAT}
+        assert not hub.subscribers
+    asyncio.run(scenario())
+
+
+def test_order_writes_are_coalesced_into_one_event():
+    """Test order writes reach subscribers as one batched orders event"""
+    client = TestClient(app)
+    subscriber = broadcaster.subscribe()
+    try:
+        subscriber.queue.get_nowait()  # retry
+        created = client.post("/orders", json={"product": "Event Laptop", "quantity": 1, "price": 10}).json()
+        client.put(f"/orders/{created['id']}", json={"status": "shipped"})
+        client.delete(f"/orders/{created['id']}")
+        broadcaster.flush()
+
+        event, changes = parse(subscriber.queue.get_nowait())
+        assert event == "orders"
+        assert [order["id"] for order in changes["created"]] == [created["id"]]
+        assert changes["updated"][0]["status"] == "shipped"
+        assert changes["deleted"] == [created["id"]]
+        assert changes["total"] == client.get("/orders?limit=1").json()["total"]
+        assert subscriber.queue.empty()
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+def test_events_rejects_when_full():
+    """Test new subscribers get 503 once the subscriber limit is reached"""
+    client = TestClient(app)
+    limit = broadcaster.max_subscribers
+    broadcaster.max_subscribers = 0
+    try:
+        assert client.get("/events").status_code == 503
+    finally:
+        broadcaster.max_subscribers = limit
@@ -0,0 +1,85 @@
+"""
+Fault Injection Tests
+Tests latency sampling, rule matching and runtime toggling via the admin API
+"""
+import asyncio
+import random
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.faults import FaultInjector, FaultRule, InjectedFault, LatencySpec
+from backend.app.main import app, fault_injector
+
+
+@pytest.fixture
+def client():
+    """Create test client and clear fault rules afterwards"""
+    yield TestClient(app)
+    fault_injector.clear()
+
+
+def test_latency_distributions():
+    """Test latency samples respect their distribution bounds"""
+    rng = random.Random(1)
+    assert LatencySpec(ms=250).sample(rng) == 0.25
+    uniform = LatencySpec(distribution="uniform", min_ms=10, max_ms=20)
+    assert all(0.01 <= uniform.sample(rng) <= 0.02 for _ in range(100))
+    tail = LatencySpec(distribution="lognormal", median_ms=50, sigma=1.5, max_ms=400)
+    assert all(0 < tail.sample(rng) <= 0.4 for _ in range(100))
+    with pytest.raises(ValueError):
+        LatencySpec(distribution="uniform", min_ms=10)
+
+
+def test_rules_match_route_templates_and_methods():
+    """Test wildcard routes, method filters and the enabled switch"""
+    rule = FaultRule(route="/orders*", methods=["POST"])
+    assert rule.matches("/orders/{order_id}", "POST")
+    assert not rule.matches("/orders", "GET")
+    assert not rule.matches("/health", "POST")
+    assert not FaultRule(enabled=False).matches("/health", "GET")
+
+
+def test_injected_latency_does_not_block_loop():
+    """Test concurrent delayed requests overlap instead of serializing"""
+    injector = FaultInjector()
+    injector.set_rule("slow", FaultRule(latency=LatencySpec(ms=200)))
+
+    async def burst():
+        start = time.perf_counter()
+        await asyncio.gather(*(injector.apply("/orders", "GET") for _ in range(10)))
+        return time.perf_counter() - start
+
+    assert asyncio.run(burst()) < 1.0
+
+
+def test_error_rate_and_memory_ballast():
+    """Test error injection and bounded memory ballast"""
+    injector = FaultInjector(max_memory_mb=8, seed=1)
+    injector.set_rule("fail", FaultRule(route="/orders", error_rate=1.0, error_status=503))
+    with pytest.raises(InjectedFault) as exc:
+        asyncio.run(injector.apply("/orders", "GET"))
+    assert exc.value.status_code == 503
+
+    injector.clear()
+    injector.set_rule("mem", FaultRule(memory_mb=6, memory_hold_seconds=60))
+
+    async def allocate():
+        await injector.apply("/orders", "GET")
+        await injector.apply("/orders", "GET")
+        return injector.ballast_mb
+
+    assert asyncio.run(allocate()) == 8
+
+
+def test_admin_toggles_faults(client):
+    """Test rules can be set and removed at runtime"""
+    response = client.put("/admin/faults/orders-down", json={"route": "/orders", "error_rate": 1.0})
+    assert response.status_code == 200
+    assert client.get("/orders").status_code == 500
+    assert "orders-down" in client.get("/admin/faults").json()["rules"]
+
+    assert client.delete("/admin/faults/orders-down").status_code == 200
+    assert client.get("/orders").status_code == 200
+    assert client.delete("/admin/faults/orders-down").status_code == 404
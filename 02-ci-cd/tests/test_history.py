@@ -0,0 +1,63 @@
+"""
+Metrics History Tests
+Tests ring rollups, range queries and the history endpoint
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+from backend.app.history import MetricsHistory, quantile
+from backend.app.main import app
+
+
+def test_quantile_interpolates_within_buckets():
+    """Test quantiles are read off bucket counts like histogram_quantile"""
+    bounds = (0.1, 0.2, 0.4)
+    assert quantile([0, 0, 0, 0], bounds, 0.5) is None
+    assert quantile([10, 10, 0, 0], bounds, 0.5) == pytest.approx(0.1)
+    assert quantile([10, 10, 0, 0], bounds, 0.75) == pytest.approx(0.15)
+    assert quantile([0, 0, 0, 5], bounds, 0.99) == 0.4  # past the last bound
+
+
+def test_rollups_match_the_finest_resolution(clock):
+    """Test closed seconds fold into coarser rings and queries pick the right ring"""
+    clock.now = 600.0
+    history = MetricsHistory(resolutions=((1, 120), (10, 60), (60, 30)), bounds=(0.01, 0.1, 1.0), clock=clock)
+    history.set_active_orders(3)
+    for i in range(300):
+        clock.now = 600 + i * 0.2  # 5 requests a second for a minute
+        history.record_request(0.005 if i % 5 else 0.5)
+        if i % 50 == 0:
+            history.record_error()
+    history.set_active_orders(4)
+    clock.now = 659.9  # the last second is still open
+
+    fine = history.query(60, 1)
+    coarse = history.query(60, 60)
+    assert fine["resolution"] == 1 and len(fine["timestamps"]) == 60
+    assert coarse["resolution"] == 60 and coarse["timestamps"] == [600]
+    assert sum(fine["request_rate"]) == coarse["request_rate"][0] * 60 == 300
+    assert coarse["error_rate"] == [2.0]
+    assert coarse["latency_p50_ms"][0] < 10 < coarse["latency_p95_ms"][0]
+
+    tens = history.query(60, 15)  # rounded up to whole 10 second buckets
+    assert tens["resolution"] == 10 and tens["step"] == 20
+    assert history.query(1800, 1)["resolution"] == 60  # only the minute ring covers it
+    assert history.query(60, 1)["active_orders"][-1] == 4
+    assert history.query(60, 1000)["step"] == 60  # capped at the range
+    with pytest.raises(ValueError):
+        history.query(3600, 60)
+    with pytest.raises(ValueError):
+        history.query(60, 10 ** 12)
+
+
+def test_history_endpoint():
+    """Test /api/stats/history serves recorded traffic and rejects long ranges"""
+    client = TestClient(app)
+    client.post("/orders", json={"product": "History Test"})
+    response = client.get("/api/stats/history?range=300&step=10")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["step"] == 10 and len(data["timestamps"]) == 30
+    assert sum(data["request_rate"]) > 0 and data["active_orders"][-1] is not None
+    assert client.get("/api/stats/history?range=999999").status_code == 422
+    assert client.get("/api/stats/history?range=60&step=1000000000000").status_code == 422
@@ -0,0 +1,268 @@
+"""
+Load Generator Tests
+Tests the async load engine's pacing, reports and traces against the in-process app
+"""
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import socket
+import threading
+
+import httpx
+
+from backend.app.main import app
+from loadgen.distributed import coordinate, merge_results, serve_worker, split_scenario
+from loadgen.engine import LoadEngine
+from loadgen.histogram import LatencyHistogram
+from loadgen.report import RunReport
+from loadgen.trace import TraceWriter, entries_from_access_log, read_trace, replay
+from traffic_simulator import TrafficSimulator, build_trace_from_log
+
+
+def in_process_engine():
+    return LoadEngine("http://test", transport=httpx.ASGITransport(app=app))
+
+
+def test_open_loop_sends_target_count():
+    """Test the open-loop scheduler launches rate x duration evenly spaced arrivals"""
+    scheduled_times = []
+
+    async def run():
+        async with in_process_engine() as engine:
+            async def action(scheduled):
+                scheduled_times.append(scheduled)
+                await engine.request("GET", "/health")
+
+            await engine.run_open_loop(200, 0.5, action)
+            return engine.stats
+
+    stats = asyncio.run(run())
+    assert stats.sent == 100
+    assert stats.succeeded == 100
+    gaps = [b - a for a, b in zip(scheduled_times, scheduled_times[1:])]
+    assert all(abs(gap - 0.005) < 1e-9 for gap in gaps)
+
+
+def test_open_loop_drops_beyond_in_flight_limit():
+    """Test arrivals are dropped, not queued, once too many are outstanding"""
+    async def run():
+        async with in_process_engine() as engine:
+            async def stuck(scheduled):
+                await asyncio.sleep(0.5)
+
+            await engine.run_open_loop(100, 0.2, stuck, max_in_flight=5)
+            return engine.stats
+
+    assert asyncio.run(run()).dropped == 15
+
+
+def test_simulator_actions_run_on_engine():
+    """Test simulator actions work over the pooled async client"""
+    async def run():
+        simulator = TrafficSimulator("http://test", transport=httpx.ASGITransport(app=app))
+        try:
+            assert len(await simulator.create_orders(3)) == 3
+            await simulator.engine.run_closed_loop(4, 0.2, simulator.normal_action)
+            return simulator.engine.stats
+        finally:
+            await simulator.close()
+
+    stats = asyncio.run(run())
+    assert stats.sent > 4
+    assert stats.succeeded > 0
+
+
+def test_histogram_percentiles_within_precision():
+    """Test percentiles stay within the histogram's relative error and merge exactly"""
+    first, second = LatencyHistogram(), LatencyHistogram()
+    for value in range(1, 50_001):
+        (first if value % 2 else second).record(value)
+    first.merge(second)
+
+    assert first.total == 50_000
+    assert first.min == 1
+    assert first.max == 50_000
+    for percentile, exact in ((50, 25_000), (90, 45_000), (99, 49_500), (99.9, 49_950)):
+        assert exact <= first.percentile(percentile) <= exact * 1.01
+    assert first.percentile(100) == 50_000
+
+
+def test_report_corrects_for_coordinated_omission(tmp_path):
+    """Test latency is also measured from the scheduled start, and reports export"""
+    report = RunReport()
+    # Due at t=0 but only sent at t=1, e.g. behind a stalled event loop
+    report.record("GET /orders", 200, scheduled=0.0, sent=1.0, done=1.01)
+    report.record("GET /orders", 503, scheduled=0.5, sent=1.0, done=1.02)
+    report.record("GET /health", None, scheduled=1.5, sent=1.5, done=1.5)
+
+    summary = report.summary()
+    orders = summary["endpoints"]["GET /orders"]
+    assert orders["service_ms"]["max"] <= 20.2
+    assert orders["response_ms"]["max"] >= 1010
+    assert orders["statuses"] == {"200": 1, "503": 1}
+    assert summary["errors"] == 2
+    assert summary["statuses"]["transport_error"] == 1
+    assert summary["server_buckets"]["0.025"] == 3
+    assert summary["timeline"] == [{"second": 1, "requests": 3, "errors": 2}]
+
+    report.write_json(tmp_path / "run.json")
+    report.write_csv(tmp_path / "run.csv")
+    assert json.loads((tmp_path / "run.json").read_text())["requests"] == 3
+    rows = list(csv.DictReader((tmp_path / "run.csv").open()))
+    assert [(row["endpoint"], row["latency"]) for row in rows][:2] == [("all", "service"), ("all", "response")]
+    assert len(rows) == 6
+
+
+def test_engine_reports_by_route_template():
+    """Test requests are reported under their endpoint label with statuses"""
+    async def run():
+        async with in_process_engine() as engine:
+            await engine.request("GET", "/orders/999999", endpoint="/orders/{order_id}")
+            await engine.request("GET", "/health")
+            return engine.report.summary()
+
+    summary = asyncio.run(run())
+    assert summary["endpoints"]["GET /orders/{order_id}"]["statuses"] == {"404": 1}
+    assert summary["endpoints"]["GET /health"]["service_ms"]["count"] == 1
+
+
+def fake_share(share):
+    """Stand-in worker run: one 200 per worker, one 500 from the first"""
+    report = RunReport()
+    report.record("GET /health", 200, scheduled=0.0, sent=0.0, done=0.001 * (share["worker"] + 1))
+    if share["worker"] == 0:
+        report.record("GET /health", 500, scheduled=0.0, sent=0.0, done=0.5)
+    return {"report": json.loads(json.dumps(report.to_dict())), "stats": {"sent": report.totals().service.total}}
+
+
+def test_split_scenario_divides_load():
+    """Test rate is divided evenly and users spread with the remainder up front"""
+    shares = split_scenario({"mode": "stress", "rate": 900, "users": 10}, 4)
+    assert [share["rate"] for share in shares] == [225] * 4
+    assert [share["users"] for share in shares] == [3, 3, 2, 2]
+    assert len({share["start_at"] for share in shares}) == 1
+    assert [share["worker"] for share in shares] == [0, 1, 2, 3]
+
+
+def test_coordinator_merges_remote_worker_reports():
+    """Test remote workers get a share each over TCP and their histograms merge"""
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    workers = [threading.Thread(target=serve_worker, args=(fake_share, "127.0.0.1", port)) for _ in range(3)]
+    for worker in workers:
+        worker.start()
+    report, stats = coordinate({"mode": "normal", "rate": 10}, 3, "127.0.0.1", port)
+    for worker in workers:
+        worker.join(timeout=10)
+
+    summary = report.summary()
+    assert summary["requests"] == 4
+    assert summary["statuses"] == {"200": 3, "500": 1}
+    assert summary["endpoints"]["GET /health"]["service_ms"]["max"] >= 500
+    assert stats == {"sent": 4}
+
+
+def test_merge_results_round_trips_reports():
+    """Test serialized worker reports merge to the same percentiles as one report"""
+    results = [fake_share(share) for share in split_scenario({"mode": "normal"}, 2)]
+    report, _ = merge_results(results)
+    assert 2.0 <= report.summary()["latency_ms"]["service"]["p50"] <= 2.02
+    assert report.summary()["timeline"] == [{"second": 0, "requests": 3, "errors": 1}]
+
+
+def test_seeded_simulator_records_replayable_trace(tmp_path):
+    """Test a seeded run records the same trace twice, and replay resends it"""
+    async def record(path):
+        simulator = TrafficSimulator("http://test", transport=httpx.ASGITransport(app=app), seed=7)
+        simulator.engine.trace = TraceWriter(str(path), seed=7)
+        try:
+            await simulator.engine.run_open_loop(50, 0.4, simulator.normal_action)
+        finally:
+            simulator.engine.trace.close()
+            await simulator.close()
+
+    asyncio.run(record(tmp_path / "first.jsonl.gz"))
+    asyncio.run(record(tmp_path / "second.jsonl.gz"))
+    header, first = read_trace(tmp_path / "first.jsonl.gz")
+    _, second = read_trace(tmp_path / "second.jsonl.gz")
+    assert header == {"version": 1, "seed": 7}
+    assert len(first) == 20
+
+    # Order ids come from the server, whose store has moved on between runs
+    def workload(entries):
+        return [(entry["method"], entry.get("endpoint", entry["path"]), entry.get("json")) for entry in entries]
+
+    assert workload(first) == workload(second)
+    assert [entry["at"] for entry in first] == [i * 0.02 for i in range(20)]
+
+    async def run_replay():
+        async with in_process_engine() as engine:
+            await replay(engine, first, speed=0)
+            return engine.report.summary()
+
+    assert asyncio.run(run_replay())["requests"] == 20
+
+
+def test_replay_paces_at_scaled_speed():
+    """Test timed replay launches each request at its offset divided by speed"""
+    entries = [{"at": i * 0.1, "method": "GET", "path": "/health"} for i in range(5)]
+    launched = []
+
+    class Engine:
+        async def request(self, method, path, scheduled=None, **kwargs):
+            launched.append(scheduled)
+
+    asyncio.run(replay(Engine(), entries, speed=4))
+    gaps = [b - a for a, b in zip(launched, launched[1:])]
+    assert all(abs(gap - 0.025) < 1e-9 for gap in gaps)
+
+
+def test_trace_from_access_log():
+    """Test uvicorn and combined-format access lines become timed trace entries"""
+    lines = [
+        'INFO:     127.0.0.1:5000 - "GET /health HTTP/1.1" 200 OK',
+        'INFO:     127.0.0.1:5000 - "POST /orders HTTP/1.1" 201 Created',
+        'INFO:     Application startup complete.',
+        '10.0.0.1 - - [10/Oct/2025:13:55:36 +0000] "GET /orders?limit=10 HTTP/1.1" 200 512',
+        '10.0.0.1 - - [10/Oct/2025:13:55:38 +0000] "DELETE /orders/4 HTTP/1.1" 200 27',
+    ]
+    bodies = {"POST": {"product": "Laptop"}}
+    entries = list(entries_from_access_log(lines, payload=lambda method, path: bodies.get(method)))
+
+    assert [(entry["method"], entry["path"]) for entry in entries] == [
+        ("GET", "/health"), ("POST", "/orders"), ("GET", "/orders?limit=10"), ("DELETE", "/orders/4")
+    ]
+    assert entries[1]["json"] == {"product": "Laptop"}
+    assert entries[1]["at"] == 0.1
+    assert entries[3]["at"] - entries[2]["at"] == 2
+
+
+def test_trace_from_log_replays_cleanly(tmp_path, caplog):
+    """Test a trace built from an access log replays without errors, skipping id-bound batches"""
+    log = tmp_path / "access.log"
+    log.write_text("\n".join(
+        f'INFO:     127.0.0.1:5000 - "{method} {path} HTTP/1.1" 200 OK' for method, path in [
+            ("POST", "/orders"), ("POST", "/orders:batch"), ("PATCH", "/orders:batch"),
+            ("GET", "/health"), ("DELETE", "/orders:batch?dry=1"), ("GET", "/orders?limit=10"),
+        ]
+    ))
+    args = argparse.Namespace(trace_from_log=str(log), record=str(tmp_path / "trace.jsonl"), seed=3)
+    with caplog.at_level(logging.WARNING):
+        build_trace_from_log(args)
+    _, entries = read_trace(args.record)
+    assert [(entry["method"], entry["path"]) for entry in entries] == [
+        ("POST", "/orders"), ("POST", "/orders:batch"), ("GET", "/health"), ("GET", "/orders?limit=10")
+    ]
+    assert "Skipped 2 batch" in caplog.text
+
+    async def run_replay():
+        async with in_process_engine() as engine:
+            await replay(engine, entries, speed=0)
+            return engine.report.summary()
+
+    summary = asyncio.run(run_replay())
+    assert summary["requests"] == 4 and summary["errors"] == 0
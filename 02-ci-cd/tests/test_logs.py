@@ -0,0 +1,82 @@
+"""
+Logging Tests
+Tests the queued JSON logging pipeline, backpressure and size rotation
+"""
+import json
+import logging
+import queue
+
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from backend.app.logs import BatchWriter, JsonFormatter, QueueingHandler, request_id_var
+from backend.app.main import app
+
+
+def make_record(msg, *args, level=logging.INFO, **extra):
+    record = logging.LogRecord("test", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+
+def dropped(level):
+    return REGISTRY.get_sample_value("app_log_records_dropped_total", {"level": level}) or 0
+
+
+def test_json_formatter_includes_request_id_and_extra():
+    """Test records become one JSON object with the request ID and extra fields"""
+    handler = QueueingHandler(queue.Queue())
+    token = request_id_var.set("req-1")
+    try:
+        record = handler.prepare(make_record("Order created: %s", 7, order_id=7))
+    finally:
+        request_id_var.reset(token)
+
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "Order created: 7"
+    assert entry["request_id"] == "req-1"
+    assert entry["order_id"] == 7
+    assert entry["level"] == "INFO"
+
+
+def test_full_queue_drops_and_counts():
+    """Test a backed-up queue samples INFO, drops when full and never blocks"""
+    log_queue = queue.Queue(maxsize=10)
+    handler = QueueingHandler(log_queue, sample_every=5, high_water=0.5)
+    info_before, error_before = dropped("INFO"), dropped("ERROR")
+
+    for i in range(25):
+        handler.handle(make_record("info %d", i))
+    for i in range(10):
+        handler.handle(make_record("error %d", i, level=logging.ERROR))
+
+    # 5 INFO records fill to the high-water mark, then 1 in 5 of the other
+    # 20 is kept; ERRORs are never sampled but are dropped once full
+    assert log_queue.qsize() == 10
+    assert dropped("INFO") - info_before == 16
+    assert dropped("ERROR") - error_before == 9
+
+
+def test_writer_batches_and_rotates_by_size(tmp_path):
+    """Test the writer thread flushes queued records and rotates app.log"""
+    path = tmp_path / "logs" / "app.log"
+    log_queue = queue.Queue()
+    writer = BatchWriter(log_queue, path=str(path), console=False, max_bytes=2000, backup_count=2)
+    writer.start()
+    for i in range(100):
+        log_queue.put(make_record("line %03d", i))
+    writer.stop()
+
+    files = sorted(p.name for p in path.parent.iterdir())
+    assert files == ["app.log", "app.log.1", "app.log.2"]
+    assert all(p.stat().st_size <= 2000 for p in path.parent.iterdir())
+    last = path.read_text().splitlines()[-1]
+    assert json.loads(last)["msg"] == "line 099"
+
+
+def test_request_id_header():
+    """Test responses carry a generated or caller-supplied request ID"""
+    client = TestClient(app)
+    generated = client.get("/health").headers["X-Request-ID"]
+    assert len(generated) == 32
+    assert client.get("/health", headers={"X-Request-ID": "trace-abc"}).headers["X-Request-ID"] == "trace-abc"
@@ -0,0 +1,81 @@
+"""
+Metrics Tests
+Tests shared stats files and multiprocess metric aggregation across workers
+"""
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from backend.app.stats import SharedStatsAggregator, merge_stats_files
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+# Runs in a fresh interpreter so PROMETHEUS_MULTIPROC_DIR is seen before
+# prometheus_client is imported, like a real uvicorn worker.
+WORKER = """
+import json, sys
+from fastapi.testclient import TestClient
+from backend.app.main import app
+client = TestClient(app)
+for _ in range(int(sys.argv[1])):
+    client.post("/orders", json={"product": "Worker"})
+client.get("/orders/999999")
+print(json.dumps({
+    "stats": client.get("/api/stats").json(),
+    "metrics": client.get("/metrics").text
+}))
+"""
+
+
+def run_worker(directory, requests):
+    env = dict(os.environ, PROMETHEUS_MULTIPROC_DIR=str(directory), PYTHONPATH=str(PROJECT_ROOT))
+    result = subprocess.run(
+        [sys.executable, "-c", WORKER, str(requests)],
+        env=env, cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def sample(metrics_text, prefix):
+    """Sum the values of exposition lines starting with prefix"""
+    return sum(float(line.rsplit(" ", 1)[1]) for line in metrics_text.splitlines() if line.startswith(prefix))
+
+
+def test_shared_stats_sum_worker_files(tmp_path):
+    """Test readers see every worker's counts and merging keeps totals"""
+    first = SharedStatsAggregator(str(tmp_path))
+    first.record_request()
+    first.record_error()
+
+    # A second worker's file, written as if by another pid
+    other = tmp_path / "stats_1.bin"
+    other.write_bytes((tmp_path / f"stats_{os.getpid()}.bin").read_bytes())
+
+    assert first.snapshot()["total_requests"] == 2
+    assert first.snapshot()["total_errors"] == 2
+
+    merge_stats_files([other], tmp_path / "stats_archive.bin")
+    assert not other.exists()
+    snapshot = first.snapshot()
+    assert snapshot["total_requests"] == 2
+    assert snapshot["error_rates"]["1m"] == 100.0
+
+
+def test_multiprocess_totals_across_workers(tmp_path):
+    """Test /metrics and /api/stats aggregate all workers, including exited ones"""
+    first = run_worker(tmp_path, 3)
+    second = run_worker(tmp_path, 2)
+
+    # 3 creates + 1 miss from the first worker, 2 + 1 + the stats call from the second
+    assert second["stats"]["total_requests"] == 9
+    assert second["stats"]["total_errors"] == 2
+    assert sample(second["metrics"], 'app_requests_total{endpoint="/orders",method="POST"') == 5
+    assert sample(second["metrics"], "app_errors_total") == 2
+    assert first["stats"]["total_requests"] == 4
+
+    # The first worker has exited, so its files were compacted into archives
+    names = {path.name for path in tmp_path.iterdir()}
+    assert "counter_archive.db" in names
+    assert "stats_archive.bin" in names
@@ -0,0 +1,82 @@
+"""
+Rate Limit Tests
+Tests limit parsing, lazy token bucket refill and the middleware's headers
+"""
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY
+
+from backend.app import main
+from backend.app.main import app
+from backend.app.ratelimit import MemoryBuckets, RateLimit, create_buckets
+
+
+def test_parse_limits():
+    """Test limits parse to a bucket size and a refill rate per second"""
+    assert RateLimit.parse("600/minute") == RateLimit(600, 10.0)
+    assert RateLimit.parse("5/s") == RateLimit(5, 5.0)
+    assert RateLimit.parse("10/30").window == 30
+    with pytest.raises(ValueError):
+        RateLimit.parse("0/minute")
+    with pytest.raises(ValueError):
+        create_buckets("memcached://localhost")
+
+
+def test_buckets_refill_lazily_and_stay_bounded(clock):
+    """Test a bucket allows a burst, refills at its rate and old clients are evicted"""
+    buckets = MemoryBuckets(max_clients=2, clock=clock)
+    limit = RateLimit(3, 1.0)
+
+    async def take(key, times=1):
+        return [(await buckets.take(key, limit))[0] for _ in range(times)]
+
+    assert asyncio.run(take("a", 4)) == [True, True, True, False]
+    clock.now = 1.5  # 1.5 tokens back
+    assert asyncio.run(take("a", 2)) == [True, False]
+
+    asyncio.run(take("b"))
+    asyncio.run(take("c"))
+    assert len(buckets) == 2
+    assert asyncio.run(take("a", 3)) == [True, True, True]  # evicted, so full again
+
+
+@pytest.fixture
+def api_keys():
+    """Allow-list two API keys for the duration of a test"""
+    keys = {"rate-limit-test-alice", "rate-limit-test-bob"}
+    main.rate_limit_api_keys.update(keys)
+    yield keys
+    main.rate_limit_api_keys.difference_update(keys)
+
+
+def test_middleware_limits_per_client(monkeypatch, api_keys):
+    """Test RateLimit headers, 429 with Retry-After, per-key buckets and exempt routes"""
+    client = TestClient(app)
+    monkeypatch.setitem(main.rate_limits, "orders_read", RateLimit(2, 2 / 60))
+    alice = {"X-API-Key": "rate-limit-test-alice"}
+    labels = {"method": "GET", "endpoint": "/orders", "status": "429"}
+    limited = REGISTRY.get_sample_value("app_requests_total", labels) or 0
+
+    first = client.get("/orders", headers=alice)
+    assert first.status_code == 200
+    assert first.headers["RateLimit-Limit"] == "2" and first.headers["RateLimit-Remaining"] == "1"
+    assert first.headers["RateLimit-Policy"] == "2;w=60"
+    assert client.get("/orders", headers=alice).status_code == 200
+
+    response = client.get("/orders", headers=alice)
+    assert response.status_code == 429
+    assert 1 <= int(response.headers["Retry-After"]) <= 30
+    assert REGISTRY.get_sample_value("app_requests_total", labels) == limited + 1
+    assert client.get("/orders", headers={"X-API-Key": "rate-limit-test-bob"}).status_code == 200
+    assert "RateLimit-Limit" not in client.get("/health").headers
+
+
+def test_unknown_api_keys_share_the_client_bucket(monkeypatch, api_keys):
+    """Test rotating made-up API keys does not get a client a fresh bucket"""
+    client = TestClient(app)
+    monkeypatch.setitem(main.rate_limits, "api", RateLimit(2, 2 / 60))
+    statuses = [client.get("/api", headers={"X-API-Key": f"made-up-{i}"}).status_code for i in range(3)]
+    assert statuses == [200, 200, 429]
+    assert client.get("/api", headers={"X-API-Key": "rate-limit-test-alice"}).status_code == 200
@@ -0,0 +1,36 @@
+"""
+JSON Response Tests
+Tests the fast encoder matches the stdlib one and order routes use it
+"""
+import json
+
+from fastapi.testclient import TestClient
+
+from backend.app import responses
+from backend.app.main import app
+
+ORDER = {"id": 1, "product": "Câble USB ✓", "quantity": 2, "price": 9.99, "status": "pending",
+         "created_at": 1700000000.123456, "updated_at": None}
+
+
+def test_dumps_with_and_without_orjson(monkeypatch):
+    """Test both encoders produce the same compact JSON document"""
+    fast = responses.dumps({"orders": [ORDER], "total": 1})
+    monkeypatch.setattr(responses, "orjson", None)
+    stdlib = responses.dumps({"orders": [ORDER], "total": 1})
+    assert json.loads(fast) == json.loads(stdlib) == {"orders": [ORDER], "total": 1}
+    assert b" " not in stdlib.replace("Câble USB ✓".encode(), b"")
+
+
+def test_order_routes_keep_status_codes():
+    """Test order routes returning FastJSONResponse keep their status codes and bodies"""
+    client = TestClient(app)
+    created = client.post("/orders", json={"product": "Fast Monitor", "quantity": 1, "price": 150})
+    assert created.status_code == 201
+    assert created.headers["content-type"] == "application/json"
+    assert created.json()["product"] == "Fast Monitor"
+
+    batch = client.post("/orders:batch", json={"orders": [{"product": "Fast Mouse"}]})
+    assert batch.status_code == 201 and batch.json()["count"] == 1
+    updated = client.put(f"/orders/{created.json()['id']}", json={"quantity": 3})
+    assert updated.status_code == 200 and updated.json()["quantity"] == 3
@@ -0,0 +1,38 @@
+"""
+Stats Aggregator Tests
+Tests running totals and windowed rates
+"""
+from backend.app.stats import StatsAggregator
+
+
+def test_totals_and_error_rate(clock):
+    """Test totals accumulate and overall error rate is derived"""
+    aggregator = StatsAggregator(clock=clock)
+    for _ in range(4):
+        aggregator.record_request()
+    aggregator.record_error()
+
+    snapshot = aggregator.snapshot()
+    assert snapshot["total_requests"] == 4
+    assert snapshot["total_errors"] == 1
+    assert snapshot["error_rate"] == 25.0
+    assert snapshot["error_rates"]["1m"] == 25.0
+
+
+def test_windows_expire_old_buckets(clock):
+    """Test events age out of shorter windows but stay in totals"""
+    aggregator = StatsAggregator(clock=clock)
+    aggregator.record_request()
+    aggregator.record_error()
+
+    clock.now += 120
+    aggregator.record_request()
+
+    snapshot = aggregator.snapshot()
+    assert snapshot["error_rates"]["1m"] == 0
+    assert snapshot["error_rates"]["5m"] == 50.0
+    assert snapshot["request_rates"]["5m"] == round(2 / 300, 3)
+
+    clock.now += 3600
+    assert aggregator.window_totals(900) == {"requests": 0, "errors": 0}
+    assert aggregator.snapshot()["total_requests"] == 2
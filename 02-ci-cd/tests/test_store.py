@@ -0,0 +1,280 @@
+"""
+Order Store Tests
+Tests pagination, filtering and persistence across storage backends
+"""
+import asyncio
+import random
+
+import pytest
+from backend.app.store import MemoryOrderStore, OrderNotFound, SQLiteOrderStore, VersionConflict, create_store
+
+
+def run(coro):
+    """Run a store coroutine to completion"""
+    return asyncio.run(coro)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    """Create a store of each backend with a small mixed dataset"""
+    if request.param == "memory":
+        store = MemoryOrderStore()
+    else:
+        store = SQLiteOrderStore(str(tmp_path / "orders.db"), pool_size=2)
+
+    async def seed():
+        for i in range(10):
+            await store.create("Laptop" if i % 2 == 0 else "Mouse", 1, 10.0)
+        await store.update(3, status="shipped")
+        await store.update(4, status="shipped")
+
+    run(seed())
+    yield store
+    run(store.close())
+
+
+def ids(orders):
+    return [order["id"] for order in orders]
+
+
+def test_count_is_maintained(store):
+    """Test count tracks creates and deletes"""
+    assert run(store.count()) == 10
+    assert run(store.delete(5))
+    assert run(store.count()) == 9
+    assert not run(store.delete(5))
+    assert run(store.count()) == 9
+
+
+def test_get_and_update(store):
+    """Test single-order reads and partial updates"""
+    order = run(store.update(2, quantity=7))
+    assert order["quantity"] == 7
+    assert order["status"] == "pending"
+    assert "updated_at" in order
+    assert run(store.get(2))["quantity"] == 7
+    assert run(store.get(999)) is None
+    assert run(store.update(999, status="shipped")) is None
+
+
+def test_cursor_pagination(store):
+    """Test pages follow the cursor without overlap"""
+    first = run(store.list(4))
+    second = run(store.list(4, cursor=first[-1]["id"]))
+    assert ids(first) == [1, 2, 3, 4]
+    assert ids(second) == [5, 6, 7, 8]
+
+
+def test_descending_pagination(store):
+    """Test newest-first pages"""
+    assert ids(run(store.list(3, descending=True))) == [10, 9, 8]
+    assert ids(run(store.list(3, cursor=8, descending=True))) == [7, 6, 5]
+
+
+def test_descending_pagination_ends(store):
+    """Test newest-first pages stop at the oldest order instead of wrapping around"""
+    assert ids(run(store.list(2, cursor=3, descending=True))) == [2, 1]
+    assert ids(run(store.list(2, cursor=2, descending=True))) == [1]
+    assert run(store.list(2, cursor=1, descending=True)) == []
+    assert run(store.list(2, cursor=0, descending=True)) == []
+    created = {o["id"]: o["created_at"] for o in run(store.list(10))}
+    assert ids(run(store.list(5, cursor=3, descending=True, created_before=created[2]))) == [1]
+    run(store.delete(1))
+    assert run(store.list(2, cursor=2, descending=True)) == []
+    assert run(store.list(2, descending=True, created_before=created[2])) == []
+
+
+def test_filters(store):
+    """Test status and product filters combine"""
+    assert ids(run(store.list(10, status="shipped"))) == [3, 4]
+    assert ids(run(store.list(10, product="Mouse", status="shipped"))) == [4]
+    assert run(store.list(10, status="cancelled")) == []
+    run(store.delete(4))
+    assert ids(run(store.list(10, status="shipped"))) == [3]
+
+
+def test_created_at_range(store):
+    """Test created_at bounds are inclusive/exclusive"""
+    created = {o["id"]: o["created_at"] for o in run(store.list(10))}
+    page = run(store.list(10, created_after=created[3], created_before=created[6]))
+    assert page
+    assert all(created[3] <= o["created_at"] < created[6] for o in page)
+
+
+def test_sqlite_persists_across_instances(tmp_path):
+    """Test a reopened SQLite store sees earlier writes and continues ids"""
+    path = str(tmp_path / "orders.db")
+    first = SQLiteOrderStore(path)
+    created = run(first.create("Monitor", 2, 199.0))
+    run(first.close())
+
+    second = SQLiteOrderStore(path)
+    assert run(second.get(created["id"]))["product"] == "Monitor"
+    assert run(second.create("Webcam", 1, 49.0))["id"] == created["id"] + 1
+    assert run(second.count()) == 2
+    run(second.close())
+
+
+def test_sqlite_concurrent_writes_are_batched(tmp_path):
+    """Test concurrent creates all commit with distinct ids"""
+    store = SQLiteOrderStore(str(tmp_path / "orders.db"))
+
+    async def burst():
+        return await asyncio.gather(*(store.create("Mouse", 1, 9.99) for _ in range(200)))
+
+    orders = run(burst())
+    assert len({order["id"] for order in orders}) == 200
+    assert run(store.count()) == 200
+    run(store.close())
+
+
+def test_create_store_selects_backend(tmp_path):
+    """Test DATABASE_URL selects the backend"""
+    assert isinstance(create_store(None), MemoryOrderStore)
+    sqlite_store = create_store(f"sqlite:///{tmp_path}/orders.db")
+    assert isinstance(sqlite_store, SQLiteOrderStore)
+    run(sqlite_store.close())
+    with pytest.raises(ValueError):
+        create_store("postgresql://localhost/orders")
+
+
+def test_batch_operations_are_atomic(store):
+    """Test batch updates and deletes apply all or nothing"""
+    created = run(store.create_many([("Tablet", 1, 300.0), ("Speaker", 2, 80.0)]))
+    assert ids(created) == [11, 12]
+
+    with pytest.raises(OrderNotFound) as exc:
+        run(store.update_many([(11, "shipped", None), (999, "shipped", None)]))
+    assert exc.value.order_ids == [999]
+    assert run(store.get(11))["status"] == "pending"
+
+    with pytest.raises(OrderNotFound):
+        run(store.delete_many([11, 12, 999]))
+    assert run(store.count()) == 12
+
+    updated = run(store.update_many([(11, "shipped", None), (12, None, 4)]))
+    assert updated[0]["status"] == "shipped" and updated[1]["quantity"] == 4
+    assert run(store.delete_many([11, 12, 12])) == 2
+    assert run(store.count()) == 10
+
+
+def test_reads_return_copies_after_deletes(store):
+    """Test returned orders are snapshots and rows stay aligned after deletes"""
+    order = run(store.get(6))
+    order["status"] = "tampered"
+    assert run(store.get(6))["status"] == "pending"
+
+    assert run(store.delete_many([1, 2, 7]))
+    assert ids(run(store.list(10))) == [3, 4, 5, 6, 8, 9, 10]
+    assert ids(run(store.list(2, cursor=6, descending=True))) == [5, 4]
+    assert ids(run(store.list(10, status="shipped", product="Mouse"))) == [4]
+    assert ids(run(store.list(10, status="never-seen"))) == []
+    assert run(store.get(8)) == run(store.list(1, cursor=7))[0]
+
+
+def test_versions_guard_concurrent_writes(store):
+    """Test every write bumps the version and a stale version changes nothing"""
+    assert run(store.get(1))["version"] == 1 and run(store.get(3))["version"] == 2
+
+    async def race():
+        return await asyncio.gather(*(store.update(1, quantity=n, version=1) for n in (2, 3)),
+                                    return_exceptions=True)
+
+    results = run(race())
+    assert [type(result) for result in results] == [dict, VersionConflict]
+    assert run(store.get(1))["quantity"] == 2 and run(store.get(1))["version"] == 2
+
+    with pytest.raises(VersionConflict) as exc:
+        run(store.update_many([(1, "shipped", None), (2, "shipped", None)], versions={1: 2, 2: 5}))
+    assert exc.value.order_ids == [2]
+    assert run(store.get(1))["status"] == "pending"
+
+    with pytest.raises(VersionConflict):
+        run(store.delete(1, version=1))
+    assert run(store.update(999, quantity=2, version=1)) is None
+    assert run(store.delete(1, version=2))
+    assert ids(run(store.list(1))) == [2]
+
+
+def test_out_of_range_values_leave_store_intact(store):
+    """Test a quantity too large for the store is rejected without corrupting it"""
+    with pytest.raises((ValueError, OverflowError)):
+        run(store.create("Huge", 10 ** 20, 1.0))
+    with pytest.raises((ValueError, OverflowError)):
+        run(store.create_many([("Fine", 1, 1.0), ("Huge", 2 ** 63, 1.0)]))
+    with pytest.raises((ValueError, OverflowError)):
+        run(store.update(1, status="shipped", quantity=2 ** 63))
+    assert run(store.count()) == 10 and run(store.get(1))["status"] == "pending"
+
+    created = run(store.create("Fine", 2 ** 63 - 1, 1.0))
+    assert run(store.get(created["id"]))["quantity"] == 2 ** 63 - 1
+    assert ids(run(store.list(2, descending=True))) == [created["id"], 10]
+
+
+def test_memory_deletes_are_marked_then_compacted():
+    """Test deletes leave the columns alone until dead rows pass the compaction threshold"""
+    store = MemoryOrderStore()
+    store.compact_min = 0
+    run(store.create_many([("Laptop" if i % 2 else "Mouse", 1, 1.0) for i in range(20)]))
+    run(store.delete_many([2, 3, 4]))  # 3 of 20 dead: below a quarter
+    assert len(store._ids) == 20 and run(store.count()) == 17
+    assert ids(run(store.list(3))) == [1, 5, 6]
+    assert ids(run(store.list(3, cursor=6, descending=True))) == [5, 1]
+    assert ids(run(store.list(3, product="Laptop"))) == [6, 8, 10]
+    assert run(store.get(3)) is None and not run(store.delete(3))
+
+    run(store.delete_many([5, 6, 7]))  # 6 of 20: compacted
+    assert len(store._ids) == 14 == run(store.count())
+    assert ids(run(store.list(3))) == [1, 8, 9]
+    assert ids(run(store.list(2, product="Mouse", descending=True))) == [19, 17]
+
+
+def test_memory_interned_values_are_freed():
+    """Test statuses and products no order uses any more do not stay interned"""
+    store = MemoryOrderStore()
+    order = run(store.create("Laptop", 1, 1.0))
+    for i in range(100):
+        run(store.update(order["id"], status=f"status-{i}"))
+    assert set(store._statuses.codes) == {"status-99"}
+    run(store.create("Mouse", 1, 1.0))
+    run(store.delete(order["id"]))
+    assert set(store._statuses.codes) == {"pending"} and set(store._products.codes) == {"Mouse"}
+    assert run(store.list(10, status="status-99")) == [] and run(store.list(10, product="Laptop")) == []
+    run(store.create("Tablet", 1, 1.0))
+    assert len(store._products.values) == 2  # the freed code was reused
+    assert [o["product"] for o in run(store.list(10))] == ["Mouse", "Tablet"]
+
+
+def test_memory_store_matches_a_plain_model():
+    """Test random writes and pages agree with a dict of orders, across compactions"""
+    rng = random.Random(7)
+    store = MemoryOrderStore()
+    store.compact_min = 8
+    model = {}
+    for step in range(600):
+        action = rng.random()
+        if action < 0.4 or not model:
+            order = run(store.create(rng.choice("ABC"), 1, 1.0))
+            model[order["id"]] = order
+        elif action < 0.6:
+            order_id = rng.choice(list(model))
+            model[order_id] = run(store.update(order_id, status=rng.choice(["pending", "shipped", f"s{step}"])))
+        else:
+            doomed = rng.sample(list(model), min(len(model), rng.randint(1, 5)))
+            run(store.delete_many(doomed))
+            for order_id in doomed:
+                del model[order_id]
+        cursor = rng.choice([None, *model]) if model else None
+        status, product = rng.choice([None, "pending", "shipped"]), rng.choice([None, "A", "B"])
+        expected = sorted(order_id for order_id, order in model.items()
+                          if (status is None or order["status"] == status)
+                          and (product is None or order["product"] == product))
+        descending = rng.random() < 0.5
+        if descending:
+            expected = [i for i in reversed(expected) if cursor is None or i < cursor]
+        else:
+            expected = [i for i in expected if cursor is None or i > cursor]
+        page = run(store.list(4, cursor=cursor, descending=descending, status=status, product=product))
+        assert ids(page) == expected[:4]
+        assert run(store.count()) == len(model)
+    assert set(store._statuses.codes) == {order["status"] for order in model.values()}
@@ -3,15 +3,27 @@
 Traffic Simulator - Universal Traffic Generator
 Can be used with any REST API application
 Generates realistic traffic patterns including normal requests and error scenarios
+
+Requests are sent by an asyncio engine over pooled keep-alive connections.
+Paced modes use an open-loop constant arrival rate, so a single process can
+offer thousands of requests per second without the rate drifting with latency.
 """
 
-import requests
-import time
+import asyncio
 import random
 import logging
-import sys
 import argparse
-from datetime import datetime
+
+from loadgen.distributed import coordinate, run_local, serve_worker, wait_for_start
+from loadgen.engine import LoadEngine
+from loadgen.trace import TraceWriter, entries_from_access_log, read_trace, replay, write_trace
+
+try:
+    import uvloop
+except ImportError:  # uvloop is optional; the default loop works too
+    uvloop = None
+
+run_async = uvloop.run if uvloop is not None else asyncio.run
 
 logging.basicConfig(
     level=logging.INFO,
@@ -21,203 +33,382 @@ logger = logging.getLogger(__name__)
 
 DEFAULT_URL = "http://localhost:5001"
 
+ERROR_TYPES = ['500', '404', 'timeout', 'validation']
+
+MODES = ['normal', 'stress', 'error', 'mixed', 'continuous']
+
+# Default duration (seconds) and arrival rate (requests/second) of each mode
+MODE_DEFAULTS = {
+    'normal': (60, 0.5),
+    'stress': (30, 10),
+    'error': (30, 0.3),
+    'mixed': (120, 0.5),
+    'continuous': (60, 0.5)
+}
+
 PRODUCTS = [
     "Laptop", "Smartphone", "Headphones", "Monitor", "Keyboard",
     "Mouse", "Webcam", "Tablet", "Smartwatch", "Speaker"
 ]
 
+
+def random_order(rng=random):
+    return {
+        "product": rng.choice(PRODUCTS),
+        "quantity": rng.randint(1, 5),
+        "price": round(rng.uniform(9.99, 999.99), 2)
+    }
+
+
 class TrafficSimulator:
-    def __init__(self, base_url=DEFAULT_URL):
-        self.base_url = base_url.rstrip('/')
+    def __init__(self, base_url=DEFAULT_URL, max_connections=200, transport=None, seed=None):
+        self.engine = LoadEngine(base_url, max_connections=max_connections, transport=transport)
+        # Seeded runs draw the same actions and payloads every time
+        self.rng = random.Random(seed)
+        self.base_url = self.engine.base_url
         self.created_orders = []
 
-    def create_order(self):
+    async def close(self):
+        await self.engine.close()
+
+    async def create_order(self, scheduled=None):
         """Simulate creating an order"""
-        try:
-            order_data = {
-                "product": random.choice(PRODUCTS),
-                "quantity": random.randint(1, 5),
-                "price": round(random.uniform(9.99, 999.99), 2)
-            }
-            response = requests.post(f"{self.base_url}/orders", json=order_data, timeout=5)
-            if response.status_code == 201:
-                order = response.json()
-                self.created_orders.append(order['id'])
-                logger.info(f"✅ Created order {order['id']}: {order_data['product']} x{order_data['quantity']}")
-                return order
-        except Exception as e:
-            logger.error(f"❌ Failed to create order: {e}")
+        order_data = random_order(self.rng)
+        response = await self.engine.request("POST", "/orders", json=order_data, scheduled=scheduled)
+        if response is not None and response.status_code == 201:
+            order = response.json()
+            self.created_orders.append(order['id'])
+            logger.debug(f"✅ Created order {order['id']}: {order_data['product']} x{order_data['quantity']}")
+            return order
         return None
 
-    def get_orders(self):
-        """Fetch all orders"""
-        try:
-            response = requests.get(f"{self.base_url}/orders", timeout=5)
-            if response.status_code == 200:
-                data = response.json()
-                logger.info(f"📋 Fetched {data['total']} orders")
-                return data
-        except Exception as e:
-            logger.error(f"❌ Failed to fetch orders: {e}")
+    async def create_orders(self, count, scheduled=None):
+        """Create several orders in one batch request"""
+        orders = [random_order(self.rng) for _ in range(count)]
+        response = await self.engine.request(
+            "POST", "/orders:batch", json={"orders": orders}, scheduled=scheduled
+        )
+        if response is not None and response.status_code == 201:
+            created = response.json()["orders"]
+            self.created_orders.extend(order['id'] for order in created)
+            logger.debug(f"✅ Created {len(created)} orders in one batch")
+            return created
         return None
 
-    def update_order(self):
+    async def get_orders(self, scheduled=None):
+        """Fetch the newest page of orders"""
+        response = await self.engine.request("GET", "/orders", params={"order": "desc"}, scheduled=scheduled)
+        if response is not None and response.status_code == 200:
+            data = response.json()
+            logger.debug(f"📋 Fetched {len(data['orders'])} of {data['total']} orders")
+            return data
+        return None
+
+    async def update_order(self, scheduled=None):
         """Update a random order"""
         if not self.created_orders:
             return None
 
-        try:
-            order_id = random.choice(self.created_orders)
-            status = random.choice(["processing", "shipped", "delivered"])
-            response = requests.put(
-                f"{self.base_url}/orders/{order_id}",
-                json={"status": status},
-                timeout=5
-            )
-            if response.status_code == 200:
-                logger.info(f"🔄 Updated order {order_id} to status: {status}")
-                return response.json()
-        except Exception as e:
-            logger.error(f"❌ Failed to update order: {e}")
+        order_id = self.rng.choice(self.created_orders)
+        status = self.rng.choice(["processing", "shipped", "delivered"])
+        response = await self.engine.request(
+            "PUT", f"/orders/{order_id}", endpoint="/orders/{order_id}", json={"status": status}, scheduled=scheduled
+        )
+        if response is not None and response.status_code == 200:
+            logger.debug(f"🔄 Updated order {order_id} to status: {status}")
+            return response.json()
         return None
 
-    def delete_order(self):
+    async def delete_order(self, scheduled=None):
         """Delete a random order"""
         if not self.created_orders:
             return None
 
-        try:
-            order_id = self.created_orders.pop(random.randint(0, len(self.created_orders) - 1))
-            response = requests.delete(f"{self.base_url}/orders/{order_id}", timeout=5)
-            if response.status_code == 200:
-                logger.info(f"🗑️  Deleted order {order_id}")
-                return True
-        except Exception as e:
-            logger.error(f"❌ Failed to delete order: {e}")
+        order_id = self.created_orders.pop(self.rng.randint(0, len(self.created_orders) - 1))
+        response = await self.engine.request(
+            "DELETE", f"/orders/{order_id}", endpoint="/orders/{order_id}", scheduled=scheduled
+        )
+        if response is not None and response.status_code == 200:
+            logger.debug(f"🗑️  Deleted order {order_id}")
+            return True
         return None
 
-    def check_health(self):
+    async def check_health(self, scheduled=None):
         """Health check"""
-        try:
-            response = requests.get(f"{self.base_url}/health", timeout=5)
-            if response.status_code == 200:
-                logger.info("💚 Health check passed")
-                return True
-        except Exception as e:
-            logger.error(f"❌ Health check failed: {e}")
+        response = await self.engine.request("GET", "/health", scheduled=scheduled)
+        if response is not None and response.status_code == 200:
+            logger.debug("💚 Health check passed")
+            return True
         return False
 
-    def simulate_error(self, error_type=None):
+    async def simulate_error(self, error_type=None, scheduled=None):
         """Trigger error simulation"""
+        params = {"error_type": error_type} if error_type else {}
+        response = await self.engine.request("GET", "/simulate-error", params=params, scheduled=scheduled)
+        if response is None:
+            logger.debug("⚠️  Request timeout (expected for timeout simulation)")
+        else:
+            logger.debug(f"⚠️  Simulated error: {response.status_code} - {error_type or 'random'}")
+
+    async def normal_action(self, scheduled):
+        action = self.rng.choices(
+            [self.create_order, self.get_orders, self.update_order, self.delete_order, self.check_health],
+            weights=[40, 30, 15, 5, 10]  # Weighted distribution
+        )[0]
+        await action(scheduled)
+
+    async def error_action(self, scheduled):
+        await self.simulate_error(self.rng.choice(ERROR_TYPES), scheduled)
+
+    async def mixed_action(self, scheduled):
+        scenario = self.rng.choices(['normal', 'error', 'stress'], weights=[70, 20, 10])[0]
+        if scenario == 'normal':
+            action = self.rng.choice([self.create_order, self.get_orders, self.update_order, self.check_health])
+            await action(scheduled)
+        elif scenario == 'error':
+            # Picked here rather than by the server so seeded runs repeat exactly
+            await self.simulate_error(self.rng.choice(ERROR_TYPES), scheduled)
+        else:
+            await self.create_orders(5, scheduled)
+
+    async def _run(self, description, run):
+        """Run a scenario with periodic progress logging"""
+        start_sent = self.engine.stats.sent
+        progress = asyncio.create_task(self.engine.report_progress())
         try:
-            params = {"type": error_type} if error_type else {}
-            response = requests.get(f"{self.base_url}/simulate-error", params=params, timeout=10)
-            logger.warning(f"⚠️  Simulated error: {response.status_code} - {error_type or 'random'}")
-        except requests.exceptions.Timeout:
-            logger.warning("⚠️  Request timeout (expected for timeout simulation)")
-        except Exception as e:
-            logger.error(f"❌ Error simulation failed: {e}")
-
-    def run_normal_traffic(self, duration_seconds=60, requests_per_minute=30):
+            await run
+        finally:
+            progress.cancel()
+        logger.info(f"✅ {description} complete: {self.engine.stats.sent - start_sent} requests")
+
+    async def run_normal_traffic(self, duration_seconds=60, requests_per_minute=30):
         """Generate normal traffic pattern"""
         logger.info(f"🚀 Starting normal traffic simulation for {duration_seconds}s")
-        logger.info(f"📊 Target: ~{requests_per_minute} requests/minute")
+        logger.info(f"📊 Target: {requests_per_minute} requests/minute")
+        await self._run("Normal traffic", self.engine.run_open_loop(
+            requests_per_minute / 60, duration_seconds, self.normal_action
+        ))
+
+    async def run_stress_test(self, duration_seconds=30, requests_per_second=10, users=None):
+        """Generate high traffic load: a fixed arrival rate, or N users as fast as possible"""
+        logger.info(f"⚡ Starting stress test for {duration_seconds}s")
+        if users:
+            logger.info(f"📊 Target: {users} concurrent users, no pacing")
+            run = self.engine.run_closed_loop(users, duration_seconds, self.create_order)
+        else:
+            logger.info(f"📊 Target: {requests_per_second} requests/second")
+            run = self.engine.run_open_loop(requests_per_second, duration_seconds, self.create_order)
+        await self._run("Stress test", run)
+
+    async def run_error_scenario(self, duration_seconds=30, requests_per_second=0.3):
+        """Generate various error scenarios"""
+        logger.info(f"💥 Starting error scenario simulation for {duration_seconds}s")
+        await self._run("Error scenario", self.engine.run_open_loop(
+            requests_per_second, duration_seconds, self.error_action
+        ))
+
+    async def run_mixed_scenario(self, duration_seconds=120, requests_per_second=0.5):
+        """Run a mix of normal traffic, stress, and errors"""
+        logger.info(f"🎭 Starting mixed scenario for {duration_seconds}s")
+        logger.info("Mix: 70% normal, 20% errors, 10% stress")
+        await self._run("Mixed scenario", self.engine.run_open_loop(
+            requests_per_second, duration_seconds, self.mixed_action
+        ))
 
-        start_time = time.time()
-        request_count = 0
 
-        while time.time() - start_time < duration_seconds:
-            action = random.choices(
-                ['create', 'read', 'update', 'delete', 'health'],
-                weights=[40, 30, 15, 5, 10]  # Weighted distribution
-            )[0]
+def write_report(report, args):
+    """Log the latency table and export the run summary if asked to"""
+    if not report.endpoints:
+        return
+    summary = report.summary()
+    logger.info(
+        f"📈 {summary['requests']} requests in {summary['duration_seconds']}s "
+        f"({summary['throughput_rps']} req/s), {summary['errors']} errors {summary['statuses']}"
+    )
+    logger.info(f"⏱️  Latency in ms, measured from each request's scheduled start:\n{report.format_table()}")
+    if args.report_json:
+        report.write_json(args.report_json)
+        logger.info(f"💾 JSON report written to {args.report_json}")
+    if args.report_csv:
+        report.write_csv(args.report_csv)
+        logger.info(f"💾 CSV report written to {args.report_csv}")
+
+
+def build_scenario(args, mode):
+    """Scenario dict for a mode, with the mode's defaults filled in"""
+    duration, rate = MODE_DEFAULTS[mode]
+    return {
+        "mode": mode,
+        "url": args.url,
+        "duration": args.duration or duration,
+        "rate": args.rate or rate,
+        "users": args.users if mode == 'stress' else None,
+        "connections": args.connections,
+        "seed": args.seed
+    }
+
+
+async def run_mode(simulator, scenario):
+    mode, duration, rate = scenario["mode"], scenario["duration"], scenario["rate"]
+    if mode == 'normal':
+        await simulator.run_normal_traffic(duration_seconds=duration, requests_per_minute=rate * 60)
+    elif mode == 'stress':
+        await simulator.run_stress_test(duration_seconds=duration, requests_per_second=rate, users=scenario["users"])
+    elif mode == 'error':
+        await simulator.run_error_scenario(duration_seconds=duration, requests_per_second=rate)
+    elif mode == 'mixed':
+        await simulator.run_mixed_scenario(duration_seconds=duration, requests_per_second=rate)
+    else:
+        logger.info("Running continuous traffic (Ctrl+C to stop)")
+        while True:
+            await simulator.run_mixed_scenario(duration_seconds=duration, requests_per_second=rate)
 
-            if action == 'create':
-                self.create_order()
-            elif action == 'read':
-                self.get_orders()
-            elif action == 'update':
-                self.update_order()
-            elif action == 'delete':
-                self.delete_order()
-            elif action == 'health':
-                self.check_health()
 
-            request_count += 1
+async def check_target(simulator):
+    """Check if app is running"""
+    if not await simulator.check_health():
+        logger.error(f"❌ Cannot connect to {simulator.base_url}")
+        logger.error("Make sure the target application is running")
+        logger.info("For demo app: cd 02-ci-cd && docker compose up -d")
+        return False
+    logger.info(f"✅ Connected to {simulator.base_url}")
+    return True
 
-            # Sleep to maintain target requests per minute
-            time.sleep(60 / requests_per_minute + random.uniform(-0.5, 0.5))
 
-        logger.info(f"✅ Completed {request_count} requests in {duration_seconds}s")
+async def run_simulation(args, scenario):
+    simulator = TrafficSimulator(
+        base_url=scenario["url"], max_connections=scenario["connections"], seed=scenario["seed"]
+    )
+    try:
+        if not await check_target(simulator):
+            return False
+        if args.record:
+            simulator.engine.trace = TraceWriter(args.record, source="simulator", **{
+                key: scenario[key] for key in ("mode", "rate", "users", "duration", "seed")
+            })
+        await run_mode(simulator, scenario)
+        return True
+    finally:
+        await simulator.close()
+        if simulator.engine.trace is not None:
+            simulator.engine.trace.close()
+            logger.info(f"💾 Recorded {simulator.engine.trace.count} requests to {args.record}")
+        write_report(simulator.engine.report, args)
+
+
+async def run_replay(args):
+    """Send a recorded trace again, at its recorded pace scaled by --speed"""
+    header, entries = read_trace(args.replay)
+    simulator = TrafficSimulator(base_url=args.url, max_connections=args.connections)
+    try:
+        if not await check_target(simulator):
+            return False
+        pace = f"{args.speed:g}x speed" if args.speed else "maximum speed"
+        logger.info(f"🔁 Replaying {len(entries)} requests from {args.replay} ({header.get('source')}) at {pace}")
+        await simulator._run("Replay", replay(
+            simulator.engine, entries, speed=args.speed, concurrency=args.connections
+        ))
+        return True
+    finally:
+        await simulator.close()
+        write_report(simulator.engine.report, args)
+
+
+def log_payload(rng):
+    """Bodies for writes rebuilt from an access log, which records none"""
+    def payload(method, path):
+        route = path.split('?', 1)[0]
+        if method == 'POST' and route == '/orders':
+            return random_order(rng)
+        if method == 'POST' and route == '/orders:batch':
+            return {"orders": [random_order(rng) for _ in range(5)]}
+        if method == 'PUT' and route.startswith('/orders/'):
+            return {"status": rng.choice(["processing", "shipped", "delivered"])}
+        return None
+    return payload
 
-    def run_stress_test(self, duration_seconds=30, requests_per_second=10):
-        """Generate high traffic load"""
-        logger.info(f"⚡ Starting stress test for {duration_seconds}s")
-        logger.info(f"📊 Target: {requests_per_second} requests/second")
 
-        start_time = time.time()
-        request_count = 0
+# Batch updates and deletes name existing orders in their body, which an
+# access log does not keep; made-up ids would only replay as errors
+BATCH_BY_ID = {('PATCH', '/orders:batch'), ('DELETE', '/orders:batch')}
 
-        while time.time() - start_time < duration_seconds:
-            self.create_order()
-            request_count += 1
-            time.sleep(1 / requests_per_second)
 
-        logger.info(f"✅ Stress test complete: {request_count} requests")
+def build_trace_from_log(args):
+    skipped = 0
 
-    def run_error_scenario(self, duration_seconds=30):
-        """Generate various error scenarios"""
-        logger.info(f"💥 Starting error scenario simulation for {duration_seconds}s")
+    def replayable(entries):
+        nonlocal skipped
+        for entry in entries:
+            if (entry["method"], entry["path"].split('?', 1)[0]) in BATCH_BY_ID:
+                skipped += 1
+            else:
+                yield entry
 
-        start_time = time.time()
-        error_types = ['500', '404', 'timeout', 'validation']
+    with open(args.trace_from_log, encoding='utf-8', errors='replace') as log:
+        entries = entries_from_access_log(log, payload=log_payload(random.Random(args.seed)))
+        count = write_trace(args.record, replayable(entries), source=args.trace_from_log, seed=args.seed)
+    if skipped:
+        logger.warning("Skipped %d batch update/delete requests: the log does not say which orders they named",
+                       skipped)
+    logger.info(f"💾 Built a {count}-request trace from {args.trace_from_log} into {args.record}")
 
-        while time.time() - start_time < duration_seconds:
-            error_type = random.choice(error_types)
-            self.simulate_error(error_type)
-            time.sleep(random.uniform(2, 5))
 
-        logger.info("✅ Error scenario complete")
+def run_share(share):
+    """Run one distributed worker's share of a scenario in this process"""
+    wait_for_start(share)
 
-    def run_mixed_scenario(self, duration_seconds=120):
-        """Run a mix of normal traffic, stress, and errors"""
-        logger.info(f"🎭 Starting mixed scenario for {duration_seconds}s")
-        logger.info("Mix: 70% normal, 20% errors, 10% stress")
+    async def run():
+        seed = share["seed"] + share["worker"] if share.get("seed") is not None else None
+        simulator = TrafficSimulator(base_url=share["url"], max_connections=share["connections"], seed=seed)
+        try:
+            await run_mode(simulator, share)
+        finally:
+            await simulator.close()
+        return {"report": simulator.engine.report.to_dict(), "stats": simulator.engine.stats.as_dict()}
 
-        start_time = time.time()
+    return run_async(run())
 
-        while time.time() - start_time < duration_seconds:
-            scenario = random.choices(
-                ['normal', 'error', 'stress'],
-                weights=[70, 20, 10]
-            )[0]
 
-            if scenario == 'normal':
-                action = random.choice(['create', 'read', 'update', 'health'])
-                if action == 'create':
-                    self.create_order()
-                elif action == 'read':
-                    self.get_orders()
-                elif action == 'update':
-                    self.update_order()
-                else:
-                    self.check_health()
-                time.sleep(random.uniform(1, 3))
+async def probe(url):
+    simulator = TrafficSimulator(base_url=url)
+    try:
+        return await check_target(simulator)
+    finally:
+        await simulator.close()
 
-            elif scenario == 'error':
-                self.simulate_error()
-                time.sleep(random.uniform(2, 4))
 
-            elif scenario == 'stress':
-                for _ in range(5):
-                    self.create_order()
-                time.sleep(1)
+def run_distributed(args, scenario):
+    """Split the scenario across local worker processes or remote workers"""
+    if scenario["mode"] == 'continuous':
+        logger.error("Continuous mode cannot be distributed; use mixed with a --duration")
+        return False
+    if args.record:
+        logger.error("Traces are recorded by a single process; drop --workers to use --record")
+        return False
+    if args.coordinator:
+        host, port = args.coordinator
+        report, stats = coordinate(scenario, args.workers, host, port)
+    else:
+        if not run_async(probe(scenario["url"])):
+            return False
+        report, stats = run_local(run_share, scenario, args.workers)
+    logger.info(
+        f"🧮 Merged {args.workers} workers: sent={stats['sent']} ok={stats['succeeded']} "
+        f"failed={stats['failed']} dropped={stats['dropped']}"
+    )
+    write_report(report, args)
+    return True
 
-        logger.info("✅ Mixed scenario complete")
 
+def address(value):
+    """HOST:PORT command-line argument"""
+    host, _, port = value.rpartition(':')
+    if not port.isdigit():
+        raise argparse.ArgumentTypeError(f"expected HOST:PORT, got {value!r}")
+    return host or '0.0.0.0', int(port)
 
-def main():
-    """Main entry point"""
+
+def build_parser():
     parser = argparse.ArgumentParser(
         description='Universal Traffic Simulator for REST APIs',
         formatter_class=argparse.RawDescriptionHelpFormatter,
@@ -232,6 +423,27 @@ Examples:
   # Run specific mode
   python traffic_simulator.py --mode normal
   python traffic_simulator.py --mode stress --url http://localhost:8080
+
+  # Open-loop stress at 2000 req/s, or 200 users as fast as possible
+  python traffic_simulator.py --mode stress --rate 2000 --duration 60
+  python traffic_simulator.py --mode stress --users 200
+
+  # Save latency percentiles to compare runs
+  python traffic_simulator.py --mode mixed --report-json run.json --report-csv run.csv
+
+  # Spread 20000 req/s over 8 local processes
+  python traffic_simulator.py --mode stress --rate 20000 --workers 8
+
+  # Or over several hosts: one coordinator, then a worker on each load host
+  python traffic_simulator.py --mode stress --rate 50000 --workers 4 --coordinator 0.0.0.0:7000
+  python traffic_simulator.py --worker coordinator-host:7000
+
+  # Record a seeded run, then replay the exact same requests 10x faster
+  python traffic_simulator.py --mode mixed --seed 42 --record mixed.jsonl.gz
+  python traffic_simulator.py --replay mixed.jsonl.gz --speed 10
+
+  # Turn a server access log into a trace
+  python traffic_simulator.py --trace-from-log access.log --record prod.jsonl.gz
         """
     )
     parser.add_argument(
@@ -241,44 +453,42 @@ Examples:
     )
     parser.add_argument(
         '--mode',
-        choices=['normal', 'stress', 'error', 'mixed', 'continuous'],
+        choices=MODES,
         help='Simulation mode (if not provided, interactive menu will be shown)'
     )
+    parser.add_argument('--rate', type=float, help='Arrival rate in requests/second (overrides the mode default)')
+    parser.add_argument('--duration', type=float, help='Duration in seconds (overrides the mode default)')
+    parser.add_argument('--users', type=int, help='Stress mode: concurrent users in a closed loop instead of a fixed rate')
+    parser.add_argument('--connections', type=int, default=200, help='Max pooled connections (default: 200)')
+    parser.add_argument('--report-json', metavar='PATH', help='Write the latency/status summary as JSON')
+    parser.add_argument('--report-csv', metavar='PATH', help='Write per-endpoint latency percentiles as CSV')
+    parser.add_argument('--seed', type=int, help='Seed the random action/payload choices for a repeatable run')
+    parser.add_argument('--record', metavar='PATH', help='Record every request to a trace file (.jsonl or .jsonl.gz)')
+    parser.add_argument('--replay', metavar='PATH', help='Replay a recorded trace instead of running a mode')
+    parser.add_argument(
+        '--speed', type=float, default=1.0,
+        help='Replay speed: 1 = as recorded, 10 = ten times faster, 0 = as fast as possible'
+    )
+    parser.add_argument(
+        '--trace-from-log', metavar='LOG',
+        help='Build a trace from an access log into --record PATH, then exit'
+    )
+    parser.add_argument('--workers', type=int, default=1, help='Split the load across this many worker processes')
+    parser.add_argument(
+        '--coordinator', type=address, metavar='HOST:PORT',
+        help='Listen here for --workers remote workers instead of starting local ones'
+    )
+    parser.add_argument(
+        '--worker', type=address, metavar='HOST:PORT',
+        help='Run as a remote worker for the coordinator at this address'
+    )
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    return parser
 
-    args = parser.parse_args()
-    base_url = args.url
-
-    print(f"""
-╔══════════════════════════════════════════════╗
-║   Universal Traffic Simulator               ║
-╚══════════════════════════════════════════════╝
-
-Target URL: {base_url}
-    """)
-
-    simulator = TrafficSimulator(base_url=base_url)
 
-    # Check if app is running
-    try:
-        requests.get(f"{base_url}/health", timeout=2)
-        logger.info(f"✅ Connected to {base_url}")
-    except:
-        logger.error(f"❌ Cannot connect to {base_url}")
-        logger.error("Make sure the target application is running")
-        logger.info(f"For demo app: cd 02-ci-cd && docker compose up -d")
-        return
-
-    if args.mode:
-        choice_map = {
-            'normal': '1',
-            'stress': '2',
-            'error': '3',
-            'mixed': '4',
-            'continuous': '5'
-        }
-        choice = choice_map[args.mode]
-    else:
-        print("""
+def choose_mode():
+    """Interactive menu; None on an invalid choice"""
+    print("""
 Choose a simulation mode:
 1. Normal Traffic (60s, ~30 req/min)
 2. Stress Test (30s, high load)
@@ -286,30 +496,67 @@ Choose a simulation mode:
 4. Mixed Scenario (120s, realistic)
 5. Continuous (run until stopped)
         """)
-        choice = input("Enter choice (1-5): ").strip()
-
-    if choice == '1':
-        simulator.run_normal_traffic(duration_seconds=60, requests_per_minute=30)
-    elif choice == '2':
-        simulator.run_stress_test(duration_seconds=30, requests_per_second=10)
-    elif choice == '3':
-        simulator.run_error_scenario(duration_seconds=30)
-    elif choice == '4':
-        simulator.run_mixed_scenario(duration_seconds=120)
-    elif choice == '5':
-        logger.info("Running continuous traffic (Ctrl+C to stop)")
-        try:
-            while True:
-                simulator.run_mixed_scenario(duration_seconds=60)
-        except KeyboardInterrupt:
-            logger.info("\n👋 Stopping traffic simulator")
-    else:
+    choice = input("Enter choice (1-5): ").strip()
+    if choice not in ('1', '2', '3', '4', '5'):
         logger.error("Invalid choice")
+        return None
+    return MODES[int(choice) - 1]
+
+
+def run(args, mode):
+    """Replay, distributed or single-process run; False if it did not complete"""
+    try:
+        if args.replay:
+            return run_async(run_replay(args))
+        if args.workers > 1 or args.coordinator:
+            return run_distributed(args, build_scenario(args, mode))
+        return run_async(run_simulation(args, build_scenario(args, mode)))
+    except KeyboardInterrupt:
+        logger.info("\n👋 Stopping traffic simulator")
+        return True
+
+
+def simulate(args):
+    print(f"""
+╔══════════════════════════════════════════════╗
+║   Universal Traffic Simulator               ║
+╚══════════════════════════════════════════════╝
+
+Target URL: {args.url}
+    """)
+
+    mode = args.mode
+    if not mode and not args.replay:
+        mode = choose_mode()
+        if mode is None:
+            return
+    if not run(args, mode):
+        return
 
     print("\n✅ Simulation complete!")
-    print(f"📊 View metrics at: {base_url}/metrics")
+    print(f"📊 View metrics at: {args.url}/metrics")
     print("📈 View in Grafana: http://localhost:3000 (if using demo setup)")
 
 
+def main():
+    """Main entry point"""
+    parser = build_parser()
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger().setLevel(logging.DEBUG)
+    # httpx logs every request at INFO, which would swamp high-rate runs
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    if args.worker:
+        # Everything else, including the target URL, comes from the coordinator
+        serve_worker(run_share, *args.worker)
+    elif args.trace_from_log:
+        if not args.record:
+            parser.error("--trace-from-log needs --record PATH for the output trace")
+        build_trace_from_log(args)
+    else:
+        simulate(args)
+
+
 if __name__ == "__main__":
     main()
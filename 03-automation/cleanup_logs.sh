@@ -1,46 +1,55 @@
 #!/bin/bash
 
 # Log cleanup automation script
-# Cleans logs older than 7 days
+# The app rotates its own logs by size (app.log -> app.log.1 -> ...), so
+# cleanup only has to drop rotated segments past the ones we keep. The
+# segment number is the age, so no filesystem scan by mtime is needed.
 
 SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
-LOG_DIR="$SCRIPT_DIR/demo_logs"
-DAYS_OLD=7
+LOG_DIR="${LOG_DIR:-$SCRIPT_DIR/demo_logs}"
+KEEP_SEGMENTS="${KEEP_SEGMENTS:-3}"
 DATE=$(date +%Y-%m-%d)
 
 # Create demo logs if they don't exist
 if [ ! -d "$LOG_DIR" ]; then
     echo "Creating demo log files..."
     mkdir -p "$LOG_DIR"
-    # Create some old log files
-    touch -t 202401010000 "$LOG_DIR/old_app.log"
-    touch -t 202401050000 "$LOG_DIR/old_error.log"
-    touch -t 202401100000 "$LOG_DIR/old_access.log"
-    # Create some recent log files
-    touch "$LOG_DIR/current_app.log"
-    touch "$LOG_DIR/current_error.log"
+    # Current logs and rotated segments, as left by the app's size rotation
+    touch "$LOG_DIR/app.log" "$LOG_DIR/error.log"
+    for i in 1 2 3 4 5; do
+        touch "$LOG_DIR/app.log.$i"
+    done
+    touch "$LOG_DIR/error.log.1" "$LOG_DIR/error.log.4"
     echo "Demo logs created"
     echo ""
 fi
 
 echo "=== Log Cleanup Script ==="
 echo "Date: $DATE"
-echo "Searching for logs older than $DAYS_OLD days in $LOG_DIR"
+echo "Keeping the newest $KEEP_SEGMENTS rotated segments of each log in $LOG_DIR"
 echo ""
 
-# Find and display logs older than specified days
+# Rotated segments are <name>.log.<n>; anything with n > KEEP_SEGMENTS goes
 echo "Files to be cleaned:"
-find "$LOG_DIR" -name "*.log" -type f -mtime +$DAYS_OLD 2>/dev/null
-
-# Count files
-COUNT=$(find "$LOG_DIR" -name "*.log" -type f -mtime +$DAYS_OLD 2>/dev/null | wc -l | tr -d ' ')
+FILES=()
+shopt -s nullglob
+for file in "$LOG_DIR"/*.log.[0-9]*; do
+    segment="${file##*.}"
+    if [[ "$segment" =~ ^[0-9]+$ ]] && [ "$segment" -gt "$KEEP_SEGMENTS" ]; then
+        echo "$file"
+        FILES+=("$file")
+    fi
+done
+shopt -u nullglob
+
+COUNT=${#FILES[@]}
 echo ""
 echo "Total files found: $COUNT"
 
-# Actually delete old files
-if [ $COUNT -gt 0 ]; then
-    find "$LOG_DIR" -name "*.log" -type f -mtime +$DAYS_OLD -exec rm -f {} \;
-    echo "Old log files deleted"
+# Actually delete old segments
+if [ "$COUNT" -gt 0 ]; then
+    rm -f "${FILES[@]}"
+    echo "Old log segments deleted"
 else
     echo "No old files to delete"
 fi